@@ -0,0 +1,33 @@
+from django.db import models
+
+
+class Publisher(models.Model):
+    name = models.CharField(max_length=100)
+    country = models.CharField(max_length=2)
+
+
+class Author(models.Model):
+    name = models.CharField(max_length=100)
+    age = models.IntegerField(default=0)
+    profile = models.JSONField(default=dict, blank=True)
+    publisher = models.ForeignKey(Publisher, related_name="authors", on_delete=models.SET_NULL, null=True, blank=True)
+
+
+class Tag(models.Model):
+    name = models.CharField(max_length=50, unique=True)
+
+
+class Book(models.Model):
+    title = models.CharField(max_length=200)
+    price = models.DecimalField(max_digits=8, decimal_places=2, default=0)
+    published = models.DateField(null=True, blank=True)
+    metadata = models.JSONField(default=dict, blank=True)
+    cover = models.FileField(upload_to="covers", blank=True)
+    author = models.ForeignKey(Author, related_name="books", on_delete=models.CASCADE)
+    tags = models.ManyToManyField(Tag, related_name="books", blank=True)
+
+
+class Review(models.Model):
+    book = models.ForeignKey(Book, related_name="reviews", on_delete=models.CASCADE)
+    rating = models.PositiveSmallIntegerField()
+    body = models.TextField(blank=True)
@@ -0,0 +1,103 @@
+"""
+The NodeTypes of the benchmarks, which use every Meta option between them except `sync`, which needs a timestamp field the bench models do not have.
+`values_fast_path` and `annotations` are set on the publisher, whose root connection the measured queries do not select.
+"""
+from django.core.exceptions import ValidationError
+from django.db.models import Count
+from django_filters import FilterSet, OrderingFilter
+from django_relay_endpoint import NodeType, SchemaConfigurator, AllowAny
+from bench.models import Tag
+
+
+def validate_age(data, not_updated_model_instance, info):
+    if data is not None and data < 0:
+        raise ValidationError("The age must not be negative.")
+
+
+def validate_author(data, not_updated_model_instance, info):
+    if not data.get("name", getattr(not_updated_model_instance, "name", None)):
+        raise ValidationError("The author must have a name.")
+
+
+class TagFilterSet(FilterSet):
+    order_by = OrderingFilter(fields=("name",))
+
+    class Meta:
+        model = Tag
+        fields = {"name": ("exact", "istartswith")}
+
+
+class PublisherType(NodeType):
+    class Meta:
+        model = "bench.Publisher"
+        fields = "__all__"
+        filter_fields = ["name", "country", "author_count"]
+        query_root_name = "publisher"
+        query_root_name_plural = "publishers"
+        mutation_operations = ["create"]
+        success_keyword = "ok"
+        return_field_name = "saved_publisher"
+        read_database = "default"
+        values_fast_path = True
+        annotations = {"author_count": Count("authors")}
+
+
+class AuthorType(NodeType):
+    class Meta:
+        model = "bench.Author"
+        fields = ["id", "name", "age", "profile", "publisher", "books"]
+        filter_fields = {
+            "name": ("exact", "icontains"),
+            "age": ("gte", "lte"),
+        }
+        extra_kwargs = {
+            "name": {"required": True},
+        }
+        field_validators = {
+            "age": [validate_age],
+        }
+        non_field_validators = [validate_author]
+        input_field_name = "author_data"
+        cost_weight = 2
+        default_page_size = 20
+        max_page_size = 100
+
+
+class TagType(NodeType):
+    class Meta:
+        model = "bench.Tag"
+        fields = ["id", "name", "books"]
+        filterset_class = TagFilterSet
+        object_type_name = "BenchTag"
+        mutation_operations = ["create", "delete"]
+        permission_classes = [AllowAny]
+
+
+class BookType(NodeType):
+    @staticmethod
+    def get_queryset(object_type, queryset, info):
+        return queryset.select_related("author", "author__publisher").prefetch_related("tags")
+
+    class Meta:
+        model = "bench.Book"
+        fields = "__all__"
+        filter_fields = {"title": ("icontains",), "price": ("lte", "gte")}
+        permissions = ["bench.view_book"]
+        default_page_size = 50
+        max_page_size = 500
+
+
+class ReviewType(NodeType):
+    class Meta:
+        model = "bench.Review"
+        fields = "__all__"
+        aggregate = True
+        aggregate_fields = ["rating"]
+        aggregate_group_by = ["book"]
+
+
+NODE_TYPES = [PublisherType, AuthorType, TagType, BookType, ReviewType]
+
+
+def build_schema():
+    return SchemaConfigurator(NODE_TYPES).schema()
@@ -0,0 +1,294 @@
+"""
+Benchmarks the generated endpoint against the reference app in SQLite and writes the results as JSON, e.g.
+
+    python benchmarks/run.py --rows 1000 100000 --output benchmarks/results/$(git rev-parse --short HEAD).json
+    python benchmarks/run.py --rows 1000 --baseline benchmarks/results/<commit>.json
+
+The seeded databases are kept in the temporary directory and reused while the number of rows matches, pass --reseed to recreate them.
+With --baseline the results are compared to an earlier run and the script exits with 1 on regressions.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+from time import perf_counter
+from typing import Any, Callable, Dict, List
+
+BENCHMARKS_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIRECTORY))
+sys.path.insert(0, BENCHMARKS_DIRECTORY)
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "settings")
+
+import django
+
+django.setup()
+
+import graphene_django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection, connections
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from graphql_relay import to_global_id
+from bench.models import Book
+from endpoint import build_schema
+from seed import seed
+from django_relay_endpoint import GraphQLView
+
+
+QUERIES = {
+    "book_list": """
+        query BookList {
+            book(first: 100) { edges { node {
+                id title price published metadata cover
+                author { name publisher { name } }
+                tags { edges { node { name } } }
+            } } }
+        }
+    """,
+    "book_filter": """
+        query BookFilter {
+            book(first: 50, title_Icontains: "Book 1", price_Lte: 50) { edges { node { id title price } } }
+        }
+    """,
+    "author_nested": """
+        query AuthorNested {
+            author(first: 20) { edges { node {
+                name profile
+                books(first: 10) { edges { node { title reviews { edges { node { rating } } } } } }
+            } } }
+        }
+    """,
+}
+
+NODE_QUERY = """
+    query BookNode($id: ID!) {
+        node(id: $id) { id ... on BenchBook { title author { name } } }
+    }
+"""
+
+CREATE_MUTATION = """
+    mutation CreateAuthor($data: BenchAuthorInput!) {
+        createAuthor(input: {authorData: $data}) { success author { id } }
+    }
+"""
+
+UPDATE_MUTATION = """
+    mutation UpdateAuthor($data: BenchAuthorInput!) {
+        updateAuthor(input: {authorData: $data}) { success author { id } }
+    }
+"""
+
+DELETE_MUTATION = """
+    mutation DeleteAuthor($id: ID!) {
+        deleteAuthor(input: {id: $id}) { success }
+    }
+"""
+
+
+def timings(durations: List[float]) -> Dict[str, float]:
+    """
+    Summarizes durations in seconds as milliseconds.
+    """
+    ordered = sorted(durations)
+    return {
+        "min": round(ordered[0] * 1000, 3),
+        "median": round(statistics.median(ordered) * 1000, 3),
+        "p95": round(ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)] * 1000, 3),
+        "mean": round(statistics.fmean(ordered) * 1000, 3),
+    }
+
+
+def measure(function: Callable[[int], Any], iterations: int, warmup: int = 2) -> Dict[str, Any]:
+    """
+    Calls `function(iteration)` `iterations` times after `warmup` calls and returns the timings and the queries of the last call.
+    """
+    for iteration in range(warmup):
+        function(iteration)
+    durations = []
+    for iteration in range(iterations):
+        with CaptureQueriesContext(connection) as queries:
+            started = perf_counter()
+            function(iteration)
+            durations.append(perf_counter() - started)
+    return {**timings(durations), "queries": len(queries)}
+
+
+class Endpoint:
+    """
+    Executes documents through GraphQLView as a superuser, errors of the documents fail the benchmarks.
+    """
+
+    def __init__(self) -> None:
+        self.view = GraphQLView.as_view(schema=build_schema())
+        self.factory = RequestFactory()
+        self.user = User(username="benchmarks", is_active=True, is_superuser=True, is_staff=True)
+
+    def execute(self, query: str, variables: Dict[str, Any] = None) -> Dict[str, Any]:
+        request = self.factory.post("/graphql", json.dumps({"query": query, "variables": variables}), content_type="application/json")
+        request.user = self.user
+        response = json.loads(self.view(request).content)
+        if response.get("errors"):
+            raise RuntimeError(f"The benchmark document failed: {response['errors']}")
+        return response["data"]
+
+
+def use_database(rows: int, directory: str, reseed: bool) -> None:
+    """
+    Switches the default database to the SQLite file seeded with `rows` books, seeding it if needed.
+    """
+    path = os.path.join(directory, f"django_relay_endpoint_benchmarks_{rows}.sqlite3")
+    connections.close_all()
+    if reseed and os.path.exists(path):
+        os.remove(path)
+    settings.DATABASES["default"]["NAME"] = connection.settings_dict["NAME"] = path
+    call_command("migrate", run_syncdb=True, verbosity=0)
+    if Book.objects.count() != rows:
+        call_command("flush", interactive=False, verbosity=0)
+        started = perf_counter()
+        seed(rows)
+        print(f"Seeded {rows} rows in {perf_counter() - started:.1f}s", file=sys.stderr)
+
+
+def benchmark_schema_build(iterations: int) -> Dict[str, Any]:
+    durations = []
+    for _ in range(iterations):
+        started = perf_counter()
+        build_schema()
+        durations.append(perf_counter() - started)
+    return timings(durations)
+
+
+def benchmark_queries(endpoint: Endpoint, iterations: int) -> Dict[str, Any]:
+    results = {
+        name: measure(lambda iteration, query=query: endpoint.execute(query), iterations)
+        for name, query in QUERIES.items()
+    }
+    book_ids = [to_global_id("BenchBook", pk) for pk in Book.objects.order_by("?").values_list("pk", flat=True)[:iterations + 2]]
+    results["node"] = measure(lambda iteration: endpoint.execute(NODE_QUERY, {"id": book_ids[iteration % len(book_ids)]}), iterations)
+    return results
+
+
+def benchmark_mutations(endpoint: Endpoint, iterations: int) -> Dict[str, Any]:
+    """
+    Creates, updates and deletes `iterations` authors, so that the data is unchanged afterwards.
+    """
+    created_ids = []
+
+    def create(iteration: int) -> None:
+        data = {"name": f"Benchmark {iteration}", "age": 40, "profile": {"bio": "A benchmark author."}}
+        created_ids.append(endpoint.execute(CREATE_MUTATION, {"data": data})["createAuthor"]["author"]["id"])
+
+    def update(iteration: int) -> None:
+        data = {"id": created_ids[iteration], "name": f"Updated {iteration}", "age": 41}
+        endpoint.execute(UPDATE_MUTATION, {"data": data})
+
+    def delete(iteration: int) -> None:
+        endpoint.execute(DELETE_MUTATION, {"id": created_ids[iteration]})
+
+    results = {}
+    for name, function in (("create", create), ("update", update), ("delete", delete)):
+        started = perf_counter()
+        results[name] = measure(function, iterations, warmup=0)
+        results[name]["operations_per_second"] = round(iterations / (perf_counter() - started), 1)
+    return results
+
+
+def run(rows: int, iterations: int, directory: str, reseed: bool) -> Dict[str, Any]:
+    use_database(rows, directory, reseed)
+    endpoint = Endpoint()
+    return {
+        "schema_build": benchmark_schema_build(max(iterations // 10, 3)),
+        "queries": benchmark_queries(endpoint, iterations),
+        "mutations": benchmark_mutations(endpoint, iterations),
+    }
+
+
+def get_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=BENCHMARKS_DIRECTORY, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def flatten(results: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}."))
+        else:
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    Compares the medians, query counts and throughputs of two runs of the same data sizes.
+
+    Returns:
+        List[str]: the regressions, i.e. medians slower or throughputs lower by more than `tolerance`, and any additional query
+    """
+    regressions = []
+    baseline_values = flatten(baseline["results"])
+    for key, value in flatten(current["results"]).items():
+        previous = baseline_values.get(key)
+        if previous is None:
+            continue
+        if key.endswith(".median") and previous and value > previous * (1 + tolerance):
+            regressions.append(f"{key}: {previous}ms -> {value}ms (+{(value / previous - 1) * 100:.0f}%)")
+        elif key.endswith(".operations_per_second") and value < previous * (1 - tolerance):
+            regressions.append(f"{key}: {previous}/s -> {value}/s (-{(1 - value / previous) * 100:.0f}%)")
+        elif key.endswith(".queries") and value > previous:
+            regressions.append(f"{key}: {previous} -> {value} queries")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks the generated endpoint.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 100000], help="the data sizes, i.e. the number of books")
+    parser.add_argument("--iterations", type=int, default=50, help="the measured executions per benchmark")
+    parser.add_argument("--database-directory", default=tempfile.gettempdir(), help="the directory of the seeded SQLite databases")
+    parser.add_argument("--reseed", action="store_true", help="recreate the seeded databases")
+    parser.add_argument("--output", help="the path of the JSON results, printed to stdout if omitted")
+    parser.add_argument("--baseline", help="the JSON results of an earlier run to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="the allowed relative slowdown before it counts as a regression")
+    options = parser.parse_args()
+
+    current = {
+        "commit": get_commit(),
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "graphene_django": graphene_django.__version__,
+        "iterations": options.iterations,
+        "results": {
+            str(rows): run(rows, options.iterations, options.database_directory, options.reseed)
+            for rows in options.rows
+        },
+    }
+    if options.output:
+        os.makedirs(os.path.dirname(os.path.abspath(options.output)), exist_ok=True)
+        with open(options.output, "w") as f:
+            json.dump(current, f, indent=2)
+    else:
+        print(json.dumps(current, indent=2))
+
+    if options.baseline:
+        with open(options.baseline) as f:
+            regressions = compare(json.load(f), current, options.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
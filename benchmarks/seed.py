@@ -0,0 +1,67 @@
+"""
+Seeds the reference app with `rows` books and their related records.
+"""
+import random
+from datetime import date, timedelta
+from django.db import transaction
+from bench.models import Author, Book, Publisher, Review, Tag
+
+BATCH_SIZE = 2000
+TAG_COUNT = 50
+TAGS_PER_BOOK = 3
+
+
+def seed(rows: int, seed_value: int = 0) -> None:
+    """
+    Creates `rows` books with one review and three tags each, an author per 10 books and a publisher per 100 books.
+    The data is deterministic per `seed_value`, so that results of different commits are comparable.
+
+    Args:
+        rows (int): the number of books
+        seed_value (int, optional): the seed of the random data. Defaults to 0.
+    """
+    generator = random.Random(seed_value)
+    with transaction.atomic():
+        publishers = Publisher.objects.bulk_create(
+            [Publisher(name=f"Publisher {i}", country=generator.choice(["AM", "DE", "FR", "US"])) for i in range(max(rows // 100, 1))],
+            batch_size=BATCH_SIZE,
+        )
+        authors = Author.objects.bulk_create(
+            [
+                Author(
+                    name=f"Author {i}",
+                    age=generator.randint(20, 90),
+                    profile={"bio": f"Biography of author {i}", "languages": ["en", "hy"]},
+                    publisher=publishers[i % len(publishers)],
+                )
+                for i in range(max(rows // 10, 1))
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        tags = Tag.objects.bulk_create([Tag(name=f"tag-{i}") for i in range(TAG_COUNT)])
+        books = Book.objects.bulk_create(
+            [
+                Book(
+                    title=f"Book {i}",
+                    price=generator.randint(100, 10000) / 100,
+                    published=date(2000, 1, 1) + timedelta(days=generator.randint(0, 9000)),
+                    metadata={"isbn": f"978-{i:010d}", "pages": generator.randint(50, 900)},
+                    cover=f"covers/book-{i}.png",
+                    author=authors[i % len(authors)],
+                )
+                for i in range(rows)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        Book.tags.through.objects.bulk_create(
+            [
+                Book.tags.through(book_id=book.pk, tag_id=tag.pk)
+                for book in books
+                for tag in generator.sample(tags, TAGS_PER_BOOK)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        Review.objects.bulk_create(
+            [Review(book=book, rating=generator.randint(1, 5), body="A review.") for book in books],
+            batch_size=BATCH_SIZE,
+        )
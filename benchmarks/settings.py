@@ -0,0 +1,19 @@
+"""
+The django settings of the benchmarks, the database is set per data size by `run.py`.
+"""
+import tempfile
+
+SECRET_KEY = "django-relay-endpoint-benchmarks"
+DEBUG = False
+INSTALLED_APPS = [
+    "django.contrib.contenttypes",
+    "django.contrib.auth",
+    "graphene_django",
+    "django_filters",
+    "django_relay_endpoint",
+    "bench",
+]
+DATABASES = {"default": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"}}
+USE_TZ = True
+DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+MEDIA_ROOT = tempfile.gettempdir()
@@ -1,6 +1,9 @@
 from django_relay_endpoint.configurators.schema import SchemaConfigurator
 from django_relay_endpoint.configurators.node import NodeType
 from django_relay_endpoint.configurators.fields import GenericDjangoInputField
+from django_relay_endpoint.configurators.field_conversions import register_conversion
 from django_relay_endpoint.configurators.object_types import DjangoObjectType, DjangoClientIDMutation
 from django_relay_endpoint.configurators.permissions import BasePermission, AllowAny, IsAuthenticated, IsAdminUser, IsAuthenticatedOrReadOnly, node_permission_checker, queryset_permission_checker
 from graphene_file_upload.django import FileUploadGraphQLView
+from django_relay_endpoint.views import GraphQLView, AsyncGraphQLView, MetricsView, ExportView
+from django_relay_endpoint.uploads import SpooledUploadHandler, DeduplicatingStorageMixin
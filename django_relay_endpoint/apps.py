@@ -3,3 +3,20 @@ from django.apps import AppConfig
 
 class DjangoRelayEndpointConfig(AppConfig):
     name = 'django_relay_endpoint'
+
+    def ready(self) -> None:
+        from django.db.backends.signals import connection_created
+        from django_relay_endpoint.instrumentation import instrument_connection
+        from django_relay_endpoint.metrics import meter_connection
+        from django_relay_endpoint.tracing import trace_connection
+        from django_relay_endpoint.settings import dre_settings
+
+        # the SQL of instrumented operations is recorded by an execute wrapper on every connection
+        if dre_settings.INSTRUMENTATION:
+            connection_created.connect(instrument_connection, dispatch_uid="django_relay_endpoint_instrumentation")
+        # the SQL count by NodeType is recorded by an execute wrapper on every connection
+        if dre_settings.METRICS:
+            connection_created.connect(meter_connection, dispatch_uid="django_relay_endpoint_metrics")
+        # every SQL statement is traced by an execute wrapper on every connection
+        if dre_settings.TRACER:
+            connection_created.connect(trace_connection, dispatch_uid="django_relay_endpoint_tracing")
@@ -0,0 +1,285 @@
+import codecs
+import csv
+import json
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Type
+import graphene
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
+from django.core.files.uploadedfile import UploadedFile
+from django.db import IntegrityError, models, router, transaction
+from graphql_relay import from_global_id
+
+
+IMPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", ".ndjson", ".jsonl"),
+    "csv": ("text/csv", ".csv"),
+}
+
+# (row, data, error): the 1-based number of the record in the file, the parsed record or None and the parse error or None
+ParsedRow = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+
+class ImportRowError(NamedTuple):
+    """
+    The errors of a field of a row of the import, `field` is None for the errors of the whole row.
+    """
+    row: int
+    field: Optional[str]
+    messages: List[str]
+
+
+def get_import_format(upload: UploadedFile, format: str = None) -> str:
+    """
+    Returns the given format, or infers it from the extension or the content type of the upload.
+
+    Raises:
+        ValueError: if the format is unknown or cannot be inferred
+    """
+    if format:
+        if format not in IMPORT_FORMATS:
+            raise ValueError(f"Unknown import format '{format}', the formats are {', '.join(IMPORT_FORMATS)}")
+        return format
+    name = (upload.name or "").lower()
+    for import_format, (content_type, *extensions) in IMPORT_FORMATS.items():
+        if upload.content_type == content_type or name.endswith(tuple(extensions)):
+            return import_format
+    raise ValueError(f"The format of '{upload.name}' cannot be inferred, provide one of {', '.join(IMPORT_FORMATS)}")
+
+
+def iterate_ndjson(upload: UploadedFile) -> Iterator[ParsedRow]:
+    """
+    Parses one JSON object per line. The upload is read line by line from its chunks, blank lines are skipped but numbered.
+    """
+    row = 0
+    try:
+        for line in codecs.iterdecode(upload, "utf-8-sig"):
+            row += 1
+            if not line.strip():
+                continue
+            try:
+                data = json.loads(line)
+            except ValueError as e:
+                yield row, None, f"Invalid JSON: {e}"
+                continue
+            if not isinstance(data, dict):
+                yield row, None, "A row must be a JSON object"
+                continue
+            yield row, data, None
+    except UnicodeDecodeError:
+        yield row + 1, None, "The file must be UTF-8 encoded"
+
+
+def iterate_csv(upload: UploadedFile) -> Iterator[ParsedRow]:
+    """
+    Parses the records of a CSV file whose first line is the header of field names. The upload is read line by line from its chunks.
+    """
+    reader = csv.DictReader(codecs.iterdecode(upload, "utf-8-sig"))
+    row = 0
+    while True:
+        row += 1
+        try:
+            data = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            yield row, None, str(e)
+            continue
+        except UnicodeDecodeError:
+            yield row, None, "The file must be UTF-8 encoded"
+            return
+        if None in data:
+            yield row, None, "The row has more values than the header"
+            continue
+        yield row, data, None
+
+
+PARSERS = {
+    "ndjson": iterate_ndjson,
+    "csv": iterate_csv,
+}
+
+
+def get_error_messages(error: ValidationError) -> Dict[Optional[str], List[str]]:
+    """
+    Returns the messages of a validation error by field name, the non field errors under None.
+    """
+    if hasattr(error, "error_dict"):
+        return {None if field == NON_FIELD_ERRORS else field: messages for field, messages in error.message_dict.items()}
+    return {None: error.messages}
+
+
+class BulkImporter:
+    """
+    Creates instances of the model of a mutation from parsed rows in batches of `batch_size`.
+    Every row is cleaned by the form fields of the input object type and validated by the validators of the mutation,
+    then every batch checks the foreign keys with one query per foreign key, cleans the instances with `full_clean`
+    and inserts them with `bulk_create`. If the insert violates a database constraint, the rows of the batch are saved one by one
+    to report the failing ones. Only one batch of instances is held in memory.
+
+    Args:
+        mutation (Type[graphene.relay.ClientIDMutation]): the mutation, whose `model`, `validate` and validators are used
+        input_object_type (Type[graphene.InputObjectType]): the input object type of the NodeType, whose input fields clean the values
+        fields (List[str]): the fields of the NodeType, the columns of the import
+        info (graphene.ResolveInfo): the resolve info passed to the validators
+        batch_size (int): the number of rows per batch
+        max_errors (int): the number of row errors reported, the failed rows are counted regardless
+    """
+
+    def __init__(
+            self,
+            mutation: Type[graphene.relay.ClientIDMutation],
+            input_object_type: Type[graphene.InputObjectType],
+            fields: List[str],
+            info: graphene.ResolveInfo,
+            batch_size: int,
+            max_errors: int,
+    ) -> None:
+        self.mutation = mutation
+        self.model: Type[models.Model] = mutation.model
+        self.info = info
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+        self.database = router.db_for_write(self.model)
+        self.created = 0
+        self.failed = 0
+        self.errors: List[ImportRowError] = []
+        input_fields = input_object_type._meta.fields
+        self.columns: Dict[str, models.Field] = {}
+        self.input_fields: Dict[str, graphene.InputField] = {}
+        self.relations: List[models.ForeignKey] = []
+        for model_field in self.model._meta.concrete_fields:
+            if model_field.name not in fields:
+                continue
+            self.columns[model_field.name] = model_field
+            if model_field.is_relation:
+                self.relations.append(model_field)
+            elif model_field.name in input_fields:
+                self.input_fields[model_field.name] = input_fields[model_field.name]
+
+    def fail(self, row: int, messages: Dict[Optional[str], List[str]]) -> None:
+        self.failed += 1
+        for field, field_messages in messages.items():
+            if len(self.errors) < self.max_errors:
+                self.errors.append(ImportRowError(row, field, [str(message) for message in field_messages]))
+
+    def clean(self, data: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[Optional[str], List[str]]]:
+        """
+        Cleans the values of a row with the form fields of the input fields, and the global ids of the foreign keys.
+
+        Returns:
+            Tuple[Dict[str, Any], Dict[Optional[str], List[str]]]: the cleaned values by attname, and the errors by field name
+        """
+        values, errors = {}, {}
+        for name, value in data.items():
+            model_field = self.columns.get(name)
+            if model_field is None:
+                errors[name] = [f"Unknown field, the fields are {', '.join(self.columns)}"]
+            elif model_field.primary_key:
+                if value not in (None, ""):
+                    errors[name] = ["Field 'id' should not be provided when creating new objects"]
+            elif model_field.is_relation:
+                if value in (None, ""):
+                    values[model_field.attname] = None
+                    continue
+                try:
+                    values[model_field.attname] = model_field.target_field.to_python(from_global_id(str(value)).id)
+                except (ValidationError, ValueError, TypeError):
+                    errors[name] = [f"'{value}' is not a valid id"]
+            else:
+                form_field = getattr(self.input_fields.get(name), "form_field", None)
+                try:
+                    values[name] = form_field.clean(value) if form_field else value
+                except ValidationError as e:
+                    errors[name] = e.messages
+        return values, errors
+
+    def build(self, row: int, data: Dict[str, Any]) -> Optional[models.Model]:
+        """
+        Returns an unsaved instance of the cleaned and validated row, or None if the row failed.
+        """
+        values, errors = self.clean(data)
+        if errors:
+            self.fail(row, errors)
+            return None
+        instance = self.model(**values)
+        # the validators get the data of a create mutation: the cleaned values by field name, the foreign keys as global ids
+        validated_data = {
+            name: (data[name] or None) if model_field.is_relation else values[name]
+            for name, model_field in self.columns.items()
+            if name in data and not model_field.primary_key
+        }
+        try:
+            self.mutation.validate(validated_data, instance, self.info)
+        except ValidationError as e:
+            self.fail(row, get_error_messages(e))
+            return None
+        return instance
+
+    def check_relations(self, batch: List[Tuple[int, models.Model]]) -> List[Tuple[int, models.Model]]:
+        """
+        Fails the rows of the batch whose foreign keys do not exist, with one query per foreign key.
+        """
+        for relation in self.relations:
+            ids = {getattr(instance, relation.attname) for _, instance in batch} - {None}
+            if not ids:
+                continue
+            existing = set(relation.related_model._default_manager.using(self.database).filter(
+                **{f"{relation.target_field.attname}__in": ids}
+            ).values_list(relation.target_field.attname, flat=True))
+            checked = []
+            for row, instance in batch:
+                value = getattr(instance, relation.attname)
+                if value is not None and value not in existing:
+                    self.fail(row, {relation.name: [f"{relation.related_model._meta.verbose_name} with id '{value}' does not exist"]})
+                else:
+                    checked.append((row, instance))
+            batch = checked
+        return batch
+
+    def flush(self, batch: List[Tuple[int, models.Model]]) -> None:
+        """
+        Validates and inserts a batch.
+        """
+        valid = []
+        for row, instance in self.check_relations(batch):
+            try:
+                instance.full_clean(exclude=[relation.name for relation in self.relations], validate_unique=False, validate_constraints=False)
+            except ValidationError as e:
+                self.fail(row, get_error_messages(e))
+            else:
+                valid.append((row, instance))
+        if not valid:
+            return
+        try:
+            with transaction.atomic(using=self.database):
+                self.model._default_manager.using(self.database).bulk_create([instance for _, instance in valid])
+        except IntegrityError:
+            for row, instance in valid:
+                # the rolled back insert may have set the primary keys
+                if self.model._meta.pk.auto_created or isinstance(self.model._meta.pk, models.AutoField):
+                    instance.pk = None
+                instance._state.adding = True
+                try:
+                    with transaction.atomic(using=self.database):
+                        instance.save(force_insert=True, using=self.database)
+                except IntegrityError as e:
+                    self.fail(row, {None: [str(e)]})
+                else:
+                    self.created += 1
+        else:
+            self.created += len(valid)
+
+    def run(self, rows: Iterable[ParsedRow]) -> "BulkImporter":
+        batch = []
+        for row, data, error in rows:
+            if error:
+                self.fail(row, {None: [error]})
+                continue
+            instance = self.build(row, data)
+            if instance is not None:
+                batch.append((row, instance))
+            if len(batch) >= self.batch_size:
+                self.flush(batch)
+                batch = []
+        if batch:
+            self.flush(batch)
+        return self
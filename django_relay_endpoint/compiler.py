@@ -0,0 +1,398 @@
+import json
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Type
+import graphene
+from django.core.exceptions import FieldDoesNotExist, PermissionDenied
+from django.db import connections, models
+from django.db.models import F, Func, OuterRef, Subquery
+from django.db.models.functions import Cast, JSONObject
+from graphene.utils.str_converters import to_camel_case, to_snake_case
+from graphene_django import DjangoObjectType
+from graphene_django.fields import DjangoConnectionField
+from graphene_django.filter.fields import convert_enum
+from graphene_django.registry import get_global_registry
+from graphql import FieldNode, OperationType
+from graphql.execution.values import get_argument_values
+from graphql_relay import cursor_to_offset, offset_to_cursor
+from django_relay_endpoint.configurators.connection_fields import UnsupportedSelection, get_values_fields, iterate_fields
+from django_relay_endpoint.configurators.sync import SyncConnectionFieldMixin
+from django_relay_endpoint.cost import get_connection_node_type, get_default_page_size
+
+
+# the attribute of the objects built from a compiled result, which holds the values of their fields by response key
+COMPILED_ATTRIBUTE = "_dre_compiled"
+
+# the column of the JSON object of a row in the compiled querysets
+JSON_COLUMN = "dre_json"
+
+# the aggregation of the JSON objects of the rows of a compiled queryset into a JSON array, by database vendor
+ARRAY_TEMPLATES = {
+    "sqlite": f"SELECT COALESCE(json_group_array(json(dre.{JSON_COLUMN})), json('[]')) FROM (%(subquery)s) dre",
+    "postgresql": f"SELECT COALESCE(json_agg(dre.{JSON_COLUMN}), '[]'::json) FROM (%(subquery)s) dre",
+}
+
+
+class NotCompilable(Exception):
+    """
+    Raised while a field is compiled, if the field or one of its selections cannot be compiled, which falls back to normal execution.
+    """
+
+
+class EmbeddedJSON(Func):
+    """
+    Embeds the JSON text of a subquery in the JSON object of the outer row as JSON, instead of a string.
+    """
+    function = ""
+    output_field = models.JSONField()
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return super().as_sql(compiler, connection, function="json", **extra_context)
+
+
+class JSONArraySubquery(Subquery):
+    """
+    A subquery aggregating the JSON objects of the rows of a compiled queryset into a JSON array, an empty array if there is no row.
+    """
+    output_field = models.JSONField()
+
+    def as_sql(self, compiler, connection, template=None, **extra_context):
+        if connection.vendor not in ARRAY_TEMPLATES:
+            raise NotCompilable()
+        return super().as_sql(compiler, connection, template=f"({ARRAY_TEMPLATES[connection.vendor]})", **extra_context)
+
+
+class CompiledValue:
+    """
+    A connection, an edge or a page info built from a compiled result.
+    """
+
+    def __init__(self, values: Dict[str, Any]) -> None:
+        setattr(self, COMPILED_ATTRIBUTE, values)
+
+
+class NodePlan(NamedTuple):
+    """
+    How the values of a node are read from its JSON object: the (response key, kind, converter or plan) of its selections.
+    The kind is "id", "scalar", "node" or "connection".
+    """
+    object_type: Type[DjangoObjectType]
+    selections: List[Tuple[str, str, Any]]
+
+
+class ConnectionPlan(NamedTuple):
+    """
+    How a connection is built from the JSON array of its nodes, which holds up to `size` + 1 nodes from offset `start`,
+    and the (response key, name, sub-selections) of its selections.
+    """
+    start: int
+    size: int
+    node: NodePlan
+    selections: List[Tuple[str, str, Any]]
+
+
+def get_converter(model_field: models.Field) -> Callable[[Any, Any], Any]:
+    """
+    Returns a function converting the JSON value of a column to the python value the model field would hold,
+    with the database converters of the field, e.g. datetimes from text on SQLite, and `to_python`.
+    """
+    col = model_field.get_col(model_field.model._meta.db_table)
+
+    def convert(value: Any, connection) -> Any:
+        if value is None:
+            return None
+        for converter in connection.ops.get_db_converters(col) + col.get_db_converters(connection):
+            value = converter(value, col, connection)
+        if isinstance(model_field, models.JSONField):
+            return value
+        return model_field.to_python(value)
+    return convert
+
+
+@lru_cache(maxsize=None)
+def get_python_names(object_type: Type[graphene.ObjectType]) -> Dict[str, str]:
+    """
+    Returns the python names of the fields of an object type by their names in the schema.
+    """
+    return {getattr(field, "name", None) or to_camel_case(name): name for name, field in object_type._meta.fields.items()}
+
+
+def get_field(object_type: Type[graphene.ObjectType], name: str) -> Any:
+    field = object_type._meta.fields[name]
+    return field.get_type() if isinstance(field, graphene.Dynamic) else field
+
+
+def group_fields(field_nodes: List[FieldNode], info: graphene.ResolveInfo) -> Dict[str, List[FieldNode]]:
+    """
+    Returns the fields selected by the field nodes by response key, merging the fields selected more than once.
+    """
+    grouped = {}
+    try:
+        for field_node in field_nodes:
+            for field in iterate_fields(field_node.selection_set, info.fragments):
+                key = field.alias.value if field.alias else field.name.value
+                grouped.setdefault(key, []).append(field)
+    except UnsupportedSelection:
+        raise NotCompilable()
+    return grouped
+
+
+def get_queryset(object_type: Type[DjangoObjectType], info: graphene.ResolveInfo) -> models.QuerySet:
+    """
+    Returns the queryset of the object type filtered by its `get_queryset`, i.e. its permissions and read routing.
+    A denied permission is raised by normal execution.
+    """
+    if not (isinstance(object_type, type) and issubclass(object_type, DjangoObjectType)):
+        raise NotCompilable()
+    try:
+        return object_type.get_queryset(object_type._meta.model._default_manager.get_queryset(), info)
+    except PermissionDenied:
+        raise NotCompilable()
+
+
+def compile_node(object_type: Type[DjangoObjectType], field_nodes: List[FieldNode], info: graphene.ResolveInfo) -> Tuple[Dict[str, Any], NodePlan]:
+    """
+    Compiles the selections of a node into the expressions of its JSON object, by response key, and its plan.
+    """
+    model = object_type._meta.model
+    values_fields = get_values_fields(object_type)
+    python_names = get_python_names(object_type)
+    expressions, selections = {}, []
+    for key, fields in group_fields(field_nodes, info).items():
+        name = fields[0].name.value
+        if name == "__typename":
+            continue
+        if name == "id" and name in python_names:
+            expressions[key] = F("pk")
+            selections.append((key, "id", get_converter(model._meta.pk)))
+            continue
+        if name in values_fields:
+            if any(field.arguments for field in fields):
+                # e.g. the `path` of a JSON field
+                raise NotCompilable()
+            model_field = model._meta.get_field(values_fields[name])
+            # JSON values are embedded as text and decoded by the converters of the field
+            expressions[key] = Cast(model_field.name, models.TextField()) if isinstance(model_field, models.JSONField) else F(model_field.name)
+            selections.append((key, "scalar", get_converter(model_field)))
+            continue
+        python_name = python_names.get(name)
+        if python_name is None or hasattr(object_type, f"resolve_{python_name}"):
+            raise NotCompilable()
+        try:
+            model_field = model._meta.get_field(python_name)
+        except FieldDoesNotExist:
+            raise NotCompilable()
+        field = get_field(object_type, python_name)
+        if getattr(field, "resolver", None) is not None or not model_field.is_relation:
+            raise NotCompilable()
+        if isinstance(field, DjangoConnectionField):
+            if model_field.many_to_many and model_field.concrete:
+                lookup = model_field.related_query_name()
+            elif model_field.one_to_many or model_field.many_to_many:
+                lookup = model_field.field.name
+            else:
+                raise NotCompilable()
+            queryset = get_queryset(field.node_type, info).filter(**{lookup: OuterRef("pk")})
+            arguments = get_argument_values(info.schema.get_type(object_type._meta.name).fields[name], fields[0], info.variable_values)
+            queryset, plan = compile_connection(field, queryset, arguments, fields, info)
+            expressions[key] = EmbeddedJSON(JSONArraySubquery(queryset))
+            selections.append((key, "connection", plan))
+        elif model_field.concrete and (model_field.many_to_one or model_field.one_to_one):
+            related_type = get_global_registry().get_type_for_model(model_field.related_model)
+            queryset = get_queryset(related_type, info).filter(pk=OuterRef(model_field.attname))
+            related_expressions, plan = compile_node(related_type, fields, info)
+            expressions[key] = EmbeddedJSON(Subquery(queryset.values(**{JSON_COLUMN: JSONObject(**related_expressions)})[:1]))
+            selections.append((key, "node", plan))
+        else:
+            raise NotCompilable()
+    return expressions, NodePlan(object_type, selections)
+
+
+def compile_connection(
+        connection_field: DjangoConnectionField,
+        queryset: models.QuerySet,
+        args: Dict[str, Any],
+        field_nodes: List[FieldNode],
+        info: graphene.ResolveInfo,
+    ) -> Tuple[models.QuerySet, ConnectionPlan]:
+    """
+    Compiles a connection into the queryset of the JSON objects of its page, filtered and ordered by the filterset of the connection field,
+    and its plan. The page is fetched with one more node, which tells whether there is a next page.
+    Backward pagination, i.e. `last` and `before`, is not compiled.
+    """
+    node_type = connection_field.node_type
+    if args.get("last") is not None or args.get("before") is not None:
+        raise NotCompilable()
+    first = args.get("first")
+    max_page_size = getattr(node_type, "max_page_size", None)
+    max_limit = connection_field.max_limit
+    if (
+        (first is None and connection_field.enforce_first_or_last)
+        or (first is not None and first < 0)
+        or (first and max_limit and first > max_limit)
+        or (first and max_page_size and first > max_page_size)
+    ):
+        # the errors are raised by normal execution
+        raise NotCompilable()
+    size = first if first is not None else get_default_page_size(node_type) or max_limit
+    if size is None:
+        raise NotCompilable()
+
+    filtering_args = getattr(connection_field, "filtering_args", None)
+    if filtering_args:
+        data = {}
+        for name, value in args.items():
+            if name in filtering_args:
+                if name == "order_by" and value is not None:
+                    value = to_snake_case(value)
+                data[name] = convert_enum(value)
+        filterset = connection_field.filterset_class(data=data, queryset=queryset, request=info.context)
+        if not filterset.is_valid():
+            raise NotCompilable()
+        queryset = filterset.qs
+
+    start = 0
+    if args.get("after") is not None:
+        after = cursor_to_offset(args["after"])
+        if after is None:
+            raise NotCompilable()
+        start = after + 1
+    if args.get("offset"):
+        start += args["offset"]
+
+    node_fields, selections = [], []
+    for key, fields in group_fields(field_nodes, info).items():
+        name = fields[0].name.value
+        if name == "edges":
+            edge_selections = []
+            for edge_key, edge_fields in group_fields(fields, info).items():
+                edge_name = edge_fields[0].name.value
+                if edge_name == "node":
+                    node_fields.extend(edge_fields)
+                elif edge_name not in ("cursor", "__typename"):
+                    raise NotCompilable()
+                edge_selections.append((edge_key, edge_name))
+            selections.append((key, name, edge_selections))
+        elif name == "pageInfo":
+            selections.append((key, name, [(info_key, info_fields[0].name.value) for info_key, info_fields in group_fields(fields, info).items()]))
+        elif name != "__typename":
+            raise NotCompilable()
+    expressions, node_plan = compile_node(node_type, node_fields, info)
+    if not queryset.ordered:
+        # the rows of a page must not depend on the plan of the statement
+        queryset = queryset.order_by("pk")
+    queryset = queryset.values(**{JSON_COLUMN: JSONObject(**expressions)})[start:start + size + 1]
+    return queryset, ConnectionPlan(start, size, node_plan, selections)
+
+
+def build_node(plan: NodePlan, values: Dict[str, Any], connection) -> graphene.ObjectType:
+    """
+    Returns an instance of the object type of the plan holding the values of the compiled JSON object.
+    """
+    compiled = {}
+    for key, kind, converter in plan.selections:
+        value = values.get(key)
+        if kind == "id":
+            compiled[key] = plan.object_type._meta.fields["id"].node.to_global_id(plan.object_type._meta.name, converter(value, connection))
+        elif kind == "scalar":
+            compiled[key] = converter(value, connection)
+        elif kind == "node":
+            compiled[key] = None if value is None else build_node(converter, value, connection)
+        else:
+            compiled[key] = build_connection(converter, value or [], connection)
+    node = object.__new__(plan.object_type)
+    node.__dict__[COMPILED_ATTRIBUTE] = compiled
+    return node
+
+
+def build_connection(plan: ConnectionPlan, rows: List[Dict[str, Any]], connection) -> CompiledValue:
+    """
+    Returns the connection of the JSON objects of a compiled page, whose pagination matches that of graphql_relay for forward pagination.
+    """
+    has_next_page = len(rows) > plan.size
+    nodes = [build_node(plan.node, row, connection) for row in rows[:plan.size]]
+    cursors = [offset_to_cursor(plan.start + index) for index in range(len(nodes))]
+    compiled = {}
+    for key, name, selections in plan.selections:
+        if name == "edges":
+            compiled[key] = [
+                CompiledValue({edge_key: node if edge_name == "node" else cursor for edge_key, edge_name in selections if edge_name != "__typename"})
+                for node, cursor in zip(nodes, cursors)
+            ]
+        else:
+            page_info = {
+                "hasNextPage": has_next_page,
+                "hasPreviousPage": False,
+                "startCursor": cursors[0] if cursors else None,
+                "endCursor": cursors[-1] if cursors else None,
+            }
+            compiled[key] = CompiledValue({info_key: page_info[info_name] for info_key, info_name in selections if info_name in page_info})
+    return CompiledValue(compiled)
+
+
+def execute_compiled(queryset: models.QuerySet, plan: ConnectionPlan) -> CompiledValue:
+    """
+    Executes the compiled queryset of a root connection as a single statement returning the JSON array of its page.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor not in ARRAY_TEMPLATES:
+        raise NotCompilable()
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(ARRAY_TEMPLATES[connection.vendor].replace("%(subquery)s", sql), params)
+        rows = cursor.fetchone()[0]
+    return build_connection(plan, json.loads(rows) if isinstance(rows, str) else rows, connection)
+
+
+@lru_cache(maxsize=None)
+def get_root_connection_field(query_type: Type[graphene.ObjectType], field_name: str) -> Optional[DjangoConnectionField]:
+    """
+    Returns the connection field of the query type named `field_name` in the schema, if it is resolved by the default resolver.
+    """
+    for name, field in query_type._meta.fields.items():
+        if (getattr(field, "name", None) or to_camel_case(name)) == field_name:
+            if isinstance(field, DjangoConnectionField) and field.resolver is None and not hasattr(query_type, f"resolve_{name}"):
+                return field
+            return None
+    return None
+
+
+def compile_root_connection(info: graphene.ResolveInfo, args: Dict[str, Any]) -> CompiledValue:
+    """
+    Compiles and executes a root connection field of a query operation, e.g. `author`, and its whole selection tree.
+
+    Raises:
+        NotCompilable: if the field or one of its selections cannot be compiled
+    """
+    if info.operation.operation != OperationType.QUERY or info.parent_type is not info.schema.query_type:
+        raise NotCompilable()
+    if get_connection_node_type(info.return_type) is None:
+        raise NotCompilable()
+    connection_field = get_root_connection_field(info.parent_type.graphene_type, info.field_name)
+    # the sync connections return the watermark of the page and the tombstones
+    if connection_field is None or isinstance(connection_field, SyncConnectionFieldMixin):
+        raise NotCompilable()
+    queryset, plan = compile_connection(connection_field, get_queryset(connection_field.node_type, info), args, info.field_nodes, info)
+    return execute_compiled(queryset, plan)
+
+
+class JSONAggregationMiddleware:
+    """
+    An experimental graphene middleware that compiles the root connections of query operations, with their whole selection tree,
+    into a single SQL statement: the related objects and connections are correlated subqueries building JSON objects and arrays,
+    filtered by the `get_queryset` of their node types and by the filtersets of the connections. It supports SQLite and PostgreSQL.
+    The fields of the compiled result are resolved from it. Root connections that select a field with a custom resolver,
+    directives, backward pagination, or a field that is not a model field are executed normally.
+    """
+
+    def resolve(self, next, root, info: graphene.ResolveInfo, **args):
+        compiled = getattr(root, COMPILED_ATTRIBUTE, None)
+        if compiled is not None:
+            if info.field_name == "__typename":
+                return next(root, info, **args)
+            return compiled[info.path.key]
+        if info.path.prev is None:
+            try:
+                return compile_root_connection(info, args)
+            except NotCompilable:
+                pass
+        return next(root, info, **args)
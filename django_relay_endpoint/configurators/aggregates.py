@@ -0,0 +1,227 @@
+from collections import OrderedDict
+from typing import Any, Dict, List, Type
+import graphene
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.db.models import Avg, Count, Max, Min, Sum
+from graphene.types.argument import to_arguments
+from graphene.utils.str_converters import to_snake_case
+from graphene_django.converter import convert_django_field
+from graphene_django.filter import DjangoFilterConnectionField
+from graphene_django.filter.fields import convert_enum
+from graphene_django.registry import get_global_registry
+from graphene_django.settings import graphene_settings
+from graphql_relay import to_global_id
+from django_relay_endpoint.configurators.annotations import iterate_field_names
+from django_relay_endpoint.configurators.object_types import DjangoObjectType
+
+
+AGGREGATE_FUNCTIONS = {
+    "sum": Sum,
+    "avg": Avg,
+    "min": Min,
+    "max": Max,
+}
+
+NUMERIC_FIELDS = (models.IntegerField, models.FloatField, models.DecimalField, models.DurationField)
+
+
+def get_field_scalar(model_field: models.Field) -> Type[graphene.Scalar]:
+    """
+    Returns the type of a model field on the DjangoObjectTypes, e.g. the enum of a field with choices, converted once by the registry.
+    """
+    registry = get_global_registry()
+    converted = registry.get_converted_field(model_field) or convert_django_field(model_field, registry)
+    return converted.get_type()
+
+
+def get_aggregate_scalar(model_field: models.Field, function: str) -> Type[graphene.Scalar]:
+    """
+    Returns the scalar of an aggregate of a model field: that of the field, or Float for the average of a field that is not a decimal.
+    """
+    if function == "avg" and not isinstance(model_field, models.DecimalField):
+        return graphene.Float
+    return get_field_scalar(model_field)
+
+
+def configure_aggregate_types(
+        model: Type[models.Model],
+        conventional_name: str,
+        aggregate_fields: List[str],
+        group_by: List[str],
+) -> Type[graphene.ObjectType]:
+    """
+    Configures the <conventional_name>Aggregate object type: the `count` of the records, the `sum`, `avg`, `min` and `max` of the aggregate fields,
+    and the `groups` of the records by the group by fields, each with its `key` and aggregates.
+    """
+    model_fields = {name: model._meta.get_field(name) for name in [*aggregate_fields, *group_by]}
+    attrs = {"count": graphene.Int(required=True)}
+    for function in AGGREGATE_FUNCTIONS if aggregate_fields else []:
+        values_type = type(f"{conventional_name}Aggregate{function.capitalize()}", (graphene.ObjectType,), {
+            name: graphene.Field(get_aggregate_scalar(model_fields[name], function)) for name in aggregate_fields
+        })
+        attrs[function] = graphene.Field(values_type, required=True)
+    if not group_by:
+        return type(f"{conventional_name}Aggregate", (graphene.ObjectType,), attrs)
+
+    key_type = type(f"{conventional_name}AggregateKey", (graphene.ObjectType,), {
+        name: graphene.ID() if model_fields[name].is_relation else graphene.Field(get_field_scalar(model_fields[name]))
+        for name in group_by
+    })
+    group_type = type(f"{conventional_name}AggregateGroup", (graphene.ObjectType,), {
+        "key": graphene.Field(key_type, required=True),
+        **attrs,
+    })
+    return type(f"{conventional_name}Aggregate", (graphene.ObjectType,), {
+        **attrs,
+        "groups": graphene.List(graphene.NonNull(group_type), description="The groups of the `group_by` argument"),
+    })
+
+
+def get_aggregates(aggregate_fields: List[str]) -> Dict[str, Any]:
+    """
+    Returns the aggregate expressions by alias, e.g. `sum_price`.
+    """
+    aggregates = {"count": Count("pk")}
+    for function, aggregate in AGGREGATE_FUNCTIONS.items():
+        for name in aggregate_fields:
+            aggregates[f"{function}_{name}"] = aggregate(name)
+    return aggregates
+
+
+def read_aggregates(row: Dict[str, Any], aggregate_fields: List[str]) -> Dict[str, Any]:
+    """
+    Returns the aggregates of a row of `aggregate` or `values().annotate()` by function and field name.
+    """
+    result = {"count": row["count"]}
+    for function in AGGREGATE_FUNCTIONS if aggregate_fields else []:
+        result[function] = {name: row[f"{function}_{name}"] for name in aggregate_fields}
+    return result
+
+
+class AggregateField(graphene.Field):
+    """
+    A root field aggregating the records of a DjangoObjectType in the database.
+    It takes the filter arguments of the connection of the type, and a `group_by` argument if group by fields are declared.
+    The records are filtered by `get_queryset` of the type, i.e. its permissions, and by the filterset of the connection,
+    then the totals are computed with one `aggregate` query if they are selected, and the groups with one `values().annotate()` query.
+    At most `max_groups` groups are returned, ordered by their key.
+
+    Args:
+        django_object_type (Type[DjangoObjectType]): the object type whose records are aggregated
+        conventional_name (str): the conventional name prefixed to the names of the aggregate types
+        aggregate_fields (List[str]): the numeric fields of the model that are summed, averaged, and whose minimum and maximum are computed
+        group_by (List[str]): the fields of the model the records can be grouped by
+        asynchronous (bool): whether the field is resolved with the async ORM
+        max_groups (int): the maximum number of groups returned. Defaults to graphene_django's RELAY_CONNECTION_MAX_LIMIT.
+    """
+
+    def __init__(
+            self,
+            django_object_type: Type[DjangoObjectType],
+            conventional_name: str,
+            aggregate_fields: List[str],
+            group_by: List[str],
+            asynchronous: bool = False,
+            max_groups: int = None,
+            **kwargs,
+    ) -> None:
+        model = django_object_type._meta.model
+        for name in aggregate_fields:
+            model_field = model._meta.get_field(name)
+            if not isinstance(model_field, NUMERIC_FIELDS):
+                raise AssertionError(f"{model.__name__}.{name} is not a numeric field and cannot be aggregated")
+        for name in group_by:
+            model_field = model._meta.get_field(name)
+            if not model_field.concrete or model_field.many_to_many:
+                raise AssertionError(f"{model.__name__} cannot be grouped by {name}, which is not a concrete field")
+        self.django_object_type = django_object_type
+        self.aggregate_fields = aggregate_fields
+        self.group_by = group_by
+        self.max_groups = max_groups or graphene_settings.RELAY_CONNECTION_MAX_LIMIT
+        # the connection field of the type provides the filterset and the filter arguments
+        self.connection_field = DjangoFilterConnectionField(django_object_type)
+        aggregate_type = configure_aggregate_types(model, conventional_name, aggregate_fields, group_by)
+        if group_by:
+            group_by_enum = graphene.Enum(f"{conventional_name}AggregateGroupBy", [(name.upper(), name) for name in group_by])
+            kwargs["group_by"] = graphene.List(graphene.NonNull(group_by_enum))
+        kwargs["resolver"] = self.aresolve if asynchronous else self.resolve
+        super().__init__(aggregate_type, **kwargs)
+
+    @property
+    def args(self):
+        return to_arguments(self._base_args or OrderedDict(), self.connection_field.filtering_args)
+
+    @args.setter
+    def args(self, args):
+        self._base_args = args
+
+    def filter(self, queryset: models.QuerySet, info: graphene.ResolveInfo, args: Dict[str, Any]) -> models.QuerySet:
+        """
+        Filters the queryset by the filterset of the connection of the type, as DjangoFilterConnectionField does.
+        """
+        filtering_args = self.connection_field.filtering_args
+        data = {}
+        for name, value in args.items():
+            if name in filtering_args:
+                if name == "order_by" and value is not None:
+                    value = to_snake_case(value)
+                data[name] = convert_enum(value)
+        filterset = self.connection_field.filterset_class(data=data, queryset=queryset, request=info.context)
+        if not filterset.is_valid():
+            raise ValidationError(filterset.form.errors.as_json())
+        # the ordering does not apply to aggregates and would split the groups
+        return filterset.qs.order_by()
+
+    def get_group_by(self, args: Dict[str, Any]) -> List[str]:
+        return [getattr(name, "value", name) for name in args.get("group_by") or []]
+
+    @staticmethod
+    def selects_totals(info: graphene.ResolveInfo) -> bool:
+        """
+        Whether the operation selects the totals, otherwise only the groups are fetched.
+        """
+        totals = {"count", *AGGREGATE_FUNCTIONS}
+        return any(
+            name in totals for field_node in info.field_nodes for name in iterate_field_names(field_node.selection_set, info.fragments)
+        )
+
+    def groups_queryset(self, queryset: models.QuerySet, group_by: List[str]) -> models.QuerySet:
+        return queryset.values(*group_by).annotate(**get_aggregates(self.aggregate_fields)).order_by(*group_by)[:self.max_groups]
+
+    def read_group(self, row: Dict[str, Any], group_by: List[str]) -> Dict[str, Any]:
+        model = self.django_object_type._meta.model
+        key = {}
+        for name in group_by:
+            model_field = model._meta.get_field(name)
+            value = row[name]
+            if model_field.is_relation and value is not None:
+                related_type = get_global_registry().get_type_for_model(model_field.related_model)
+                value = to_global_id(related_type._meta.name, value) if related_type else value
+            key[name] = value
+        return {"key": key, **read_aggregates(row, self.aggregate_fields)}
+
+    def resolve(self, root, info: graphene.ResolveInfo, **args) -> Dict[str, Any]:
+        model = self.django_object_type._meta.model
+        queryset = self.filter(self.django_object_type.get_queryset(model._default_manager.get_queryset(), info), info, args)
+        result = {}
+        if self.selects_totals(info):
+            result = read_aggregates(queryset.aggregate(**get_aggregates(self.aggregate_fields)), self.aggregate_fields)
+        group_by = self.get_group_by(args)
+        if group_by:
+            result["groups"] = [self.read_group(row, group_by) for row in self.groups_queryset(queryset, group_by)]
+        return result
+
+    async def aresolve(self, root, info: graphene.ResolveInfo, **args) -> Dict[str, Any]:
+        """
+        The async counterpart of `resolve`, with the async ORM.
+        """
+        model = self.django_object_type._meta.model
+        queryset = self.filter(await self.django_object_type.aget_queryset(model._default_manager.get_queryset(), info), info, args)
+        result = {}
+        if self.selects_totals(info):
+            result = read_aggregates(await queryset.aaggregate(**get_aggregates(self.aggregate_fields)), self.aggregate_fields)
+        group_by = self.get_group_by(args)
+        if group_by:
+            result["groups"] = [self.read_group(row, group_by) async for row in self.groups_queryset(queryset, group_by)]
+        return result
@@ -0,0 +1,173 @@
+from copy import copy
+from typing import Any, Dict, Iterator, List, Optional, Set, Type, Union
+import graphene
+from django.db import models
+from django_filters import FilterSet, OrderingFilter
+from django_filters.constants import EMPTY_VALUES
+from graphene.utils.str_converters import to_camel_case
+from graphene_django.converter import convert_django_field
+from graphql import FieldNode, FragmentDefinitionNode, InlineFragmentNode, OperationType, SelectionSetNode
+from django_relay_endpoint.cost import get_connection_node_type
+
+
+def get_annotation_output_field(model: Type[models.Model], name: str, expression: Any) -> models.Field:
+    """
+    Returns the output field of an annotation of the model, resolved as `annotate` does, without querying the database.
+
+    Raises:
+        AssertionError: if the name is a field of the model or the output field cannot be resolved
+    """
+    field_names = {field.name for field in model._meta.get_fields()} | {field.attname for field in model._meta.concrete_fields}
+    if name in field_names:
+        raise AssertionError(f"The annotation '{name}' conflicts with a field of {model.__name__}")
+    try:
+        return model._default_manager.annotate(**{name: expression}).query.annotations[name].output_field
+    except Exception as e:
+        raise AssertionError(f"The output field of the annotation '{name}' of {model.__name__} cannot be resolved: {e}")
+
+
+def configure_annotation_field(model: Type[models.Model], name: str, expression: Any, asynchronous: bool = False) -> graphene.Field:
+    """
+    Returns the nullable graphene field of an annotation, typed by the conversion of its output field for DjangoObjectType.
+    The field resolves the annotated value, or fetches it with one query for a node fetched without the annotation,
+    e.g. the node returned by a mutation.
+    """
+    output_field = get_annotation_output_field(model, name, expression)
+
+    def resolve_annotation(root, info):
+        if name in root.__dict__:
+            return root.__dict__[name]
+        queryset = model._default_manager.filter(pk=root.pk).annotate(**{name: expression}).values_list(name, flat=True)
+        return queryset.afirst() if asynchronous else queryset.first()
+
+    return graphene.Field(convert_django_field(output_field).get_type(), resolver=resolve_annotation)
+
+
+def iterate_field_names(selection_set: Optional[SelectionSetNode], fragments: Dict[str, FragmentDefinitionNode]) -> Iterator[str]:
+    """
+    Iterates the names of the fields of the selection set, including those of its fragments and those with directives.
+    """
+    for selection in selection_set.selections if selection_set else []:
+        if isinstance(selection, FieldNode):
+            yield selection.name.value
+        elif isinstance(selection, InlineFragmentNode):
+            yield from iterate_field_names(selection.selection_set, fragments)
+        elif selection.name.value in fragments:
+            yield from iterate_field_names(fragments[selection.name.value].selection_set, fragments)
+
+
+def iterate_node_selection_sets(info: graphene.ResolveInfo) -> Iterator[SelectionSetNode]:
+    """
+    Iterates the selection sets of the nodes of the field being resolved: those of `edges { node }` for a connection,
+    those of the field otherwise, e.g. a foreign key or the `node` root field.
+    """
+    connection = get_connection_node_type(info.return_type) is not None
+    for field_node in info.field_nodes:
+        if not connection:
+            yield field_node.selection_set
+            continue
+        for edges in field_node.selection_set.selections if field_node.selection_set else []:
+            if isinstance(edges, FieldNode) and edges.name.value == "edges":
+                for node in edges.selection_set.selections if edges.selection_set else []:
+                    if isinstance(node, FieldNode) and node.name.value == "node":
+                        yield node.selection_set
+
+
+def get_selected_annotations(info: graphene.ResolveInfo, annotations: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Returns the annotations whose fields the nodes of a query operation select.
+    """
+    if not annotations or info.operation.operation != OperationType.QUERY:
+        return {}
+    names = {to_camel_case(name): name for name in annotations}
+    selected: Set[str] = set()
+    for selection_set in iterate_node_selection_sets(info):
+        selected.update(names[field_name] for field_name in iterate_field_names(selection_set, info.fragments) if field_name in names)
+    return {name: expression for name, expression in annotations.items() if name in selected}
+
+
+def annotate_selected(queryset: models.QuerySet, info: graphene.ResolveInfo, annotations: Dict[str, Any]) -> models.QuerySet:
+    """
+    Annotates the queryset with the selected annotations, see `get_selected_annotations`.
+    """
+    selected = get_selected_annotations(info, annotations)
+    if not selected:
+        return queryset
+    # get_queryset may be given a manager
+    queryset = queryset.all()
+    missing = {name: expression for name, expression in selected.items() if name not in queryset.query.annotations}
+    return queryset.annotate(**missing) if missing else queryset
+
+
+class AnnotationFilterSetMixin:
+    """
+    A FilterSet mixin that annotates the queryset with the `annotations` its filters and ordering use, before filtering.
+    """
+    annotations: Dict[str, Any] = {}
+
+    def filter_queryset(self, queryset: models.QuerySet) -> models.QuerySet:
+        names = set()
+        for filter_name, value in self.form.cleaned_data.items():
+            if value in EMPTY_VALUES:
+                continue
+            filter = self.filters[filter_name]
+            if isinstance(filter, OrderingFilter):
+                names.update(filter.get_ordering_value(param).lstrip("-") for param in value)
+            else:
+                names.add(filter.field_name.split("__")[0])
+        missing = {
+            name: expression for name, expression in self.annotations.items()
+            if name in names and name not in queryset.query.annotations
+        }
+        if missing:
+            queryset = queryset.annotate(**missing)
+        return super().filter_queryset(queryset)
+
+
+def configure_annotation_filterset(
+        model: Type[models.Model],
+        conventional_name: str,
+        annotations: Dict[str, Any],
+        filter_fields: Union[Dict[str, List[str]], List[str]] = {},
+        filterset_class: Type[FilterSet] = None,
+) -> Optional[Type[FilterSet]]:
+    """
+    Configures a FilterSet class named <conventional_name>FilterSet that annotates the queryset with the annotations it filters or orders by.
+    It extends filterset_class, or declares the filters of filter_fields, whose annotation entries are filtered with the lookups
+    of the output field of the annotation. Unless filterset_class declares an `order_by` filter, the `order_by` argument
+    is an OrderingFilter over the annotations.
+
+    Returns:
+        Optional[Type[FilterSet]]: the FilterSet class, or None if there are no annotations
+    """
+    if not annotations:
+        return None
+    ordering = {"order_by": OrderingFilter(fields=tuple(annotations))}
+    if filterset_class:
+        if "order_by" in filterset_class.base_filters:
+            ordering = {}
+        return type(f"{conventional_name}FilterSet", (AnnotationFilterSetMixin, filterset_class), {"annotations": annotations, **ordering})
+    if not isinstance(filter_fields, dict):
+        filter_fields = {name: ["exact"] for name in filter_fields}
+    attrs = {
+        "annotations": annotations,
+        **ordering,
+        "Meta": type("Meta", (), {
+            "model": model,
+            "fields": {name: lookups for name, lookups in filter_fields.items() if name not in annotations},
+        }),
+    }
+    for name, lookups in filter_fields.items():
+        if name not in annotations:
+            continue
+        # django_filters resolves the lookups of a field against its model
+        output_field = copy(get_annotation_output_field(model, name, annotations[name]))
+        output_field.model, output_field.name = model, name
+        form_field = output_field.formfield()
+        for lookup in lookups:
+            filter_name = name if lookup == "exact" else f"{name}__{lookup}"
+            attrs[filter_name] = FilterSet.filter_for_field(output_field, name, lookup)
+            if form_field is not None and lookup not in ("isnull", "in", "range"):
+                # e.g. an Int argument for a count instead of the Decimal of NumberFilter
+                attrs[filter_name].field_class = type(form_field)
+    return type(f"{conventional_name}FilterSet", (AnnotationFilterSetMixin, FilterSet), attrs)
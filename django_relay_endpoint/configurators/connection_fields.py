@@ -0,0 +1,313 @@
+from base64 import b64encode
+from functools import lru_cache, partial
+from inspect import isawaitable
+from typing import Dict, Iterator, List, Optional, Tuple, Type
+import graphene
+from django.core.exceptions import ValidationError
+from django.db.models.query import QuerySet, ValuesListIterable
+from graphene.utils.str_converters import to_camel_case, to_snake_case
+from graphene.relay.connection import connection_adapter, page_info_adapter
+from graphene_django.filter import DjangoFilterConnectionField
+from graphene_django.filter.fields import convert_enum
+from graphene_django.utils import maybe_queryset
+from graphql import FieldNode, FragmentDefinitionNode, InlineFragmentNode, SelectionSetNode
+from graphql_relay import connection_from_array_slice, cursor_to_offset, get_offset_with_default, offset_to_cursor
+from django_relay_endpoint.configurators.json_paths import JSONPathField
+
+
+class AsyncDjangoFilterConnectionField(DjangoFilterConnectionField):
+    """
+    A DjangoFilterConnectionField that resolves the connection with Django's async ORM.
+    Permissions are checked by the `aget_queryset` classmethod of the node type,
+    the total count is fetched with `acount` and only the requested page is fetched with async iteration.
+    """
+
+    @classmethod
+    async def aresolve_queryset(cls, connection, iterable, info, args, filtering_args, filterset_class):
+        """
+        The async counterpart of `DjangoFilterConnectionField.resolve_queryset`.
+        """
+        def filter_kwargs():
+            kwargs = {}
+            for k, v in args.items():
+                if k in filtering_args:
+                    if k == "order_by" and v is not None:
+                        v = to_snake_case(v)
+                    kwargs[k] = convert_enum(v)
+            return kwargs
+
+        qs = await connection._meta.node.aget_queryset(iterable, info)
+
+        # the filterset only builds the queryset, it does not hit the database
+        filterset = filterset_class(data=filter_kwargs(), queryset=qs, request=info.context)
+        if filterset.is_valid():
+            return filterset.qs
+        raise ValidationError(filterset.form.errors.as_json())
+
+    @classmethod
+    async def aresolve_connection(cls, connection, args, iterable, max_limit=None):
+        """
+        The async counterpart of `DjangoConnectionField.resolve_connection`, which fetches only the requested page.
+        """
+        iterable = maybe_queryset(iterable)
+        if not isinstance(iterable, QuerySet):
+            return cls.resolve_connection(connection, args, iterable, max_limit=max_limit)
+
+        # Remove the offset parameter and convert it to an after cursor.
+        offset = args.pop("offset", None)
+        after = args.get("after")
+        if offset:
+            if after:
+                offset += cursor_to_offset(after) + 1
+            # input offset starts at 1 while the graphene offset starts at 0
+            args["after"] = offset_to_cursor(offset - 1)
+
+        if max_limit is not None and args.get("first", None) is None and args.get("last", None) is None:
+            args["first"] = max_limit
+
+        array_length = await iterable.acount()
+
+        # compute the page the same way connection_from_array_slice does
+        start_offset = 0
+        end_offset = array_length
+        after_offset = get_offset_with_default(args.get("after"), -1)
+        if 0 <= after_offset < array_length:
+            start_offset = after_offset + 1
+        before_offset = get_offset_with_default(args.get("before"), end_offset)
+        if 0 <= before_offset < array_length:
+            end_offset = min(end_offset, before_offset)
+        if isinstance(args.get("first"), int):
+            end_offset = min(end_offset, start_offset + args["first"])
+        if isinstance(args.get("last"), int):
+            start_offset = max(start_offset, end_offset - args["last"])
+
+        page = [node async for node in iterable[start_offset:max(start_offset, end_offset)]]
+
+        connection = connection_from_array_slice(
+            page,
+            args,
+            slice_start=start_offset,
+            array_length=array_length,
+            array_slice_length=len(page),
+            connection_type=partial(connection_adapter, connection),
+            edge_type=connection.Edge,
+            page_info_type=page_info_adapter,
+        )
+        connection.iterable = iterable
+        connection.length = array_length
+        return connection
+
+    @classmethod
+    async def connection_resolver(
+        cls,
+        resolver,
+        connection,
+        default_manager,
+        queryset_resolver,
+        max_limit,
+        enforce_first_or_last,
+        root,
+        info,
+        **args,
+    ):
+        first = args.get("first")
+        last = args.get("last")
+
+        if enforce_first_or_last:
+            assert first or last, (
+                "You must provide a `first` or `last` value to properly paginate the `{}` connection."
+            ).format(info.field_name)
+
+        if max_limit:
+            if first:
+                assert first <= max_limit, (
+                    "Requesting {} records on the `{}` connection exceeds the `first` limit of {} records."
+                ).format(first, info.field_name, max_limit)
+            if last:
+                assert last <= max_limit, (
+                    "Requesting {} records on the `{}` connection exceeds the `last` limit of {} records."
+                ).format(last, info.field_name, max_limit)
+
+        if args.get("offset") is not None:
+            assert args.get("before") is None, (
+                "You can't provide a `before` value at the same time as an `offset` value to properly paginate the `{}` connection."
+            ).format(info.field_name)
+
+        iterable = resolver(root, info, **args)
+        if isawaitable(iterable):
+            iterable = await iterable
+        if iterable is None:
+            iterable = default_manager
+        iterable = await queryset_resolver(connection, iterable, info, args)
+        return await cls.aresolve_connection(connection, args, iterable, max_limit=max_limit)
+
+    def get_queryset_resolver(self):
+        return partial(
+            self.aresolve_queryset,
+            filterset_class=self.filterset_class,
+            filtering_args=self.filtering_args,
+        )
+
+
+class NodeValuesIterable(ValuesListIterable):
+    """
+    Yields instances of `object_type` built from the rows of `values_list`, without instantiating the models.
+    `names` are the attribute names of the columns, the first one is `pk`, which `resolve_id` of the object type reads.
+    If `global_id_prefix` is set, i.e. the nodes select `id`, the global ids are encoded from it and the primary keys
+    in one pass over the rows and stored as `_global_id`, which `ValuesGlobalID` returns.
+    """
+    object_type: Type[graphene.ObjectType] = None
+    names: Tuple[str, ...] = ()
+    global_id_prefix: Optional[bytes] = None
+
+    def __iter__(self):
+        object_type, names, prefix = self.object_type, self.names, self.global_id_prefix
+        new = object.__new__
+        for values in super().__iter__():
+            node = new(object_type)
+            node.__dict__.update(zip(names, values))
+            if prefix is not None:
+                node._global_id = b64encode(prefix + str(values[0]).encode()).decode("ascii")
+            yield node
+
+
+@lru_cache(maxsize=None)
+def get_node_values_iterable(object_type: Type[graphene.ObjectType], names: Tuple[str, ...], global_ids: bool = False) -> Type[NodeValuesIterable]:
+    """
+    Returns the NodeValuesIterable subclass of the object type, the names and whether it encodes the global ids, created once,
+    so that it is carried by the clones of the queryset.
+    """
+    return type(f"{object_type.__name__}ValuesIterable", (NodeValuesIterable,), {
+        "object_type": object_type,
+        "names": names,
+        # the global id of graphql_relay's to_global_id, i.e. base64 of '<type name>:<primary key>'
+        "global_id_prefix": f"{object_type._meta.name}:".encode() if global_ids else None,
+    })
+
+
+class ValuesGlobalID(graphene.GlobalID):
+    """
+    The `id` field of the object types with the values fast path, which returns the global id encoded by NodeValuesIterable,
+    or encodes it as graphene.GlobalID does for model instances.
+    """
+
+    @staticmethod
+    def id_resolver(parent_resolver, node, root, info, parent_type_name=None, **args):
+        global_id = getattr(root, "_global_id", None)
+        if global_id is not None:
+            return global_id
+        return graphene.GlobalID.id_resolver(parent_resolver, node, root, info, parent_type_name, **args)
+
+
+@lru_cache(maxsize=None)
+def get_values_fields(object_type: Type[graphene.ObjectType]) -> Dict[str, str]:
+    """
+    Returns the scalar fields of the object type that are concrete, non relational fields of its model resolved by the default resolver,
+    by their names in the schema and their python names.
+    """
+    model = object_type._meta.model
+    concrete_fields = {model_field.name for model_field in model._meta.concrete_fields if not model_field.is_relation}
+    values_fields = {}
+    for name, field in object_type._meta.fields.items():
+        if name not in concrete_fields or hasattr(object_type, f"resolve_{name}"):
+            continue
+        # the JSON fields resolve their `path` from the fetched value
+        if getattr(field, "resolver", None) is not None and not isinstance(field, JSONPathField):
+            continue
+        values_fields[getattr(field, "name", None) or to_camel_case(name)] = name
+        values_fields[name] = name
+    return values_fields
+
+
+class UnsupportedSelection(Exception):
+    pass
+
+
+def iterate_fields(selection_set: Optional[SelectionSetNode], fragments: Dict[str, FragmentDefinitionNode]) -> Iterator[FieldNode]:
+    """
+    Iterates the fields of the selection set, including those of its fragments.
+
+    Raises:
+        UnsupportedSelection: if a selection has directives, e.g. @include
+    """
+    for selection in selection_set.selections if selection_set else []:
+        if selection.directives:
+            raise UnsupportedSelection()
+        if isinstance(selection, FieldNode):
+            yield selection
+        elif isinstance(selection, InlineFragmentNode):
+            yield from iterate_fields(selection.selection_set, fragments)
+        else:
+            fragment = fragments[selection.name.value]
+            if fragment.directives:
+                raise UnsupportedSelection()
+            yield from iterate_fields(fragment.selection_set, fragments)
+
+
+def get_values_names(object_type: Type[graphene.ObjectType], info: graphene.ResolveInfo) -> Optional[Tuple[List[str], bool]]:
+    """
+    Returns the python names of the fields the connection selects on its nodes and whether it selects `id`,
+    if they are all values fields, `id` or `__typename`, otherwise None.
+    """
+    values_fields = get_values_fields(object_type)
+    names = []
+    selects_id = False
+    try:
+        for connection_node in info.field_nodes:
+            for edges in iterate_fields(connection_node.selection_set, info.fragments):
+                if edges.name.value != "edges":
+                    continue
+                for node in iterate_fields(edges.selection_set, info.fragments):
+                    if node.name.value != "node":
+                        continue
+                    for field in iterate_fields(node.selection_set, info.fragments):
+                        name = field.name.value
+                        if name == "id":
+                            selects_id = True
+                            continue
+                        if name == "__typename":
+                            continue
+                        if name not in values_fields:
+                            return None
+                        if values_fields[name] not in names:
+                            names.append(values_fields[name])
+    except UnsupportedSelection:
+        return None
+    return names, selects_id
+
+
+def values_queryset(queryset: QuerySet, object_type: Type[graphene.ObjectType], info: graphene.ResolveInfo) -> QuerySet:
+    """
+    Returns a `values_list` queryset of the primary key and the selected columns that yields light instances of the object type,
+    if the connection selects only values fields on its nodes, otherwise the queryset.
+    """
+    selection = get_values_names(object_type, info)
+    if selection is None:
+        return queryset
+    names, selects_id = selection
+    queryset = queryset.prefetch_related(None).values_list("pk", *names)
+    queryset._iterable_class = get_node_values_iterable(object_type, ("pk", *names), selects_id)
+    return queryset
+
+
+class ValuesDjangoFilterConnectionField(DjangoFilterConnectionField):
+    """
+    A DjangoFilterConnectionField that fetches the selected columns with `values_list` instead of instantiating the models,
+    when the nodes select only scalar fields of the model, `id` and `__typename`, see `values_queryset`.
+    """
+
+    @classmethod
+    def resolve_queryset(cls, connection, iterable, info, args, filtering_args, filterset_class):
+        queryset = super().resolve_queryset(connection, iterable, info, args, filtering_args, filterset_class)
+        return values_queryset(queryset, connection._meta.node, info)
+
+
+class AsyncValuesDjangoFilterConnectionField(AsyncDjangoFilterConnectionField):
+    """
+    The async counterpart of ValuesDjangoFilterConnectionField.
+    """
+
+    @classmethod
+    async def aresolve_queryset(cls, connection, iterable, info, args, filtering_args, filterset_class):
+        queryset = await super().aresolve_queryset(connection, iterable, info, args, filtering_args, filterset_class)
+        return values_queryset(queryset, connection._meta.node, info)
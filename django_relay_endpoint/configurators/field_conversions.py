@@ -4,7 +4,8 @@ from django import forms
 import graphene
 from graphene_file_upload.scalars import Upload
 from graphene.types.generic import GenericScalar  # Use this for json-field instead of graphene.JSONField which keeps the data as string
-from typing import Type, Dict
+from threading import Lock
+from typing import Type, Dict, Union
 
 
 MODEL_TO_FORM_FIELD = {
@@ -72,6 +73,94 @@ MODEL_TO_SCALAR = {
 }
 
 
+class ConversionRegistry:
+    """
+    Resolves model field classes to graphene scalars and django form field classes.
+    The resolution walks the MRO of the model field class, so subclassed fields (e.g. `class EncryptedCharField(models.CharField)`)
+    are converted like their closest registered ancestor instead of falling back to the generic conversions.
+    The result is cached per model field class, registering a conversion clears the cache.
+    """
+
+    def __init__(self, scalars: Dict[Type[models.Field], Type[graphene.Scalar]], form_fields: Dict[Type[models.Field], Type[forms.Field]]) -> None:
+        self.scalars = scalars
+        self.form_fields = form_fields
+        self.scalar_cache: Dict[Type[models.Field], Union[Type[graphene.Scalar], None]] = {}
+        self.form_field_cache: Dict[Type[models.Field], Union[Type[forms.Field], None]] = {}
+        # the statistics of the caches, exposed by the metrics
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.statistics_lock = Lock()
+
+    def register(
+            self,
+            model_field_class: Type[models.Field],
+            scalar: Type[graphene.Scalar] = None,
+            form_field: Type[forms.Field] = None,
+            output: bool = False,
+            ) -> None:
+        """
+        Registers the conversion of a model field class and its subclasses.
+
+        Args:
+            model_field_class (Type[models.Field]): the model field class
+            scalar (Type[graphene.Scalar], optional): the graphene scalar used for inputs. Defaults to None.
+            form_field (Type[forms.Field], optional): the form field class that cleans the inputed data. Defaults to None.
+            output (bool, optional): also register the scalar with graphene_django for the fields of DjangoObjectType. Defaults to False.
+        """
+        if scalar:
+            self.scalars[model_field_class] = scalar
+        if form_field:
+            self.form_fields[model_field_class] = form_field
+        if scalar and output:
+            from graphene_django.converter import convert_django_field, get_django_field_description
+
+            @convert_django_field.register(model_field_class)
+            def convert_field_to_scalar(field, registry=None):
+                return scalar(description=get_django_field_description(field), required=not field.null)
+        self.scalar_cache.clear()
+        self.form_field_cache.clear()
+
+    def resolve(self, table: dict, cache: dict, model_field_class: Type[models.Field]):
+        """
+        Returns the conversion of the closest class in the MRO of model_field_class registered in table, or None.
+        """
+        if model_field_class in cache:
+            with self.statistics_lock:
+                self.cache_hits += 1
+        else:
+            with self.statistics_lock:
+                self.cache_misses += 1
+            cache[model_field_class] = next((table[klass] for klass in model_field_class.__mro__ if klass in table), None)
+        return cache[model_field_class]
+
+    def get_scalar(self, model_field_class: Type[models.Field]) -> Type[graphene.Scalar]:
+        """
+        Returns the graphene scalar for the model field class, fails silently to GenericScalar.
+        """
+        return self.resolve(self.scalars, self.scalar_cache, model_field_class) or GenericScalar
+
+    def get_form_field(self, model_field_class: Type[models.Field]) -> Type[forms.Field]:
+        """
+        Returns the form field class for the model field class, fails silently to CharField.
+        """
+        return self.resolve(self.form_fields, self.form_field_cache, model_field_class) or self.form_fields[models.CharField]
+
+
+conversions = ConversionRegistry(MODEL_TO_SCALAR, MODEL_TO_FORM_FIELD)
+
+
+def register_conversion(
+        model_field_class: Type[models.Field],
+        scalar: Type[graphene.Scalar] = None,
+        form_field: Type[forms.Field] = None,
+        output: bool = False,
+        ) -> None:
+    """
+    Registers the conversion of a model field class and its subclasses on the default registry. See ConversionRegistry.register
+    """
+    conversions.register(model_field_class, scalar=scalar, form_field=form_field, output=output)
+
+
 def whichBooleanField(null = False):
     """
     Utility function for BooleanField conversion to BooleanField or NullBooleanField 
@@ -97,8 +186,8 @@ def configure_input_field(
     if issubclass(field, models.BooleanField):
         field_class = whichBooleanField(field_extra_kwargs.get("null", False))
     else:
-        field_class = MODEL_TO_FORM_FIELD.get(field, None) or MODEL_TO_FORM_FIELD[models.CharField] # fail silently to Charfield
+        field_class = conversions.get_form_field(field) # fail silently to Charfield
     return field_class
 
 
-field:configure_input_field  = configure_input_field
\ No newline at end of file
+field:configure_input_field  = configure_input_field
@@ -1,11 +1,11 @@
 
 import graphene
-from typing import Any
+from typing import Any, Dict, FrozenSet, Tuple, Type
 from django import forms
 from django.utils.translation import gettext_lazy as _
+from functools import lru_cache
 import inspect
-from django_relay_endpoint.configurators.field_conversions import MODEL_TO_SCALAR, configure_input_field
-from graphene.types.generic import GenericScalar
+from django_relay_endpoint.configurators.field_conversions import conversions, configure_input_field
 
 
 class GenericDjangoInputField(graphene.InputField):
@@ -23,22 +23,10 @@ class GenericDjangoInputField(graphene.InputField):
         if not self.Meta.form_field_class:
             raise AssertionError(
                 "You must provide a form_field_class from django.forms")
-        constructor_params = inspect.signature(
-            self.Meta.form_field_class).parameters
-        accepted_keys = constructor_params.keys()
-
-        # get the default field configuration from models.Field
-        params_from_model_field = {key: value for key,
-                                   value in kwargs.items() if key in accepted_keys}
-        merged_params = {**params_from_model_field}
-
-        # overwrite with inputed kwargs
-        for key, value in kwargs.items():
-            if key in accepted_keys:
-                merged_params[key] = value
-
-        # instantiate a form field
-        self.form_field = self.Meta.form_field_class(**merged_params)
+        accepted_keys = accepted_form_field_kwargs(self.Meta.form_field_class)
+
+        # instantiate a form field with the inputed kwargs it accepts
+        self.form_field = self.Meta.form_field_class(**{key: value for key, value in kwargs.items() if key in accepted_keys})
         super().__init__(*args, **kwargs)
 
     def get_value(self, input) -> Any:
@@ -49,18 +37,49 @@ class GenericDjangoInputField(graphene.InputField):
         return self.form_field.clean(super().get_value(input))
 
 
+@lru_cache(maxsize=None)
+def accepted_form_field_kwargs(form_field_class: Type[forms.Field]) -> FrozenSet[str]:
+    """
+    Returns the names of the kwargs accepted by the form field class constructor.
+    The signature is inspected once per form field class.
+    """
+    return frozenset(inspect.signature(form_field_class).parameters.keys())
+
+
+# one interned GenericDjangoInputField subclass per (form field class, scalar) pair
+INPUT_FIELD_CLASSES: Dict[Tuple[Type[forms.Field], Type[graphene.Scalar]], Type[GenericDjangoInputField]] = {}
+
+
+def get_input_field_class(form_field_class: Type[forms.Field], scalar: Type[graphene.Scalar]) -> Type[GenericDjangoInputField]:
+    """
+    Returns the GenericDjangoInputField subclass for the form field class and scalar pair, creating it only once.
+
+    Args:
+        form_field_class (Type[forms.Field]): the django form field class that cleans the data
+        scalar (Type[graphene.Scalar]): the graphene scalar of the input field
+
+    Returns:
+        Type[GenericDjangoInputField]: the shared input field class
+    """
+    key = (form_field_class, scalar)
+    input_field_class = INPUT_FIELD_CLASSES.get(key, None)
+    if input_field_class is None:
+        Meta = type("Meta", (), {
+            "form_field_class": form_field_class
+        })
+        input_field_class = type(f"{form_field_class.__name__}{scalar.__name__}InputField", (GenericDjangoInputField,), {
+            "Meta": Meta
+        })
+        INPUT_FIELD_CLASSES[key] = input_field_class
+    return input_field_class
+
+
 def configured(form_field_class: forms.Field, extra_kwargs: dict) -> None:
     conversion = configure_input_field(
         field=form_field_class, field_extra_kwargs=extra_kwargs)
     # fail silently to GenericScalar
-    _type = MODEL_TO_SCALAR.get(form_field_class, GenericScalar)
-
-    Meta = type("Meta", (), {
-        "form_field_class": conversion
-    })
+    _type = conversions.get_scalar(form_field_class)
 
     # cast to form field
-    input_field_type = type(f"{form_field_class.__name__}InputField", (GenericDjangoInputField,), {
-        "Meta": Meta
-    })
+    input_field_type = get_input_field_class(conversion, _type)
     return input_field_type(_type, **extra_kwargs)
@@ -0,0 +1,125 @@
+import hashlib
+from typing import Any, Dict, Iterator, List, Optional, Type
+import graphene
+from django.db import models
+from django.db.models.fields.json import KeyTransform
+from graphene.utils.str_converters import to_camel_case
+from graphene_django.converter import convert_django_field
+from graphql import FieldNode, FragmentDefinitionNode, InlineFragmentNode, OperationType, SelectionSetNode
+from graphql.execution.values import get_argument_values
+from django_relay_endpoint.configurators.annotations import iterate_node_selection_sets
+
+
+def get_path_alias(name: str, path: List[str]) -> str:
+    """
+    Returns the name of the annotation of a path of a JSON field, e.g. `meta_path_<hash>`.
+    """
+    return f"{name}_path_{hashlib.sha1(chr(31).join(path).encode()).hexdigest()[:12]}"
+
+
+def get_path_expression(name: str, path: List[str]) -> KeyTransform:
+    """
+    Returns the key transforms extracting a path of a JSON field, as the lookup `<name>__<key>__<key>` does.
+    """
+    expression = name
+    for key in path:
+        expression = KeyTransform(key, expression)
+    return expression
+
+
+def extract_path(value: Any, path: List[str]) -> Any:
+    """
+    Returns the value at a path of a decoded JSON value, or None if the path does not exist.
+    Keys of arrays are their indexes.
+    """
+    for key in path:
+        if isinstance(value, dict):
+            value = value.get(key)
+        elif isinstance(value, list):
+            try:
+                value = value[int(key)]
+            except (ValueError, IndexError):
+                return None
+        else:
+            return None
+    return value
+
+
+class JSONPathField(graphene.Field):
+    """
+    The field of a JSONField of a DjangoObjectType, whose optional `path` argument selects a key, or an index of an array, at every level,
+    e.g. `meta(path: ["address", "city"])`. Selected with a path, the value is extracted in the database by `project_json_paths`,
+    or from the decoded value if the node was fetched without the projection. The field is nullable, a missing path resolves to null.
+
+    Args:
+        model_field (models.JSONField): the model field
+    """
+
+    def __init__(self, model_field: models.JSONField, **kwargs) -> None:
+        self.model_field_name = model_field.name
+        kwargs.setdefault("description", model_field.help_text or None)
+        super().__init__(
+            convert_django_field(model_field).get_type(),
+            path=graphene.List(graphene.NonNull(graphene.String), description="The keys of the selected value, an index for arrays"),
+            resolver=self.resolve_path,
+            **kwargs,
+        )
+
+    def resolve_path(self, root, info: graphene.ResolveInfo, path: Optional[List[str]] = None) -> Any:
+        name = self.model_field_name
+        if not path:
+            return getattr(root, name)
+        alias = get_path_alias(name, path)
+        if alias in root.__dict__:
+            return root.__dict__[alias]
+        return extract_path(getattr(root, name), path)
+
+
+def iterate_field_nodes(selection_set: Optional[SelectionSetNode], fragments: Dict[str, FragmentDefinitionNode]) -> Iterator[FieldNode]:
+    """
+    Iterates the fields of the selection set, including those of its fragments and those with directives.
+    """
+    for selection in selection_set.selections if selection_set else []:
+        if isinstance(selection, FieldNode):
+            yield selection
+        elif isinstance(selection, InlineFragmentNode):
+            yield from iterate_field_nodes(selection.selection_set, fragments)
+        elif selection.name.value in fragments:
+            yield from iterate_field_nodes(fragments[selection.name.value].selection_set, fragments)
+
+
+def project_json_paths(queryset: models.QuerySet, info: graphene.ResolveInfo, object_type: Type[graphene.ObjectType], json_fields: List[str]) -> models.QuerySet:
+    """
+    Annotates the queryset of a query operation with the paths of the JSON fields its nodes select with a `path`,
+    and defers the JSON fields that are only selected with a path, so that only the selected values are fetched.
+    """
+    if not json_fields or info.operation.operation != OperationType.QUERY:
+        return queryset
+    names = {to_camel_case(name): name for name in json_fields}
+    # looked up for the first field with arguments, the resolve info of an export has no schema nor selection
+    graphql_type = None
+    paths: Dict[str, Any] = {}
+    whole, projected = set(), set()
+    for selection_set in iterate_node_selection_sets(info):
+        for field_node in iterate_field_nodes(selection_set, info.fragments):
+            name = names.get(field_node.name.value)
+            if name is None:
+                continue
+            path = None
+            if field_node.arguments:
+                graphql_type = graphql_type or info.schema.get_type(object_type._meta.name)
+                path = get_argument_values(graphql_type.fields[field_node.name.value], field_node, info.variable_values).get("path")
+            if path:
+                paths[get_path_alias(name, path)] = get_path_expression(name, path)
+                projected.add(name)
+            else:
+                whole.add(name)
+    if not paths:
+        return queryset
+    # get_queryset may be given a manager
+    queryset = queryset.all()
+    missing = {alias: expression for alias, expression in paths.items() if alias not in queryset.query.annotations}
+    if missing:
+        queryset = queryset.annotate(**missing)
+    deferred = projected - whole
+    return queryset.defer(*deferred) if deferred else queryset
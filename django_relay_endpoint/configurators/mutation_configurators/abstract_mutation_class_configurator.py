@@ -6,7 +6,9 @@ from graphene_django import DjangoObjectType
 from graphene.types.generic import GenericScalar
 from django.utils.translation import gettext_lazy as _
 from typing import Dict, List, Callable, Type
-from django_relay_endpoint.configurators.permissions import node_permission_checker, queryset_permission_checker, BasePermission
+from django_relay_endpoint.configurators.permissions import node_permission_checker, queryset_permission_checker, async_node_permission_checker, async_queryset_permission_checker, BasePermission
+from django_relay_endpoint.configurators.routing import pin_to_primary
+from django_relay_endpoint.metrics import observe_mutation, observe_mutation_failure
 
 def configure_abstract_mutation(
     django_object_type: Type[DjangoObjectType],
@@ -17,10 +19,11 @@ def configure_abstract_mutation(
     custom_get_queryset: staticmethod = None,
     permission_classes: List[Type[BasePermission]] = [],
     permissions: List[str] = [],
+    sticky_seconds: int = 0,
     ) -> Type[DjangoClientIDMutation]:
     """
     Configures an abstract mutation from `DjangoClientIDMutation`, with all fields, validators, permissions set on NodeType,
-    overwrites `get_queryset` and `get_node` methods to support permission checking and custom 'get_queryset'.
+    overwrites `get_queryset` and `get_node` methods and their async counterparts to support permission checking and custom 'get_queryset'.
 
     Args:
         django_object_type (Type[DjangoObjectType]): 
@@ -47,6 +50,9 @@ def configure_abstract_mutation(
         permissions (List[str], optional): 
         The list of permissions. Defaults to [].
 
+        sticky_seconds (int, optional): 
+        The window in seconds in which the session of a mutating request reads from the primary database. Defaults to 0.
+
     Returns:
         Type[DjangoClientIDMutation]: 
         A configured abstract type for our model that the create, update and delete mutation root fields will be configured from 
@@ -76,6 +82,30 @@ def configure_abstract_mutation(
         @node_permission_checker()
         def get_node(cls, info, id):
             return super().get_node(info, id)
+
+        @classmethod
+        @async_queryset_permission_checker()
+        async def aget_queryset(cls, queryset, info):
+            if custom_get_queryset:
+                return custom_get_queryset(cls, queryset, info)
+            else:
+                return super().get_queryset(queryset, info)
+
+        @classmethod
+        @async_node_permission_checker()
+        async def aget_node(cls, info, id):
+            return await super().aget_node(info, id)
+
+        @classmethod
+        def mutate(cls, root, info, input):
+            # a mutating request and its session must read their own writes from the primary database
+            pin_to_primary(info.context, sticky_seconds)
+            try:
+                result = super().mutate(root, info, input)
+            except Exception:
+                observe_mutation_failure(cls)
+                raise
+            return observe_mutation(cls, result)
         
 
 
@@ -14,6 +14,7 @@ def configure_create_mutation(
         input_field_name: str = "data",
         return_field_name: str = None,
         success_keyword: str = None,
+        asynchronous: bool = False,
     ) -> Type[graphene.InputObjectType]:
     """
     Configures a DjangoClientIDMutation class named <conventional_name>CreateMutation.
@@ -35,6 +36,9 @@ def configure_create_mutation(
         return_field_name (str, optional): 
         The return field name. Defaults to model._meta.model_name.
 
+        asynchronous (bool, optional): 
+        Whether `mutate_and_get_payload` is a coroutine using the async ORM. Defaults to False.
+
     Raises:
         ValidationError: a validation error if id is provided.
 
@@ -69,6 +73,32 @@ def configure_create_mutation(
             'client_mutation_id': client_mutation_id
         }
         return cls(**mutation_kwargs)
+
+    @classmethod
+    async def amutate_and_get_payload(cls, root, info, *args, **kwargs):
+        """
+        The async counterpart of `mutate_and_get_payload`, which is used when the mutation is configured as asynchronous.
+        """
+
+        model = abstract_mutation_type.model
+        data = kwargs.get(input_field_name or "data", None)
+        client_mutation_id = kwargs.get("client_mutation_id", None)
+
+        id = data.get("id", None)
+        if id:
+            raise ValidationError(_(
+                "Field 'id' should not be provided when creating new objects. Instead you can provide a 'ClientMutationId' to identify the response"
+                ))
+        instance = await cls.acreate_node(info)
+        await cls.avalidate(data, instance, info)
+        await cls.aupdate_instance(instance, data)
+        await instance.asave()
+        mutation_kwargs = {
+            return_field_name or model._meta.model_name: instance,
+            success_keyword or "success": True,
+            'client_mutation_id': client_mutation_id
+        }
+        return cls(**mutation_kwargs)
     
     Input = type("Input", (), {
         input_field_name or "data" : graphene.Field(input_object_type)
@@ -77,7 +107,7 @@ def configure_create_mutation(
     # configure the CreateMutation
     mutation = type(f'{conventional_name}CreateMutation', (abstract_mutation_type,), {
         "Input": Input,
-        "mutate_and_get_payload": mutate_and_get_payload,
+        "mutate_and_get_payload": amutate_and_get_payload if asynchronous else mutate_and_get_payload,
     })
     return mutation
 
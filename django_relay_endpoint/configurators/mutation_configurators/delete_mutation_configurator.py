@@ -9,6 +9,7 @@ def configure_delete_mutation(
         abstract_mutation_type: Type[DjangoClientIDMutation], 
         conventional_name: str,
         success_keyword: str = None,
+        asynchronous: bool = False,
     ) ->  Type[DjangoClientIDMutation]:
     """
     Configures a DjangoClientIDMutation class named <conventional_name>DeleteMutation.
@@ -22,6 +23,9 @@ def configure_delete_mutation(
         conventional_name (str): 
         Conventional name prefiexed to the returned DjangoClientIDMutation class name
 
+        asynchronous (bool, optional): 
+        Whether `mutate_and_get_payload` is a coroutine using the async ORM. Defaults to False.
+
     Returns:
         Type[DjangoClientIDMutation]: The DjangoClientIDMutation class implementation
     """
@@ -45,6 +49,22 @@ def configure_delete_mutation(
             'client_mutation_id': client_mutation_id
         }
         return cls(**mutation_kwargs)
+
+    @classmethod
+    async def amutate_and_get_payload(cls, root, info, *args, **kwargs):
+        """
+        The async counterpart of `mutate_and_get_payload`, which is used when the mutation is configured as asynchronous.
+        """
+
+        client_mutation_id = kwargs.get("client_mutation_id", None) 
+        id = from_global_id(kwargs.get("id")).id
+        instance = await cls.aget_node(info, id)
+        await instance.adelete()
+        mutation_kwargs = {
+            success_keyword or "success": True,
+            'client_mutation_id': client_mutation_id
+        }
+        return cls(**mutation_kwargs)
     
     # declare a Input class which accepts id only
     class Input:
@@ -53,7 +73,7 @@ def configure_delete_mutation(
     # configure the DeleteMutation
     mutation = type(f'{conventional_name}DeleteMutation', (abstract_mutation_type,), {
         'Input': Input,
-        'mutate_and_get_payload': mutate_and_get_payload,
+        'mutate_and_get_payload': amutate_and_get_payload if asynchronous else mutate_and_get_payload,
     })
 
     return mutation
@@ -0,0 +1,127 @@
+import graphene
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from graphene_file_upload.scalars import Upload
+from typing import List, Type
+from django_relay_endpoint.bulk_import import PARSERS, BulkImporter, get_import_format
+from django_relay_endpoint.configurators.object_types import DjangoClientIDMutation
+from django_relay_endpoint.settings import dre_settings
+
+
+class ImportRowError(graphene.ObjectType):
+    """
+    The errors of a field of an imported row, `field` is null for the errors of the whole row.
+    """
+    row = graphene.Int(required=True)
+    field = graphene.String()
+    messages = graphene.List(graphene.NonNull(graphene.String), required=True)
+
+
+def configure_import_mutation(
+        input_object_type: Type[graphene.InputObjectType],
+        abstract_mutation_type: Type[DjangoClientIDMutation],
+        conventional_name: str,
+        fields: List[str],
+        success_keyword: str = None,
+        asynchronous: bool = False,
+    ) -> Type[DjangoClientIDMutation]:
+    """
+    Configures a DjangoClientIDMutation class named <conventional_name>ImportMutation.
+    The mutation extends abstract_mutation_type and implements 'mutate_and_get_payload' method, as well as Input class with
+    an uploaded `file` of CSV or NDJSON rows, its `format`, the `batch_size` and whether the import is `atomic`.
+    The rows are streamed from the upload, cleaned by the input fields of input_object_type, validated and inserted in batches,
+    see `django_relay_endpoint.bulk_import.BulkImporter`. The payload reports the `created` and `failed` counts and the row `errors`.
+
+    Args:
+        input_object_type (Type[graphene.InputObjectType]):
+        The InputObjectType class implementation generated by input_object_type_configurator
+
+        abstract_mutation_type (Type[DjangoClientIDMutation]):
+        The abstract DjangoClientIDMutation class implementation generated by abstract_mutation_class_configurator
+
+        conventional_name (str):
+        the conventional name prefixed to the final DjangoClientIDMutation class name.
+
+        fields (List[str]):
+        the fields of the NodeType, the columns that can be imported.
+
+        success_keyword (str, optional):
+        The success field name. Defaults to "success".
+
+        asynchronous (bool, optional):
+        Whether `mutate_and_get_payload` is a coroutine, the import runs in a thread. Defaults to False.
+
+    Raises:
+        ValidationError: a validation error if the format of the file is unknown.
+
+    Returns:
+        Type[DjangoClientIDMutation]: The actual DjangoClientIDMutation type.
+    """
+
+    @classmethod
+    def mutate_and_get_payload(cls, root, info, *args, **kwargs):
+        """
+        The `mutate_and_get_payload` classmethod, which imports the rows of the uploaded file.
+        The permissions are checked once by `get_queryset`, as for a create mutation of every row.
+        """
+
+        upload = kwargs.get("file")
+        client_mutation_id = kwargs.get("client_mutation_id", None)
+        try:
+            parser = PARSERS[get_import_format(upload, kwargs.get("format", None))]
+        except ValueError as e:
+            raise ValidationError(str(e))
+        cls.get_queryset(cls.model._default_manager.get_queryset(), info)
+        importer = BulkImporter(
+            mutation=cls,
+            input_object_type=input_object_type,
+            fields=fields,
+            info=info,
+            batch_size=max(kwargs.get("batch_size", None) or dre_settings.IMPORT_BATCH_SIZE, 1),
+            max_errors=dre_settings.IMPORT_MAX_ERRORS,
+        )
+        if kwargs.get("atomic", False):
+            with transaction.atomic(using=importer.database):
+                importer.run(parser(upload))
+                if importer.failed:
+                    # nothing is imported if a row failed
+                    transaction.set_rollback(True, using=importer.database)
+                    importer.created = 0
+        else:
+            importer.run(parser(upload))
+        mutation_kwargs = {
+            success_keyword or "success": not importer.failed,
+            "created": importer.created,
+            "failed": importer.failed,
+            "errors": importer.errors,
+            'client_mutation_id': client_mutation_id
+        }
+        return cls(**mutation_kwargs)
+
+    @classmethod
+    async def amutate_and_get_payload(cls, root, info, *args, **kwargs):
+        """
+        The async counterpart of `mutate_and_get_payload`, which is used when the mutation is configured as asynchronous.
+        The file is read and the rows are inserted in a thread.
+        """
+
+        return await sync_to_async(mutate_and_get_payload.__func__)(cls, root, info, *args, **kwargs)
+
+    Input = type("Input", (), {
+        "file": Upload(required=True),
+        "format": graphene.String(description=_("'csv' or 'ndjson', inferred from the file name or content type by default")),
+        "batch_size": graphene.Int(description=_("The number of rows validated and inserted at once")),
+        "atomic": graphene.Boolean(description=_("Import nothing if a row fails")),
+    })
+
+    # configure the ImportMutation
+    mutation = type(f'{conventional_name}ImportMutation', (abstract_mutation_type,), {
+        "Input": Input,
+        "created": graphene.Int(),
+        "failed": graphene.Int(),
+        "errors": graphene.List(graphene.NonNull(ImportRowError)),
+        "mutate_and_get_payload": amutate_and_get_payload if asynchronous else mutate_and_get_payload,
+    })
+    return mutation
@@ -3,9 +3,8 @@ import graphene
 from typing import List, Dict, Type
 from django.db import models
 from django.utils.translation import gettext_lazy as _
-from django_relay_endpoint.configurators.fields import GenericDjangoInputField
-from django_relay_endpoint.configurators.field_conversions import MODEL_TO_SCALAR, configure_input_field
-from graphene.types.generic import GenericScalar
+from django_relay_endpoint.configurators.fields import get_input_field_class
+from django_relay_endpoint.configurators.field_conversions import conversions, configure_input_field
 
 def configure_input_object_type(
     model: Type[models.Model],
@@ -49,7 +48,8 @@ def configure_input_object_type(
         })
     }
     for field in model._meta.get_fields():
-        field_kwargs = extra_kwargs.get(field.name, {})
+        # copy the kwargs, so that NodeType.Meta.extra_kwargs is left untouched
+        field_kwargs = {**extra_kwargs.get(field.name, {})}
         if field.name != "id":
             field_kwargs['required'] = field_kwargs.get('required', not field.null and not field.blank)
         else:
@@ -66,19 +66,16 @@ def configure_input_object_type(
                     input_fields[f"remove_{field.name}"] = graphene.List(graphene.ID, **remove_kwargs)
                 else:
                     input_fields[field.name] = graphene.ID(**field_kwargs)
+            elif field.primary_key:
+                # the primary key is inputted as a global id
+                input_fields[field.name] = graphene.ID(**field_kwargs)
             else:
                 # extend GenericDjangoInputField which casts graphene fields to form-fields for inputted data cleanup and validation
                 conversion = configure_input_field(field = field.__class__, field_extra_kwargs=field_kwargs)
-                _type = MODEL_TO_SCALAR.get(field.__class__, GenericScalar) # fail silently to GenericScalar
+                _type = conversions.get_scalar(field.__class__) # fail silently to GenericScalar
 
-                GenericDjangoInputFieldMeta = type("Meta", (), {
-                    "form_field_class": conversion
-                })
-
-                # cast to form field
-                input_field_type = type(f"{field.__class__.__name__}", (GenericDjangoInputField,), {
-                        "Meta": GenericDjangoInputFieldMeta
-                    })
+                # cast to form field, the input field class is shared by all fields with the same conversion
+                input_field_type = get_input_field_class(conversion, _type)
                 input_fields[field.name] = input_field_type(_type, **field_kwargs)
 
     # define an input object type with the fields
@@ -18,6 +18,7 @@ def configure_update_mutation(
         input_field_name: str = None,
         return_field_name: str = None,
         success_keyword: str = None,
+        asynchronous: bool = False,
         ) -> Type[DjangoClientIDMutation]:
     """
     Configures a DjangoClientIDMutation class named <conventional_name>UpdateMutation.
@@ -39,6 +40,9 @@ def configure_update_mutation(
         return_field_name (str, optional): 
         the return field name. Defaults to model._meta.model_name.
 
+        asynchronous (bool, optional): 
+        whether `mutate_and_get_payload` is a coroutine using the async ORM. Defaults to False.
+
     Raises:
         ValidationError: a validation error if id is provided.
 
@@ -72,6 +76,30 @@ def configure_update_mutation(
         }
         return cls(**mutation_kwargs)
 
+    @classmethod
+    async def amutate_and_get_payload(cls, root, info, *args, **kwargs):
+        """
+        The async counterpart of `mutate_and_get_payload`, which is used when the mutation is configured as asynchronous.
+        """
+
+        model = abstract_mutation_type.model
+        data = kwargs.get(input_field_name or "data", None)
+        client_mutation_id = kwargs.get("client_mutation_id", None)
+        unresolved_id = data.get("id", None)
+        if not unresolved_id:
+            raise ValidationError(_("You must provide the id of the instance being mutated."))
+        id = from_global_id(unresolved_id).id
+        instance = await cls.aget_node(info, id)
+        await cls.avalidate(data, instance, info)
+        await cls.aupdate_instance(instance, data)
+        await instance.asave()
+        mutation_kwargs = {
+            return_field_name or model._meta.model_name: instance,
+            success_keyword or "success": True,
+            'client_mutation_id': client_mutation_id
+        }
+        return cls(**mutation_kwargs)
+
     # add id as a required input field
     UpdateInputObjectType = type(input_object_type.__name__, (input_object_type,), {
         # add the id scalar field
@@ -85,7 +113,7 @@ def configure_update_mutation(
     # configure the UpdateMutation
     mutation = type(f'{conventional_name}UpdateMutation', (abstract_mutation_type,), {
         "Input": Input,
-        "mutate_and_get_payload": mutate_and_get_payload,
+        "mutate_and_get_payload": amutate_and_get_payload if asynchronous else mutate_and_get_payload,
     })
     return mutation
 
@@ -5,18 +5,22 @@ from django.forms import Field
 from graphene_django import DjangoObjectType
 from typing import Any, List, Dict, Literal, Union, TypedDict, Callable, Type
 from django.apps import apps
+from types import ModuleType
 
 from django_relay_endpoint.configurators.object_type_configurator import configure_node_object_type
 from django_relay_endpoint.configurators.queries_configurator import configure_queries
 from django_relay_endpoint.configurators.mutation_configurators.create_mutation_configurator import configure_create_mutation
 from django_relay_endpoint.configurators.mutation_configurators.update_mutation_configurator import configure_update_mutation
 from django_relay_endpoint.configurators.mutation_configurators.delete_mutation_configurator import configure_delete_mutation
+from django_relay_endpoint.configurators.mutation_configurators.import_mutation_configurator import configure_import_mutation
 from django_relay_endpoint.configurators.mutation_configurators.abstract_mutation_class_configurator import configure_abstract_mutation
 from django_relay_endpoint.configurators.mutation_configurators.input_object_type_configurator import configure_input_object_type
 from django_relay_endpoint.configurators.object_types import DjangoClientIDMutation
 from django_relay_endpoint.configurators.permissions import BasePermission
 from django_filters import FilterSet, OrderingFilter
 from .permissions import assert_permissions_are_valid, assert_permission_classes_are_valid
+from django_relay_endpoint.profiling import register_generated_class
+from django_relay_endpoint.configurators.sync import assert_sync_field_is_valid, connect_tombstones
 
 
 class MutationConfig(TypedDict):
@@ -35,7 +39,7 @@ class MetaKwargs(TypedDict):
     filter_fields: Union[Dict[str, List[str]], List[str]]
     filterset_class: Type[FilterSet]
     object_type_name: str | None
-    mutation_operations: Literal["create", "update", "delete"]
+    mutation_operations: Literal["create", "update", "delete", "import"]
     extra_kwargs: Dict[str, Dict[str, Any]]
     field_validators: Dict[str, List[Callable]]
     non_field_validators: List[Callable]
@@ -45,6 +49,16 @@ class MetaKwargs(TypedDict):
     get_queryset: Callable
     permissions: List[str]
     permission_classes: List[Type[BasePermission]]
+    read_database: str | None
+    cost_weight: int
+    default_page_size: int | None
+    max_page_size: int | None
+    values_fast_path: bool
+    annotations: Dict[str, Any]
+    aggregate: bool
+    aggregate_fields: List[str]
+    aggregate_group_by: List[str]
+    sync: str | None
 
 
 DEFAULT_META_KWARGS: MetaKwargs = {
@@ -63,7 +77,17 @@ DEFAULT_META_KWARGS: MetaKwargs = {
     'input_field_name': None,
     'return_field_name': None,
     "permissions": [],
-    "permission_classes": []
+    "permission_classes": [],
+    "read_database": None,
+    "cost_weight": 1,
+    "default_page_size": None,
+    "max_page_size": None,
+    "values_fast_path": False,
+    "annotations": {},
+    "aggregate": False,
+    "aggregate_fields": [],
+    "aggregate_group_by": [],
+    "sync": None,
 }
 
 
@@ -99,8 +123,18 @@ class NodeType:
                 setattr(cls.Meta, key, default)
         assert_permissions_are_valid(cls.Meta.permissions)
         assert_permission_classes_are_valid(cls.Meta.permission_classes)
+        if cls.Meta.default_page_size and cls.Meta.max_page_size and cls.Meta.default_page_size > cls.Meta.max_page_size:
+            raise AssertionError(
+                f"{cls.__name__}.Meta.default_page_size must not exceed {cls.__name__}.Meta.max_page_size")
 
-    def __init__(self) -> None:
+    def __init__(
+            self,
+            snapshot: ModuleType = None,
+            read_database: str = None,
+            sticky_seconds: int = 0,
+            asynchronous: bool = False,
+            ) -> None:
+        self.asynchronous = asynchronous
         self.__prepare_model_class__()
         self.__configure_conventional_name__()
         if self.Meta.fields == '__all__':
@@ -109,6 +143,9 @@ class NodeType:
             fields = self.Meta.fields
         
         self.fields = fields
+        if self.Meta.sync:
+            assert_sync_field_is_valid(self.model, self.Meta.sync)
+            connect_tombstones(self.model)
 
         self.django_object_type = configure_node_object_type(
             model=self.model,
@@ -119,19 +156,36 @@ class NodeType:
             custom_get_queryset=self.__class__.get_queryset if hasattr(self.__class__, 'get_queryset') else None,
             permissions=self.Meta.permissions,
             permission_classes=self.Meta.permission_classes,
+            read_database=self.Meta.read_database or read_database,
+            asynchronous=asynchronous,
+            cost_weight=self.Meta.cost_weight,
+            default_page_size=self.Meta.default_page_size,
+            max_page_size=self.Meta.max_page_size,
+            annotations=self.Meta.annotations,
+            sync=self.Meta.sync,
+            values_fast_path=self.Meta.values_fast_path,
         )
-        self.input_object_type = configure_input_object_type(
-            model=self.model,
-            conventional_name=self.conventional_name, 
-            fields=fields, 
-            extra_kwargs=self.Meta.extra_kwargs,
-        )
+        # use the static input type frozen by 'dre-snapshot' if there is one
+        frozen_input_object_types = getattr(snapshot, "INPUT_OBJECT_TYPES", {})
+        if self.conventional_name in frozen_input_object_types:
+            self.input_object_type = frozen_input_object_types[self.conventional_name]
+        else:
+            self.input_object_type = configure_input_object_type(
+                model=self.model,
+                conventional_name=self.conventional_name, 
+                fields=fields, 
+                extra_kwargs=self.Meta.extra_kwargs,
+            )
         self.django_abstract_mutation_type = configure_abstract_mutation(
             django_object_type=self.django_object_type,
             conventional_name=self.conventional_name,
             permissions=self.Meta.permissions,
-            permission_classes=self.Meta.permission_classes
+            permission_classes=self.Meta.permission_classes,
+            sticky_seconds=sticky_seconds,
         )
+        # label the generated classes with the NodeType in profiles
+        for generated_class in (self.django_object_type, self.input_object_type, self.django_abstract_mutation_type):
+            register_generated_class(generated_class, self.__class__)
 
         
 
@@ -170,11 +224,18 @@ class NodeType:
             django_object_type=self.django_object_type,
             conventional_name=self.conventional_name,
             query_field_name=self.Meta.query_root_name_plural,
+            asynchronous=self.asynchronous,
+            max_page_size=self.Meta.max_page_size,
+            values_fast_path=self.Meta.values_fast_path,
+            aggregate=self.Meta.aggregate,
+            aggregate_fields=self.Meta.aggregate_fields,
+            aggregate_group_by=self.Meta.aggregate_group_by,
         )
 
     def configure_mutations(self) -> Type[graphene.ObjectType]:
         """
-        Configures mutations with "create_<model._meta.model_name>", "update_<model._meta.model_name>", "delete_<model._meta.model_name>" root fields per Meta.mutation_operations.
+        Configures mutations with "create_<model._meta.model_name>", "update_<model._meta.model_name>", "delete_<model._meta.model_name>"
+        and "import_<model._meta.model_name>" root fields per Meta.mutation_operations.
 
         Returns:
             Type[graphene.ObjectType]: A configured extended graphene.ObjectType with mutation root fields
@@ -188,8 +249,10 @@ class NodeType:
                 conventional_name=self.conventional_name,
                 input_field_name=self.Meta.input_field_name,
                 return_field_name=self.Meta.return_field_name,
-                success_keyword=self.Meta.success_keyword
+                success_keyword=self.Meta.success_keyword,
+                asynchronous=self.asynchronous,
             )
+            register_generated_class(create_mutation, self.__class__)
             root[f"create_{self.model._meta.model_name}"] = create_mutation.Field()
 
         if "update" in self.Meta.mutation_operations:
@@ -199,16 +262,32 @@ class NodeType:
                 conventional_name=self.conventional_name,
                 input_field_name=self.Meta.input_field_name,
                 return_field_name=self.Meta.return_field_name,
-                success_keyword=self.Meta.success_keyword
+                success_keyword=self.Meta.success_keyword,
+                asynchronous=self.asynchronous,
             )
+            register_generated_class(update_mutation, self.__class__)
             root[f"update_{self.model._meta.model_name}"] = update_mutation.Field()
 
         if "delete" in self.Meta.mutation_operations:
             delete_mutation = configure_delete_mutation(
                 abstract_mutation_type=self.django_abstract_mutation_type,
                 conventional_name=self.conventional_name,
-                success_keyword=self.Meta.success_keyword
+                success_keyword=self.Meta.success_keyword,
+                asynchronous=self.asynchronous,
                 )
+            register_generated_class(delete_mutation, self.__class__)
             root[f"delete_{self.model._meta.model_name}"] = delete_mutation.Field()
 
+        if "import" in self.Meta.mutation_operations:
+            import_mutation = configure_import_mutation(
+                input_object_type=self.input_object_type,
+                abstract_mutation_type=self.django_abstract_mutation_type,
+                conventional_name=self.conventional_name,
+                fields=self.fields,
+                success_keyword=self.Meta.success_keyword,
+                asynchronous=self.asynchronous,
+                )
+            register_generated_class(import_mutation, self.__class__)
+            root[f"import_{self.model._meta.model_name}"] = import_mutation.Field()
+
         return type(f'{self.conventional_name}Mutation', (graphene.ObjectType, ), root)
@@ -1,11 +1,16 @@
 
 from django.db import models
 import graphene
-from typing import Dict, List, Callable, Type
+from typing import Any, Dict, List, Callable, Type
 from django_filters import FilterSet
+from django_relay_endpoint.configurators.annotations import annotate_selected, configure_annotation_field, configure_annotation_filterset
+from django_relay_endpoint.configurators.connection_fields import ValuesGlobalID
+from django_relay_endpoint.configurators.json_paths import JSONPathField, project_json_paths
 from django_relay_endpoint.configurators.permissions import BasePermission
 from django_relay_endpoint.configurators.object_types import DjangoObjectType
-from django_relay_endpoint.configurators.permissions import queryset_permission_checker, node_permission_checker
+from django_relay_endpoint.configurators.permissions import queryset_permission_checker, node_permission_checker, async_queryset_permission_checker, async_node_permission_checker
+from django_relay_endpoint.configurators.routing import read_database_alias
+from django_relay_endpoint.configurators.sync import SyncConnection
 
 
 
@@ -18,6 +23,14 @@ def configure_node_object_type(
         custom_get_queryset: Callable = None,
         permissions: List[str] = [],
         permission_classes: List[BasePermission] = [],
+        read_database: str = None,
+        asynchronous: bool = False,
+        cost_weight: int = 1,
+        default_page_size: int = None,
+        max_page_size: int = None,
+        annotations: Dict[str, Any] = {},
+        sync: str = None,
+        values_fast_path: bool = False,
 ) -> Type[DjangoObjectType]:
     """Creates graphene Node Type from given django model class
 
@@ -30,6 +43,14 @@ def configure_node_object_type(
         filterset_class (django_filters.FilterSet): A FilterSet class for filtering instead of filter_fields
         type_props (dict[str, Union[graphene.types.scalars.Scalar, Callable]], optional): a dictionary of attributes and methods that will be merged with the type. This should be used to provide custom fields and methods
         meta_props (dict[str, Any]): a dictionary that will be merged with class Meta: Defaults to {}. Used for Meta property overwrites or custom configurations, which is normally unnecessary.
+        read_database (str): a database alias that the querysets of query operations are routed to, e.g. a read replica. Defaults to None.
+        asynchronous (bool): whether `get_node` resolves the node with the async ORM via `aget_node`. Defaults to False.
+        cost_weight (int): the cost of fetching one record in the query cost analysis. Defaults to 1.
+        default_page_size (int): the page size of connections without `first` or `last`. Defaults to None.
+        max_page_size (int): the maximum page size of connections. Defaults to None.
+        annotations (Dict[str, Any]): expressions by field name, e.g. {"book_count": Count("books")}, exposed as fields and annotated by `get_queryset` when selected. Defaults to {}.
+        sync (str): the timestamp or sequence field the root connection syncs the changes by, with a SyncConnection. Defaults to None.
+        values_fast_path (bool): whether the `id` field returns the global ids encoded by the values fast path of the root connection, see ValuesGlobalID. Defaults to False.
     Returns:
         __type__ (Type[DjangoObjectType]): DjangoObjectType for given Django Model
     """
@@ -42,8 +63,24 @@ def configure_node_object_type(
         "filter_fields": filter_fields or {},
     }
 
+    # the JSON fields take a `path` argument, whose values are extracted in the database
+    json_fields = [
+        model_field.name for model_field in model._meta.concrete_fields
+        if isinstance(model_field, models.JSONField) and (fields == "__all__" or model_field.name in fields)
+    ]
+
+    if annotations:
+        # filter and order by the annotations in the database
+        filterset_class = configure_annotation_filterset(model, conventional_name, annotations, filter_fields, filterset_class) or filterset_class
+        if filterset_class:
+            merged_meta_kwargs.pop("filter_fields")
+
     if filterset_class:
         merged_meta_kwargs["filterset_class"] = filterset_class
+
+    if sync:
+        # the connection returns the watermark and the deleted ids
+        merged_meta_kwargs["connection_class"] = SyncConnection
           
     class AbstractDjangoType(DjangoObjectType):
         class Meta:
@@ -53,6 +90,12 @@ def configure_node_object_type(
         @classmethod
         @queryset_permission_checker()
         def get_queryset(cls, queryset, info):
+            # route the reads of query operations to the read database
+            alias = read_database_alias(info, read_database)
+            if alias:
+                queryset = queryset.using(alias)
+            queryset = annotate_selected(queryset, info, annotations)
+            queryset = project_json_paths(queryset, info, cls, json_fields)
             if custom_get_queryset:
                 return custom_get_queryset(cls, queryset, info)
             else:
@@ -64,8 +107,37 @@ def configure_node_object_type(
         def get_node(cls, info, id):
             return super().get_node(info, id) # let graphene handle the id from_global_id
 
+        # implement the async counterparts of get_queryset and get_node with permission checking
+        @classmethod
+        @async_queryset_permission_checker()
+        async def aget_queryset(cls, queryset, info):
+            alias = read_database_alias(info, read_database)
+            if alias:
+                queryset = queryset.using(alias)
+            queryset = annotate_selected(queryset, info, annotations)
+            queryset = project_json_paths(queryset, info, cls, json_fields)
+            if custom_get_queryset:
+                return custom_get_queryset(cls, queryset, info)
+            else:
+                return super().get_queryset(queryset, info)
+
+        @classmethod
+        @async_node_permission_checker()
+        async def aget_node(cls, info, id):
+            queryset = await cls.aget_queryset(cls._meta.model.objects, info)
+            return await queryset.filter(pk=id).afirst()
+
     AbstractDjangoType.permission_classes = permission_classes
     AbstractDjangoType.permissions = permissions
+    AbstractDjangoType.read_database = read_database
+    AbstractDjangoType.cost_weight = cost_weight
+    AbstractDjangoType.default_page_size = default_page_size
+    AbstractDjangoType.max_page_size = max_page_size
+    AbstractDjangoType.annotations = annotations
+    AbstractDjangoType.sync_field = sync
+    if asynchronous:
+        # graphene awaits the node returned by relay.Node.Field
+        AbstractDjangoType.get_node = AbstractDjangoType.__dict__["aget_node"]
     
     # configure the meta
     meta = type("Meta", (),  merged_meta_kwargs)
@@ -73,5 +145,8 @@ def configure_node_object_type(
     # configure the DjangoObjectType implementation
     django_node = type(f'{conventional_name}', (AbstractDjangoType,), {
         'Meta': meta,
+        **{name: JSONPathField(model._meta.get_field(name)) for name in json_fields},
+        **{name: configure_annotation_field(model, name, expression, asynchronous) for name, expression in annotations.items()},
+        **({"id": ValuesGlobalID()} if values_fast_path else {}),
     })
     return django_node
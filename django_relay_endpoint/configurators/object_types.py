@@ -1,6 +1,8 @@
 
 
 import graphene
+import inspect
+from asgiref.sync import sync_to_async
 from django.db import models
 from graphql_relay.node.node import from_global_id
 from graphene_django import DjangoObjectType # This import is necessary. we export it in the model for easy of use
@@ -10,7 +12,8 @@ from django.utils.translation import gettext_lazy as _
 class DjangoClientIDMutation(graphene.relay.ClientIDMutation):
     """
     An abstract subclass of graphene.relay.ClientIDMutation which implements 
-    `get_queryset`, `get_node`, `create_node`, `validate` and `update_instance` classmethods.
+    `get_queryset`, `get_node`, `create_node`, `validate` and `update_instance` classmethods,
+    as well as their async counterparts `aget_queryset`, `aget_node`, `acreate_node`, `avalidate` and `aupdate_instance`.
     """
 
     class Meta:
@@ -104,3 +107,51 @@ class DjangoClientIDMutation(graphene.relay.ClientIDMutation):
                     # check if this field is in the arguments
                     if data.get(field.name, None):
                         setattr(instance, field.name, data.get(field.name))
+
+    @classmethod
+    async def aget_queryset(cls, queryset: models.QuerySet, info: graphene.ResolveInfo):
+        """
+        The async counterpart of `get_queryset`.
+        When overwriting this method, you must call super or implement permission checking manually.
+        """
+        return cls.get_queryset(queryset, info)
+
+    @classmethod
+    async def aget_node(cls, info, id):
+        """
+        Returns the node by id using the async ORM
+        """
+        queryset = await cls.aget_queryset(cls.model.objects, info)
+        instance = await queryset.aget(id=id) # let graphene handle the DoesNotExist
+        return instance
+
+    @classmethod
+    async def acreate_node(cls, info):
+        """
+        The async counterpart of `create_node`
+        """
+        return cls.create_node(info)
+
+    @classmethod
+    async def avalidate(cls, data: dict, not_updated_model_instance: models.Model, info: graphene.ResolveInfo):
+        """
+        The async counterpart of `validate`. Async validators are awaited, sync validators are called in a thread.
+        """
+        async def call(validator, *args):
+            if inspect.iscoroutinefunction(validator):
+                await validator(*args)
+            else:
+                await sync_to_async(validator)(*args)
+
+        for field in cls.model._meta.get_fields():
+            for validator in cls.field_validators.get(field.name, []):
+                await call(validator, data.get(field.name), not_updated_model_instance, info)
+        for validator in cls.non_field_validators:
+            await call(validator, data, not_updated_model_instance, info)
+
+    @classmethod
+    async def aupdate_instance(cls, instance: models.Model, data: dict):
+        """
+        The async counterpart of `update_instance`. The relations are resolved in a thread.
+        """
+        await sync_to_async(cls.update_instance)(instance, data)
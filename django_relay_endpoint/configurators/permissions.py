@@ -1,10 +1,16 @@
 import graphene
+from asgiref.sync import sync_to_async
+from contextlib import contextmanager
 from django.core.exceptions import PermissionDenied
 from typing import List, Callable, Type, Union
 from django.utils.translation import gettext_lazy as _
 from graphql_relay.node.node import from_global_id
 from django.db import models
 from .object_types import DjangoObjectType, DjangoClientIDMutation
+from .routing import read_database_alias
+from django_relay_endpoint.instrumentation import permission_timer
+from django_relay_endpoint.metrics import PermissionDenialCounter
+from django_relay_endpoint.tracing import start_span
 
 class BasePermission:
     """
@@ -22,6 +28,20 @@ class BasePermission:
         Return `True` if permission is granted, `False` otherwise.
         """
         return True
+
+    async def ahas_permission(self, info) -> bool:
+        """
+        Async counterpart of `has_permission` used by the async execution path.
+        Runs `has_permission` in a thread by default, overwrite it for a native async check.
+        """
+        return await sync_to_async(self.has_permission)(info)
+
+    async def ahas_object_permission(self, info, obj) -> bool:
+        """
+        Async counterpart of `has_object_permission` used by the async execution path.
+        Runs `has_object_permission` in a thread by default, overwrite it for a native async check.
+        """
+        return await sync_to_async(self.has_object_permission)(info, obj)
     
 
 class AllowAny(BasePermission):
@@ -89,6 +109,15 @@ def assert_permission_classes_are_valid(permission_classes: List[Type[BasePermis
         raise AssertionError(PERMISSION_CLASS_ASSERTION_ERROR)
 
 
+@contextmanager
+def observed_permission_check(cls: Type[Union[DjangoClientIDMutation, DjangoObjectType]], check: str):
+    """
+    Times the permission check of `cls.check` for the instrumentation, counts its denials for the metrics and traces it.
+    """
+    with permission_timer(cls, check), PermissionDenialCounter(cls, check), start_span(f"{cls.__name__}.{check}.permissions", {"node_type": cls.__name__}):
+        yield
+
+
 def user_permission_checker(cls: Type[Union[DjangoClientIDMutation, DjangoObjectType]], info: graphene.ResolveInfo) -> None:
     """
     Raises error if user does not have the permissions defined as strings
@@ -136,16 +165,18 @@ def queryset_permission_checker() -> classmethod: # this is final decorator type
                 classmethod: the get_queryset classmethod
             """
 
-            # call user_permission_checker function with cls and info
-            user_permission_checker(cls, info)
-            permission_classes = cls.permission_classes
-            if permission_classes:
-                for p_cls in permission_classes:
-                    allowed = p_cls().has_permission(info)
-                    if not allowed:
-                        raise PermissionDenied(PERMISSION_ERROR)
-            
-            return get_queryset_method(cls, queryset, info)
+            with start_span(f"{cls.__name__}.get_queryset", {"node_type": cls.__name__}):
+                with observed_permission_check(cls, "get_queryset"):
+                    # call user_permission_checker function with cls and info
+                    user_permission_checker(cls, info)
+                    permission_classes = cls.permission_classes
+                    if permission_classes:
+                        for p_cls in permission_classes:
+                            allowed = p_cls().has_permission(info)
+                            if not allowed:
+                                raise PermissionDenied(PERMISSION_ERROR)
+
+                return get_queryset_method(cls, queryset, info)
         
         return wrapped_get_queryset
     return wrapped_decorator
@@ -187,17 +218,101 @@ def node_permission_checker() -> classmethod: # this is final decorator type
                 classmethod: a get_node classmethod
             """
 
-            # no need to call user_permission_checker, because the get_node and create_node methods on the class call the get_queryset method
-            permission_classes = cls.permission_classes
-            if permission_classes:
-                obj = cls.Meta.model.objects.get(id=from_global_id(id).id)
-                for p_cls in permission_classes:
-                    allowed = p_cls().has_object_permission(info, obj)
-                    if not allowed:
-                        raise PermissionDenied(PERMISSION_ERROR)
-            
-            return get_node_method(cls, info, id)
+            with start_span(f"{cls.__name__}.get_node", {"node_type": cls.__name__, "global_id": str(id)}):
+                # no need to call user_permission_checker, because the get_node and create_node methods on the class call the get_queryset method
+                permission_classes = cls.permission_classes
+                if permission_classes:
+                    with observed_permission_check(cls, "get_node"):
+                        manager = cls.Meta.model.objects
+                        alias = read_database_alias(info, getattr(cls, "read_database", None))
+                        if alias:
+                            manager = manager.using(alias)
+                        obj = manager.get(id=from_global_id(id).id)
+                        for p_cls in permission_classes:
+                            allowed = p_cls().has_object_permission(info, obj)
+                            if not allowed:
+                                raise PermissionDenied(PERMISSION_ERROR)
+
+                return get_node_method(cls, info, id)
         
         return wrapped_get_node
     return wrapped_decorator
 
+
+def async_queryset_permission_checker() -> classmethod: # this is final decorator type
+    """
+    The async counterpart of `queryset_permission_checker`, designed for the `aget_queryset` classmethod.
+    The decorator checks `cls.permissions` calling user_permission_checker in a thread and `ahas_permission` method on all `cls.permission_classes`.
+
+    Returns:
+        decorator: a classmethod decorator for `cls.aget_queryset`
+    """
+
+    def wrapped_decorator(aget_queryset_method: Type[Callable[..., Type[Callable]]]) -> Type[Callable[..., Type[Callable]]]:
+        async def wrapped_aget_queryset(cls: Type[Union[DjangoClientIDMutation, DjangoObjectType]], queryset: models.QuerySet, info: graphene.ResolveInfo) -> classmethod:
+            """
+            The decorator that checks the permissions calling `user_permission_checker` and all `ahas_permission` method on all `cls.permission_classes`
+
+            Raises:
+                PermissionDenied
+
+            Returns:
+                classmethod: the aget_queryset classmethod
+            """
+
+            with start_span(f"{cls.__name__}.aget_queryset", {"node_type": cls.__name__}):
+                with observed_permission_check(cls, "aget_queryset"):
+                    # user.has_perms may hit the database, so it is called in a thread
+                    await sync_to_async(user_permission_checker)(cls, info)
+                    for p_cls in cls.permission_classes:
+                        allowed = await p_cls().ahas_permission(info)
+                        if not allowed:
+                            raise PermissionDenied(PERMISSION_ERROR)
+
+                return await aget_queryset_method(cls, queryset, info)
+
+        return wrapped_aget_queryset
+    return wrapped_decorator
+
+
+def async_node_permission_checker() -> classmethod: # this is final decorator type
+    """
+    The async counterpart of `node_permission_checker`, designed for the `aget_node` classmethod.
+    The decorator fetches the object with the async ORM and calls `ahas_object_permission` on all `cls.permission_classes`.
+
+    Returns:
+        decorator: a classmethod decorator for `cls.aget_node`
+    """
+
+    def wrapped_decorator(aget_node_method: Type[Callable[..., Type[Callable]]]) -> Type[Callable[..., Type[Callable]]]:
+        async def wrapped_aget_node(cls: Type[Union[DjangoObjectType, DjangoClientIDMutation]], info: graphene.ResolveInfo, id: str) -> classmethod:
+            """
+            The decorator that checks the permissions on object level calling all `the ahas_object_permission` on all `cls.permission_classes`
+
+            Raises:
+                PermissionDenied
+
+            Returns:
+                classmethod: an aget_node classmethod
+            """
+
+            with start_span(f"{cls.__name__}.aget_node", {"node_type": cls.__name__, "global_id": str(id)}):
+                permission_classes = cls.permission_classes
+                if permission_classes:
+                    with observed_permission_check(cls, "aget_node"):
+                        # the mutations declare the model, the object types in their options
+                        manager = (getattr(cls, "model", None) or cls._meta.model).objects
+                        alias = read_database_alias(info, getattr(cls, "read_database", None))
+                        if alias:
+                            manager = manager.using(alias)
+                        # graphene and the mutations pass the primary key decoded from the global id
+                        obj = await manager.aget(pk=id)
+                        for p_cls in permission_classes:
+                            allowed = await p_cls().ahas_object_permission(info, obj)
+                            if not allowed:
+                                raise PermissionDenied(PERMISSION_ERROR)
+
+                return await aget_node_method(cls, info, id)
+
+        return wrapped_aget_node
+    return wrapped_decorator
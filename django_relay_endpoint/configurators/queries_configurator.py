@@ -1,8 +1,11 @@
 
 import graphene
 from graphene_django.filter import DjangoFilterConnectionField
-from typing import Literal
+from typing import List, Literal
 from .object_types import DjangoObjectType
+from .aggregates import AggregateField
+from .connection_fields import AsyncDjangoFilterConnectionField, AsyncValuesDjangoFilterConnectionField, ValuesDjangoFilterConnectionField
+from .sync import get_sync_connection_field_class
 from typing import Type
 
 
@@ -10,6 +13,12 @@ def configure_queries(
     django_object_type: Type[DjangoObjectType],
     conventional_name: str,
     query_field_name: str = None,
+    asynchronous: bool = False,
+    max_page_size: int = None,
+    values_fast_path: bool = False,
+    aggregate: bool = False,
+    aggregate_fields: List[str] = [],
+    aggregate_group_by: List[str] = [],
     ) -> Type[graphene.ObjectType]:
     """
     Configures relay node style query object type for single and multiple records, supports filtering via django_filter 
@@ -19,6 +28,12 @@ def configure_queries(
         conventional_name (str): A name to use for the query object type
         query_field_name (str, optional): the field name. Defaults to None. If None, lowered snake-case model._meta.verbose_name will be used
         query_field_name_plural (str, optional): _description_. Defaults to None. If None, lowered snake-case model._meta.verbose_name_plural will be used
+        asynchronous (bool, optional): whether the connection is resolved with the async ORM. Defaults to False.
+        max_page_size (int, optional): the maximum number of records per page. Defaults to None, i.e. graphene_django's RELAY_CONNECTION_MAX_LIMIT.
+        values_fast_path (bool, optional): whether pages selecting only scalar fields are fetched with `values_list`. Defaults to False.
+        aggregate (bool, optional): whether a `<query_field_name>_aggregate` field is configured, see AggregateField. Defaults to False, or True if aggregate_fields or aggregate_group_by are given.
+        aggregate_fields (List[str], optional): the numeric fields summed, averaged, and whose minimum and maximum are computed by the aggregate field. Defaults to [].
+        aggregate_group_by (List[str], optional): the fields the aggregate field can group the records by. Defaults to [].
 
     Returns:
         graphene.ObjectType: The created query object type
@@ -30,7 +45,24 @@ def configure_queries(
     
     roots = {}
     
-    roots[name] = DjangoFilterConnectionField(django_object_type) 
+    if values_fast_path:
+        connection_field_class = AsyncValuesDjangoFilterConnectionField if asynchronous else ValuesDjangoFilterConnectionField
+    else:
+        connection_field_class = AsyncDjangoFilterConnectionField if asynchronous else DjangoFilterConnectionField
+    if getattr(django_object_type, "sync_field", None):
+        # the connection takes an `updated_since` watermark, see SyncConnectionFieldMixin
+        connection_field_class = get_sync_connection_field_class(connection_field_class)
+    connection_field_kwargs = {"max_limit": max_page_size} if max_page_size else {}
+    roots[name] = connection_field_class(django_object_type, **connection_field_kwargs)
+    if aggregate or aggregate_fields or aggregate_group_by:
+        roots[f"{name}_aggregate"] = AggregateField(
+            django_object_type,
+            conventional_name,
+            aggregate_fields=list(aggregate_fields),
+            group_by=list(aggregate_group_by),
+            asynchronous=asynchronous,
+            max_groups=max_page_size,
+        )
 
     query = type(f'{conventional_name}Query', (graphene.ObjectType, ), roots)
     return query
\ No newline at end of file
@@ -0,0 +1,55 @@
+import time
+import graphene
+from typing import Union
+from graphql import OperationType
+
+
+STICKY_SESSION_KEY = "django_relay_endpoint_primary_until"
+PINNED_REQUEST_ATTRIBUTE = "_django_relay_endpoint_pinned_to_primary"
+
+
+def pin_to_primary(request, sticky_seconds: int = 0) -> None:
+    """
+    Pins the request to the primary database, so that it reads its own writes.
+    If the request has a session and sticky_seconds is provided, the following requests of the session
+    are pinned to the primary database for sticky_seconds as well.
+
+    Args:
+        request (HttpRequest): the request, i.e. `info.context`
+        sticky_seconds (int, optional): the window after a mutation in which the session reads from the primary. Defaults to 0.
+    """
+    setattr(request, PINNED_REQUEST_ATTRIBUTE, True)
+    session = getattr(request, "session", None)
+    if session is not None and sticky_seconds:
+        session[STICKY_SESSION_KEY] = time.time() + sticky_seconds
+
+
+def is_pinned_to_primary(request) -> bool:
+    """
+    Returns True if the request or its session performed a mutation within the sticky window.
+    """
+    if getattr(request, PINNED_REQUEST_ATTRIBUTE, False):
+        return True
+    session = getattr(request, "session", None)
+    if session is not None:
+        return session.get(STICKY_SESSION_KEY, 0) > time.time()
+    return False
+
+
+def read_database_alias(info: graphene.ResolveInfo, read_database: Union[str, None]) -> Union[str, None]:
+    """
+    Returns the database alias the reads of the operation should be routed to.
+    Only query operations are routed, mutations and requests pinned to the primary keep the default routing.
+
+    Args:
+        info (graphene.ResolveInfo): graphene.ResolveInfo object instance
+        read_database (Union[str, None]): the configured replica alias
+
+    Returns:
+        Union[str, None]: the replica alias, or None if the default routing applies
+    """
+    if not read_database or info.operation.operation != OperationType.QUERY:
+        return None
+    if is_pinned_to_primary(info.context):
+        return None
+    return read_database
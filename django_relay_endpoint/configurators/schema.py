@@ -1,6 +1,8 @@
 import graphene
 from django_relay_endpoint.configurators.node import NodeType
-from typing import List, Type
+from typing import List, Type, Union
+from types import ModuleType
+from django_relay_endpoint.configurators.snapshot import load_snapshot
 
 
 class NodeType(graphene.ObjectType):
@@ -11,16 +13,63 @@ class SchemaConfigurator:
     A class that configures schema.
     Must be instantiated with a list of classes extending NodeType
     Call SchemaConfigurator to return a configured graphene.Schema with queries and mutations
+    Optionally accepts a snapshot module generated by the 'dre-snapshot' command, whose static types are used instead of configuring them dynamically.
+    Optionally accepts a read_database alias that the reads of query operations are routed to, and sticky_seconds,
+    the window in which a session that performed a mutation keeps reading from the primary database.
+    Pass asynchronous=True to configure connections, nodes and mutations resolved with the async ORM, served by AsyncGraphQLView.
     """
 
     query: List[graphene.ObjectType]
     mutation: List[graphene.ObjectType]
     node_type: graphene.ObjectType = NodeType
 
-    def __init__(self, node_types: List[Type[NodeType]]) -> None:
-        instantiated_types = [node_type() for node_type in node_types]
-        self.query = [node_type.configure_queries() for node_type in instantiated_types]
-        self.mutation = [node_type.configure_mutations() for node_type in instantiated_types]
+    def __init__(
+            self,
+            node_types: List[Type[NodeType]],
+            snapshot: Union[str, ModuleType] = None,
+            read_database: str = None,
+            sticky_seconds: int = 0,
+            asynchronous: bool = False,
+            ) -> None:
+        self.node_types = node_types
+        self.snapshot = load_snapshot(snapshot, node_types) if snapshot else None
+        self.read_database = read_database
+        self.sticky_seconds = sticky_seconds
+        self.asynchronous = asynchronous
+        self.instantiated_types = []
+        self.query = []
+        self.mutation = []
+        for node_type in node_types:
+            self.configure_node_type(node_type)
+
+    def configure_node_type(self, node_type: Type[NodeType]) -> NodeType:
+        """
+        Instantiates the NodeType and adds its query and mutation types to `query` and `mutation`.
+
+        Returns:
+            NodeType: the instantiated NodeType
+        """
+        instantiated_type = node_type(
+            snapshot=self.snapshot,
+            read_database=self.read_database,
+            sticky_seconds=self.sticky_seconds,
+            asynchronous=self.asynchronous,
+        )
+        self.instantiated_types.append(instantiated_type)
+        self.query.append(instantiated_type.configure_queries())
+        self.mutation.append(instantiated_type.configure_mutations())
+        return instantiated_type
+
+    def introspect(self) -> dict:
+        """
+        Returns the introspection result of the schema, read from the snapshot if one is loaded.
+
+        Returns:
+            dict: the introspection result
+        """
+        if self.snapshot:
+            return self.snapshot.INTROSPECTION
+        return self.schema().introspect()
 
     def schema(self) -> graphene.Schema:
         """
@@ -0,0 +1,258 @@
+import ast
+import hashlib
+import importlib
+import json
+import warnings
+from types import ModuleType
+from typing import Any, Dict, List, Tuple, Type, Union
+from django.db import models
+from django_relay_endpoint.configurators.field_conversions import conversions, configure_input_field
+from django_relay_endpoint.settings import dre_settings
+
+
+SNAPSHOT_VERSION = 1
+
+STALE_SNAPSHOT_WARNING = "The schema snapshot '{module}' does not match the current models and NodeType definitions. Falling back to dynamic configuration, regenerate it with 'dre-snapshot'."
+
+
+def class_path(klass: type) -> str:
+    """
+    Returns the dotted import path of a class or a function.
+    """
+    return f"{klass.__module__}.{klass.__qualname__}"
+
+
+def describe_value(value: Any) -> Any:
+    """
+    Returns a json serializable and process independent description of a NodeType.Meta value.
+    Classes and functions are described by their import path, models by their label.
+    """
+    if isinstance(value, type) and issubclass(value, models.Model):
+        return value._meta.label
+    if isinstance(value, (list, tuple)):
+        return [describe_value(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): describe_value(item) for key, item in value.items()}
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if hasattr(value, "__qualname__"):
+        return class_path(value)
+    return repr(value)
+
+
+def describe_model(model: Type[models.Model]) -> List[Dict[str, Any]]:
+    """
+    Returns the description of model fields that the generated types depend on.
+    """
+    description = []
+    for field in model._meta.get_fields():
+        description.append({
+            "name": field.name,
+            "class": class_path(field.__class__),
+            "null": getattr(field, "null", None),
+            "blank": getattr(field, "blank", None),
+            "is_relation": field.is_relation,
+            "many_to_many": field.many_to_many,
+            "many_to_one": field.many_to_one,
+            "related_model": field.related_model._meta.label if field.related_model else None,
+        })
+    return description
+
+
+def compute_checksum(node_types: List[Type["NodeType"]]) -> str:
+    """
+    Computes a checksum over the NodeType definitions and the models they configure.
+    The checksum changes whenever a Meta option, a model field or the snapshot format changes.
+
+    Args:
+        node_types (List[Type[NodeType]]): the NodeType subclasses passed to SchemaConfigurator
+
+    Returns:
+        str: a sha256 hex digest
+    """
+    description = {"version": SNAPSHOT_VERSION, "node_types": []}
+    for node_type in node_types:
+        node = node_type.__new__(node_type)
+        node.__prepare_model_class__()
+        meta = {key: describe_value(value) for key, value in vars(node_type.Meta).items() if not key.startswith("__")}
+        fields = [field.name for field in node.model._meta.get_fields()] if node_type.Meta.fields == "__all__" else node_type.Meta.fields
+        # include the resolved conversions, so that registering a conversion invalidates the snapshot
+        conversion_table = build_conversion_table(node.model, fields, node_type.Meta.extra_kwargs)
+        description["node_types"].append({
+            "class": class_path(node_type),
+            "meta": meta,
+            "get_queryset": class_path(node_type.get_queryset) if hasattr(node_type, "get_queryset") else None,
+            "model": describe_model(node.model),
+            "conversions": describe_value(conversion_table),
+        })
+    return hashlib.sha256(json.dumps(description, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def build_conversion_table(
+        model: Type[models.Model],
+        fields: List[str],
+        extra_kwargs: Dict[str, dict] = {},
+    ) -> Dict[str, Tuple[str, Union[type, None], Union[type, None]]]:
+    """
+    Resolves every configured field of the model to the input it is going to be converted to.
+
+    Args:
+        model (Type[models.Model]): Django model
+        fields (List[str]): the configured field names
+        extra_kwargs (Dict[str, dict], optional): extra kwargs of the fields. Defaults to {}.
+
+    Returns:
+        Dict[str, Tuple[str, type, type]]: a dictionary where keys are field names and values are tuples of
+        kind ("to_many", "to_one", "id" or "scalar"), the form field class and the graphene scalar.
+    """
+    table = {}
+    for field in model._meta.get_fields():
+        if field.name not in fields:
+            continue
+        if field.is_relation:
+            kind = "to_many" if field.many_to_many or field.many_to_one else "to_one"
+            table[field.name] = (kind, None, None)
+        elif field.primary_key:
+            table[field.name] = ("id", None, None)
+        else:
+            field_kwargs = extra_kwargs.get(field.name, {})
+            conversion = configure_input_field(field=field.__class__, field_extra_kwargs=field_kwargs)
+            _type = conversions.get_scalar(field.__class__)
+            table[field.name] = ("scalar", conversion, _type)
+    return table
+
+
+def is_literal(value: Any) -> bool:
+    """
+    Returns True if the value can be written into the snapshot module and read back unchanged.
+    """
+    try:
+        return ast.literal_eval(repr(value)) == value
+    except (ValueError, SyntaxError):
+        return False
+
+
+def render_input_object_type(node: "NodeType", imports: set, input_field_classes: Dict[Tuple[type, type], str]) -> Union[str, None]:
+    """
+    Renders the source of the static InputObjectType of a configured NodeType instance.
+    Returns None if the input type depends on values that can not be written as literals.
+    """
+    table = build_conversion_table(node.model, node.fields, node.Meta.extra_kwargs)
+    lines = [
+        f"class {node.conventional_name}Input(graphene.InputObjectType):",
+        f"    model = apps.get_model({node.model._meta.label!r})",
+        "",
+        "    class Meta:",
+        f"        model = apps.get_model({node.model._meta.label!r})",
+        "",
+    ]
+    for field in node.model._meta.get_fields():
+        if field.name not in table:
+            continue
+        field_kwargs = {**node.Meta.extra_kwargs.get(field.name, {})}
+        if field.name != "id":
+            field_kwargs['required'] = field_kwargs.get('required', not field.null and not field.blank)
+        else:
+            field_kwargs['required'] = field_kwargs.get('required', False)
+        if not is_literal(field_kwargs):
+            return None
+        kwargs = "".join(f", {key}={value!r}" for key, value in field_kwargs.items())
+        kind, form_field_class, scalar = table[field.name]
+        if kind == "to_many":
+            remove_kwargs = "".join(f", {key}={value!r}" for key, value in {**field_kwargs, "required": False}.items())
+            lines.append(f"    add_{field.name} = graphene.List(graphene.ID{kwargs})")
+            lines.append(f"    remove_{field.name} = graphene.List(graphene.ID{remove_kwargs})")
+        elif kind in ("to_one", "id"):
+            lines.append(f"    {field.name} = graphene.ID({kwargs.lstrip(', ')})")
+        else:
+            imports.add(form_field_class.__module__)
+            imports.add(scalar.__module__)
+            key = (form_field_class, scalar)
+            if key not in input_field_classes:
+                input_field_classes[key] = f"{form_field_class.__name__}{scalar.__name__}InputField"
+            lines.append(f"    {field.name} = {input_field_classes[key]}({class_path(scalar)}{kwargs})")
+    return "\n".join(lines)
+
+
+def render_snapshot(configurator: "SchemaConfigurator") -> str:
+    """
+    Renders an importable python module, which freezes the result of the SchemaConfigurator.
+    The module holds the checksum of the NodeType definitions, the static InputObjectType classes,
+    the field conversion tables and the introspection result of the schema.
+
+    Args:
+        configurator (SchemaConfigurator): an instantiated SchemaConfigurator
+
+    Returns:
+        str: the source of the snapshot module
+    """
+    imports = set()
+    input_field_classes = {}
+    input_types = {}
+    conversion_tables = {}
+    for node in configurator.instantiated_types:
+        rendered = render_input_object_type(node, imports, input_field_classes)
+        if rendered:
+            input_types[node.conventional_name] = rendered
+        conversion_tables[node.conventional_name] = {
+            name: (kind, class_path(form_field) if form_field else None, class_path(scalar) if scalar else None)
+            for name, (kind, form_field, scalar) in build_conversion_table(node.model, node.fields, node.Meta.extra_kwargs).items()
+        }
+
+    # intern the input field classes in the shared registry instead of declaring duplicates
+    field_classes_source = "\n".join(
+        f"{name} = get_input_field_class({class_path(form_field_class)}, {class_path(scalar)})"
+        for (form_field_class, scalar), name in input_field_classes.items()
+    )
+    input_types_source = "\n\n\n".join(input_types.values())
+    registry = ",\n".join(f"    {name!r}: {name}Input" for name in input_types)
+
+    return "\n".join([
+        '"""',
+        "Schema snapshot generated by the 'dre-snapshot' command. Do not edit.",
+        '"""',
+        "import graphene",
+        *[f"import {module}" for module in sorted(imports)],
+        "from django.apps import apps",
+        "from django_relay_endpoint.configurators.fields import get_input_field_class",
+        "",
+        "",
+        f"SNAPSHOT_VERSION = {SNAPSHOT_VERSION}",
+        "",
+        f"CHECKSUM = {compute_checksum(configurator.node_types)!r}",
+        "",
+        f"CONVERSIONS = {conversion_tables!r}",
+        "",
+        f"INTROSPECTION = {configurator.schema().introspect()!r}",
+        "",
+        "",
+        field_classes_source,
+        "",
+        "",
+        input_types_source,
+        "",
+        "",
+        "INPUT_OBJECT_TYPES = {",
+        registry,
+        "}",
+        "",
+    ])
+
+
+def load_snapshot(snapshot: Union[str, ModuleType], node_types: List[Type["NodeType"]]) -> Union[ModuleType, None]:
+    """
+    Imports the snapshot module and verifies it against the NodeType definitions, unless the SNAPSHOT_CHECKSUM setting is False.
+
+    Args:
+        snapshot (Union[str, ModuleType]): the snapshot module or its dotted path
+        node_types (List[Type[NodeType]]): the NodeType subclasses passed to SchemaConfigurator
+
+    Returns:
+        Union[ModuleType, None]: the snapshot module, or None if it is stale
+    """
+    module = importlib.import_module(snapshot) if isinstance(snapshot, str) else snapshot
+    if getattr(module, "SNAPSHOT_VERSION", None) != SNAPSHOT_VERSION or (
+            dre_settings.SNAPSHOT_CHECKSUM and module.CHECKSUM != compute_checksum(node_types)):
+        warnings.warn(STALE_SNAPSHOT_WARNING.format(module=module.__name__))
+        return None
+    return module
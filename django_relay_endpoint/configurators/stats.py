@@ -0,0 +1,185 @@
+import tracemalloc
+from dataclasses import dataclass, field, asdict
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Set, Type
+import graphene
+from graphene.utils.str_converters import to_camel_case
+from graphql import GraphQLInputObjectType, GraphQLNamedType, GraphQLSchema, get_named_type
+from graphene.types.dynamic import Dynamic
+from django_relay_endpoint.configurators.node import NodeType
+from django_relay_endpoint.configurators.schema import SchemaConfigurator
+from django_relay_endpoint.profiling import generated_node_types
+
+
+REVERSE_RELATIONS_WARNING = "{node_type} declares fields = '__all__' and exposes {count} reverse relations ({relations}), each adds a connection with its edge and filterset types. Declare the fields explicitly."
+
+
+@dataclass
+class NodeTypeStats:
+    """
+    The footprint of a configured NodeType, or of the final schema assembly.
+    Times are in milliseconds, memory is the size of the blocks allocated by the build that are still alive, in bytes.
+    The classes of a NodeType are the named types of the schema that only its root fields reach, see `count_node_types`,
+    the input types are the input object types among them. The classes of the schema assembly are all its named types.
+    """
+    name: str
+    build_time: float = 0
+    memory: int = 0
+    classes: int = 0
+    fields: int = 0
+    relations: int = 0
+    input_types: int = 0
+    input_fields: int = 0
+    filtersets: int = 0
+    reverse_relations: List[str] = field(default_factory=list)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def get_reverse_relations(instantiated_type: NodeType) -> List[str]:
+    """
+    Returns the names of the reverse relations exposed by a NodeType with fields = '__all__'.
+    """
+    if instantiated_type.Meta.fields != "__all__":
+        return []
+    return [
+        model_field.name
+        for model_field in instantiated_type.model._meta.get_fields()
+        if model_field.is_relation and model_field.auto_created and not model_field.concrete
+    ]
+
+
+def count_node_type(stats: NodeTypeStats, instantiated_type: NodeType, query: Type[graphene.ObjectType]) -> None:
+    """
+    Counts the fields and filtersets generated for the NodeType.
+    The filterset classes of the root connections are created lazily, counting them creates them.
+    """
+    object_type_fields = instantiated_type.django_object_type._meta.fields
+    stats.fields = len(object_type_fields)
+    stats.relations = sum(isinstance(object_type_field, Dynamic) for object_type_field in object_type_fields.values())
+    stats.input_fields = len(instantiated_type.input_object_type._meta.fields)
+    for query_field in query._meta.fields.values():
+        if getattr(query_field, "filterset_class", None) is not None:
+            stats.filtersets += 1
+    stats.reverse_relations = get_reverse_relations(instantiated_type)
+
+
+def get_node_type(graphene_type: Optional[type]) -> Optional[type]:
+    """
+    Returns the NodeType that generated the graphene type, or of the node of a connection, or None.
+    """
+    node_type = generated_node_types.get(graphene_type) if isinstance(graphene_type, type) else None
+    if node_type is None and isinstance(graphene_type, type) and issubclass(graphene_type, graphene.relay.Connection):
+        node_type = generated_node_types.get(graphene_type._meta.node)
+    return node_type
+
+
+def get_reached_types(graphql_schema: GraphQLSchema, root_field_names: List[str], node_type: type) -> Set[str]:
+    """
+    Returns the names of the named types reached from the root fields, without entering the types generated for other NodeTypes,
+    e.g. the object type and the connection of a relation.
+    """
+    roots = [graphql_schema.query_type, graphql_schema.mutation_type]
+    pending = [
+        root.fields[name] for root in roots if root is not None for name in root_field_names if name in root.fields
+    ]
+    reached: Set[str] = set()
+
+    def reach(graphql_type) -> None:
+        named_type: GraphQLNamedType = get_named_type(graphql_type)
+        if named_type.name in reached or get_node_type(getattr(named_type, "graphene_type", None)) not in (None, node_type):
+            return
+        reached.add(named_type.name)
+        pending.extend(getattr(named_type, "fields", {}).values())
+        pending.extend(getattr(named_type, "interfaces", ()))
+        pending.extend(getattr(named_type, "types", ()))
+
+    while pending:
+        item = pending.pop()
+        if hasattr(item, "args"):
+            for arg in item.args.values():
+                reach(arg.type)
+        reach(getattr(item, "type", item))
+    return reached
+
+
+def count_node_types(stats: List[NodeTypeStats], configurator: SchemaConfigurator, graphql_schema: GraphQLSchema) -> None:
+    """
+    Counts the named types that every NodeType adds to the schema: the types reached from its root fields only.
+    The types reached from the root fields of several NodeTypes, e.g. PageInfo, the Node interface or the scalars, are shared
+    and are not counted by any NodeType.
+    """
+    reached_types = []
+    for instantiated_type, query, mutation in zip(configurator.instantiated_types, configurator.query, configurator.mutation):
+        root_field_names = [
+            root_field.name or to_camel_case(name)
+            for root_type in (query, mutation) for name, root_field in root_type._meta.fields.items()
+        ]
+        reached_types.append(get_reached_types(graphql_schema, root_field_names, type(instantiated_type)))
+    for node_type_stats, reached in zip(stats, reached_types):
+        added = reached.difference(*(other for other in reached_types if other is not reached))
+        node_type_stats.classes = len(added)
+        node_type_stats.input_types = sum(isinstance(graphql_schema.type_map[name], GraphQLInputObjectType) for name in added)
+
+
+class SchemaStatsConfigurator(SchemaConfigurator):
+    """
+    A SchemaConfigurator that measures the build time and the memory of every NodeType and of the final schema assembly.
+    tracemalloc must be tracing, see `collect_schema_stats`.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        self.stats: List[NodeTypeStats] = []
+        super().__init__(*args, **kwargs)
+
+    def configure_node_type(self, node_type: Type[NodeType]) -> NodeType:
+        stats = NodeTypeStats(node_type.__name__)
+        memory = tracemalloc.get_traced_memory()[0]
+        started = perf_counter()
+        instantiated_type = super().configure_node_type(node_type)
+        count_node_type(stats, instantiated_type, self.query[-1])
+        stats.build_time = round((perf_counter() - started) * 1000, 3)
+        stats.memory = tracemalloc.get_traced_memory()[0] - memory
+        self.stats.append(stats)
+        return instantiated_type
+
+    def schema(self) -> graphene.Schema:
+        stats = NodeTypeStats("<schema>")
+        memory = tracemalloc.get_traced_memory()[0]
+        started = perf_counter()
+        schema = super().schema()
+        stats.build_time = round((perf_counter() - started) * 1000, 3)
+        stats.memory = tracemalloc.get_traced_memory()[0] - memory
+        stats.classes = len(schema.graphql_schema.type_map)
+        count_node_types(self.stats, self, schema.graphql_schema)
+        self.stats.append(stats)
+        return schema
+
+
+def collect_schema_stats(configurator: SchemaConfigurator) -> List[NodeTypeStats]:
+    """
+    Configures the NodeTypes of the configurator once more, with the same options, under tracemalloc and timers.
+    The caches of the package were warmed by the first configuration, the times and the memory are those of a warm re-build,
+    they compare the NodeTypes rather than measuring a cold start.
+
+    Returns:
+        List[NodeTypeStats]: the stats of every NodeType, followed by the stats of the schema assembly, whose classes are
+        the named types of the schema
+    """
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    try:
+        stats_configurator = SchemaStatsConfigurator(
+            configurator.node_types,
+            snapshot=configurator.snapshot,
+            read_database=configurator.read_database,
+            sticky_seconds=configurator.sticky_seconds,
+            asynchronous=configurator.asynchronous,
+        )
+        stats_configurator.schema()
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+    return stats_configurator.stats
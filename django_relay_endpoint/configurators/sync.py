@@ -0,0 +1,294 @@
+import json
+import time
+import warnings
+from datetime import timedelta
+from functools import lru_cache
+from typing import Any, List, NamedTuple, Optional, Tuple, Type
+import graphene
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import models
+from django.db.models import Max
+from django.db.models.query import QuerySet
+from django.db.models.signals import post_delete
+from django.utils import timezone
+from graphene_django.filter import DjangoFilterConnectionField
+from graphene_django.settings import graphene_settings
+from graphene_django.utils import maybe_queryset
+from graphql_relay import to_global_id
+from graphql_relay.utils import base64, unbase64
+from django_relay_endpoint.settings import dre_settings
+
+
+SYNC_FIELDS = (models.DateTimeField, models.IntegerField)
+
+
+class SyncIndexWarning(UserWarning):
+    pass
+
+
+class Watermark(NamedTuple):
+    """
+    The position of a client in the changes of a model: the sync field value and the primary key of the last record it received,
+    the id of the last tombstone it received, and the time of its position in the tombstones as a unix timestamp,
+    i.e. the tombstones it has not received were recorded after it. The watermarks whose time is older than the
+    SYNC_WATERMARK_MAX_AGE setting are rejected, so that the older tombstones can be pruned, see `prune_tombstones`.
+    """
+    value: Any
+    pk: Any
+    tombstone: int
+    time: Optional[float] = None
+
+
+def is_indexed(model: Type[models.Model], name: str) -> bool:
+    """
+    Whether the column of the field leads an index of the model.
+    """
+    model_field = model._meta.get_field(name)
+    if model_field.db_index or model_field.unique or model_field.primary_key:
+        return True
+    indexes = [index.fields for index in model._meta.indexes]
+    indexes += [constraint.fields for constraint in model._meta.total_unique_constraints]
+    return any(fields and fields[0].lstrip("-") == name for fields in indexes)
+
+
+def assert_sync_field_is_valid(model: Type[models.Model], name: str) -> None:
+    """
+    Asserts that the sync field of a NodeType is a non nullable timestamp or sequence column of the model,
+    and warns if it is not indexed, since every sync query filters and orders by it.
+
+    Raises:
+        AssertionError: if the field is not a concrete, non nullable DateTimeField or IntegerField of the model
+    """
+    try:
+        model_field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        raise AssertionError(f"{model.__name__} has no field '{name}' to sync by")
+    if not model_field.concrete or not isinstance(model_field, SYNC_FIELDS) or model_field.null:
+        raise AssertionError(
+            f"{model.__name__}.{name} must be a non nullable DateTimeField or IntegerField to sync by, e.g. `DateTimeField(auto_now=True)`")
+    if not is_indexed(model, name):
+        warnings.warn(f"{model.__name__}.{name} is not indexed, every sync query filters and orders by it", SyncIndexWarning, stacklevel=3)
+
+
+def to_json_value(value: Any) -> Any:
+    return value if value is None or isinstance(value, (int, str)) else str(value)
+
+
+def encode_watermark(watermark: Watermark) -> str:
+    return base64(json.dumps([to_json_value(watermark.value), to_json_value(watermark.pk), watermark.tombstone, watermark.time]))
+
+
+def decode_watermark(model: Type[models.Model], sync_field: str, watermark: Optional[str]) -> Optional[Watermark]:
+    """
+    Returns the Watermark of the `updated_since` argument, or None if it is not given.
+
+    Raises:
+        ValidationError: if the watermark was not returned by a sync connection of the model, or is older than SYNC_WATERMARK_MAX_AGE
+    """
+    if watermark is None:
+        return None
+    try:
+        # the watermarks returned before the time was added have three items
+        value, pk, tombstone, *position = json.loads(unbase64(watermark))
+        if value is not None:
+            value = model._meta.get_field(sync_field).to_python(value)
+            pk = model._meta.pk.to_python(pk)
+        decoded = Watermark(value, pk, int(tombstone), float(position[0]) if position and position[0] is not None else None)
+    except (ValueError, TypeError, ValidationError):
+        raise ValidationError(f"Invalid watermark: {watermark}")
+    max_age = dre_settings.SYNC_WATERMARK_MAX_AGE
+    if max_age is not None and (decoded.time is None or decoded.time < time.time() - max_age):
+        # the tombstones the client has not received may have been pruned
+        raise ValidationError(f"Expired watermark, the sync must start without one: {watermark}")
+    return decoded
+
+
+def tombstones_queryset(model: Type[models.Model], using: str) -> QuerySet:
+    from django_relay_endpoint.models import Tombstone
+    return Tombstone.objects.using(using).filter(model_label=model._meta.label_lower)
+
+
+def record_tombstone(sender: Type[models.Model], instance: models.Model, using: str, **kwargs) -> None:
+    """
+    The `post_delete` receiver recording the tombstone of a deleted object, in the transaction of the deletion.
+    """
+    from django_relay_endpoint.models import Tombstone
+    Tombstone.objects.using(using).create(model_label=sender._meta.label_lower, object_id=str(instance.pk))
+
+
+def prune_tombstones(max_age: float = None, using: str = None) -> int:
+    """
+    Deletes the tombstones older than `max_age` seconds, defaulting to the SYNC_WATERMARK_MAX_AGE setting, which the watermarks still accepted
+    do not need.
+
+    Raises:
+        ValueError: if neither max_age nor the setting is given, or max_age is lower than the setting
+
+    Returns:
+        int: the number of deleted tombstones
+    """
+    from django_relay_endpoint.models import Tombstone
+    accepted_age = dre_settings.SYNC_WATERMARK_MAX_AGE
+    max_age = accepted_age if max_age is None else max_age
+    if max_age is None:
+        raise ValueError("The tombstones are kept unless the SYNC_WATERMARK_MAX_AGE setting or max_age is given")
+    if accepted_age is not None and max_age < accepted_age:
+        raise ValueError(f"The accepted watermarks may need the tombstones younger than SYNC_WATERMARK_MAX_AGE, {accepted_age} seconds")
+    cutoff = timezone.now() - timedelta(seconds=max_age)
+    deleted, _ = Tombstone.objects.using(using).filter(deleted_at__lt=cutoff).delete()
+    return deleted
+
+
+def connect_tombstones(model: Type[models.Model]) -> None:
+    """
+    Records the tombstones of the deleted objects of the model, whether they are deleted by the delete mutation,
+    the admin or `QuerySet.delete`, which sends `post_delete` for every object when a receiver is connected.
+    """
+    post_delete.connect(record_tombstone, sender=model, dispatch_uid=f"django_relay_endpoint_tombstone_{model._meta.label_lower}")
+
+
+def filter_since(queryset: QuerySet, sync_field: str, since: Optional[Watermark]) -> QuerySet:
+    """
+    Filters the records following the watermark in the order of the sync field and the primary key.
+    """
+    if since is None or since.value is None:
+        return queryset
+    return queryset.filter(**{f"{sync_field}__gte": since.value}).exclude(**{sync_field: since.value, "pk__lte": since.pk})
+
+
+class SyncConnection(graphene.relay.Connection):
+    """
+    The connection of a DjangoObjectType declaring a sync field, whose root field returns the `watermark` of the page
+    and the `deletedIds` following the `updatedSince` watermark. Both are null for the connections without them, e.g. nested connections.
+    """
+
+    class Meta:
+        abstract = True
+
+    watermark = graphene.String(description="The `updatedSince` argument that fetches the changes following this page")
+    deleted_ids = graphene.List(graphene.NonNull(graphene.ID), description="The ids of the records deleted since `updatedSince`")
+
+
+class SyncConnectionFieldMixin:
+    """
+    A mixin of the connection field classes that takes an `updated_since` watermark, which filters the records
+    changed after it, ordered by the sync field of the node type and the primary key unless `order_by` is given,
+    and returns the watermark of the last record of the page and the tombstones following the watermark, at most a page of them.
+    The tombstones are read with one query from the database of the queryset.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        kwargs.setdefault("updated_since", graphene.String(description="The `watermark` of the last page received"))
+        super().__init__(*args, **kwargs)
+
+    @staticmethod
+    def filter_queryset_since(queryset: QuerySet, connection: Type[graphene.relay.Connection], args) -> QuerySet:
+        sync_field = connection._meta.node.sync_field
+        since = decode_watermark(connection._meta.node._meta.model, sync_field, args.get("updated_since"))
+        queryset = filter_since(queryset, sync_field, since)
+        return queryset if args.get("order_by") else queryset.order_by(sync_field, "pk")
+
+    @classmethod
+    def resolve_queryset(cls, connection, iterable, info, args, *resolver_args, **resolver_kwargs):
+        queryset = super().resolve_queryset(connection, iterable, info, args, *resolver_args, **resolver_kwargs)
+        return cls.filter_queryset_since(queryset, connection, args)
+
+    @classmethod
+    async def aresolve_queryset(cls, connection, iterable, info, args, *resolver_args, **resolver_kwargs):
+        queryset = await super().aresolve_queryset(connection, iterable, info, args, *resolver_args, **resolver_kwargs)
+        return cls.filter_queryset_since(queryset, connection, args)
+
+    @staticmethod
+    def get_page_size(args, max_limit: Optional[int]) -> int:
+        return args.get("first") or max_limit or graphene_settings.RELAY_CONNECTION_MAX_LIMIT
+
+    @staticmethod
+    def get_last_record(connection: graphene.relay.Connection, sync_field: str) -> Tuple[Any, Any]:
+        """
+        Returns the sync field value, or None if the last node was fetched without it, and the primary key of the last node of the page.
+        """
+        node = connection.edges[-1].node
+        # the field values of models and of the nodes of the values fast path are in __dict__ if they were fetched
+        return node.__dict__.get(sync_field), node.pk
+
+    @staticmethod
+    def set_watermark(
+            connection: graphene.relay.Connection,
+            since: Optional[Watermark],
+            last_record: Optional[Tuple[Any, Any]],
+            deleted: List[Tuple[int, str, Any]],
+            tombstone: int,
+            page_size: int,
+            started: float,
+    ) -> graphene.relay.Connection:
+        """
+        Sets the watermark and the deleted ids of the page. The time of the watermark is `started`, read before the tombstones,
+        if the client received all of them, otherwise the time of the last tombstone it received.
+        """
+        node_type = type(connection)._meta.node
+        if last_record is None:
+            # an empty page keeps the position of the client
+            last_record = (since.value, since.pk) if since else (None, None)
+        value, pk = last_record
+        position = deleted[-1][2].timestamp() if len(deleted) >= page_size else started
+        connection.watermark = encode_watermark(Watermark(value, pk, deleted[-1][0] if deleted else tombstone, position))
+        connection.deleted_ids = [to_global_id(node_type._meta.name, object_id) for _, object_id, _ in deleted]
+        return connection
+
+    @classmethod
+    def resolve_connection(cls, connection, args, iterable, max_limit=None):
+        resolved = super().resolve_connection(connection, args, iterable, max_limit=max_limit)
+        queryset = maybe_queryset(iterable)
+        if not isinstance(queryset, QuerySet) or args.get("order_by"):
+            return resolved
+        sync_field = connection._meta.node.sync_field
+        since = decode_watermark(queryset.model, sync_field, args.get("updated_since"))
+        last_record = None
+        if resolved.edges:
+            last_record = cls.get_last_record(resolved, sync_field)
+            if last_record[0] is None:
+                last_record = (queryset.model._default_manager.using(queryset.db).filter(pk=last_record[1]).values_list(sync_field, flat=True).first(), last_record[1])
+        tombstones = tombstones_queryset(queryset.model, queryset.db)
+        page_size = cls.get_page_size(args, max_limit)
+        started = time.time()
+        if since is None:
+            # the first sync of a client starts after the last tombstone
+            deleted, tombstone = [], tombstones.aggregate(last=Max("id"))["last"] or 0
+        else:
+            deleted = list(tombstones.filter(id__gt=since.tombstone).order_by("id").values_list("id", "object_id", "deleted_at")[:page_size])
+            tombstone = since.tombstone
+        return cls.set_watermark(resolved, since, last_record, deleted, tombstone, page_size, started)
+
+    @classmethod
+    async def aresolve_connection(cls, connection, args, iterable, max_limit=None):
+        """
+        The async counterpart of `resolve_connection`, with the async ORM.
+        """
+        resolved = await super().aresolve_connection(connection, args, iterable, max_limit=max_limit)
+        queryset = maybe_queryset(iterable)
+        if not isinstance(queryset, QuerySet) or args.get("order_by"):
+            return resolved
+        sync_field = connection._meta.node.sync_field
+        since = decode_watermark(queryset.model, sync_field, args.get("updated_since"))
+        last_record = None
+        if resolved.edges:
+            last_record = cls.get_last_record(resolved, sync_field)
+            if last_record[0] is None:
+                last_record = (await queryset.model._default_manager.using(queryset.db).filter(pk=last_record[1]).values_list(sync_field, flat=True).afirst(), last_record[1])
+        tombstones = tombstones_queryset(queryset.model, queryset.db)
+        page_size = cls.get_page_size(args, max_limit)
+        started = time.time()
+        if since is None:
+            deleted, tombstone = [], (await tombstones.aaggregate(last=Max("id")))["last"] or 0
+        else:
+            deleted = [row async for row in tombstones.filter(id__gt=since.tombstone).order_by("id").values_list("id", "object_id", "deleted_at")[:page_size]]
+            tombstone = since.tombstone
+        return cls.set_watermark(resolved, since, last_record, deleted, tombstone, page_size, started)
+
+
+@lru_cache(maxsize=None)
+def get_sync_connection_field_class(connection_field_class: Type[DjangoFilterConnectionField]) -> Type[DjangoFilterConnectionField]:
+    """
+    Returns the subclass of the connection field class with SyncConnectionFieldMixin, created once.
+    """
+    return type(f"Sync{connection_field_class.__name__}", (SyncConnectionFieldMixin, connection_field_class), {})
@@ -0,0 +1,184 @@
+import graphene
+from typing import Any, Dict, Tuple, Union
+from django.utils.translation import gettext_lazy as _
+from graphene_django.settings import graphene_settings
+from graphql import (
+    DocumentNode,
+    FieldNode,
+    FragmentSpreadNode,
+    GraphQLError,
+    GraphQLList,
+    GraphQLObjectType,
+    GraphQLSchema,
+    SelectionSetNode,
+    get_named_type,
+    get_nullable_type,
+    OperationDefinitionNode,
+    get_operation_ast,
+    value_from_ast_untyped,
+)
+from graphql.execution.values import get_variable_values
+from django_relay_endpoint.settings import dre_settings
+
+
+QUERY_COST_ERROR = _("The estimated cost {cost} of the operation exceeds the maximum cost of {max_cost}.")
+QUERY_DEPTH_ERROR = _("The depth {depth} of the operation exceeds the maximum depth of {max_depth}.")
+PAGE_SIZE_ERROR = _("Requesting {size} records on the `{field}` connection exceeds the maximum page size of {max_size} records.")
+
+
+def get_connection_node_type(graphql_type: Any) -> Union[type, None]:
+    """
+    Returns the graphene node type of a connection type, or None if the type is not a connection.
+    """
+    graphene_type = getattr(get_named_type(graphql_type), "graphene_type", None)
+    if isinstance(graphene_type, type) and issubclass(graphene_type, graphene.relay.Connection):
+        return graphene_type._meta.node
+    return None
+
+
+def get_default_page_size(node_type: type) -> Union[int, None]:
+    """
+    Returns the page size of a connection of node_type without `first` or `last`:
+    the `default_page_size` of the NodeType or the DEFAULT_PAGE_SIZE setting, capped by the `max_page_size` of the NodeType.
+    """
+    default_page_size = getattr(node_type, "default_page_size", None) or dre_settings.DEFAULT_PAGE_SIZE
+    max_page_size = getattr(node_type, "max_page_size", None)
+    if max_page_size:
+        return min(default_page_size, max_page_size) if default_page_size else max_page_size
+    return default_page_size
+
+
+def get_page_size(node_type: type, args: Dict[str, Any]) -> int:
+    """
+    Returns the number of records a connection of node_type fetches with given arguments.
+    Falls back to graphene_django's RELAY_CONNECTION_MAX_LIMIT, which graphene_django applies when no page size is set.
+    """
+    return (
+        args.get("first")
+        or args.get("last")
+        or get_default_page_size(node_type)
+        or graphene_settings.RELAY_CONNECTION_MAX_LIMIT
+        or 1
+    )
+
+
+class QueryCostAnalyzer:
+    """
+    Estimates the cost of an operation from its validated document, before the operation is executed.
+
+    Every object costs the `cost_weight` of its type, declared on NodeType.Meta (defaults to 1).
+    A connection costs its page size, i.e. `first`, `last` or the default page size, times the weight of its node type,
+    and multiplies the cost of the selections of its nodes by the page size. Scalars are free.
+    Connections requesting more records than the `max_page_size` of their NodeType are rejected.
+    """
+
+    def __init__(self, schema: GraphQLSchema, document: DocumentNode, variables: Dict[str, Any] = None) -> None:
+        self.schema = schema
+        self.variables = variables or {}
+        self.fragments = {
+            definition.name.value: definition
+            for definition in document.definitions
+            if definition.kind == "fragment_definition"
+        }
+
+    def get_arguments(self, field_node: FieldNode) -> Dict[str, Any]:
+        return {
+            argument.name.value: value_from_ast_untyped(argument.value, self.variables)
+            for argument in field_node.arguments or []
+        }
+
+    def analyze_selection_set(self, selection_set: SelectionSetNode, parent_type: Any, multiplier: int, depth: int, charged: bool = True) -> Tuple[int, int]:
+        """
+        Returns the cost and the depth of the selection set.
+        The fields of uncharged selection sets, i.e. the `edges`, `node` and `pageInfo` of a connection, are free,
+        because the connection has been charged for its records.
+        """
+        cost = 0
+        max_depth = depth
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                selection_cost, selection_depth = self.analyze_field(selection, parent_type, multiplier, depth, charged)
+            else:
+                if isinstance(selection, FragmentSpreadNode):
+                    fragment = self.fragments[selection.name.value]
+                else:
+                    fragment = selection
+                fragment_type = self.schema.get_type(fragment.type_condition.name.value) if fragment.type_condition else parent_type
+                selection_cost, selection_depth = self.analyze_selection_set(fragment.selection_set, fragment_type, multiplier, depth, charged)
+            cost += selection_cost
+            max_depth = max(max_depth, selection_depth)
+        return cost, max_depth
+
+    def analyze_field(self, field_node: FieldNode, parent_type: Any, multiplier: int, depth: int, charged: bool = True) -> Tuple[int, int]:
+        """
+        Returns the cost and the depth of a field.
+        """
+        field_name = field_node.name.value
+        fields = getattr(parent_type, "fields", {})
+        if field_name not in fields or not field_node.selection_set:
+            return 0, depth
+
+        field_type = fields[field_name].type
+        named_type = get_named_type(field_type)
+
+        if not charged:
+            # only the selections of `edges` stay uncharged, i.e. `node`
+            return self.analyze_selection_set(field_node.selection_set, named_type, multiplier, depth + 1, field_name != "edges")
+
+        node_type = get_connection_node_type(field_type)
+        if node_type is not None:
+            size = get_page_size(node_type, self.get_arguments(field_node))
+            max_page_size = getattr(node_type, "max_page_size", None)
+            if max_page_size and size > max_page_size:
+                raise GraphQLError(str(PAGE_SIZE_ERROR.format(size=size, field=field_name, max_size=max_page_size)), field_node)
+            cost = multiplier * size * getattr(node_type, "cost_weight", 1)
+            selection_cost, selection_depth = self.analyze_selection_set(field_node.selection_set, named_type, multiplier * size, depth + 1, False)
+            return cost + selection_cost, selection_depth
+
+        graphene_type = getattr(named_type, "graphene_type", None)
+        if isinstance(get_nullable_type(field_type), GraphQLList) and isinstance(named_type, GraphQLObjectType):
+            multiplier *= get_default_page_size(graphene_type) or graphene_settings.RELAY_CONNECTION_MAX_LIMIT or 1
+        cost = multiplier * getattr(graphene_type, "cost_weight", 1)
+        selection_cost, selection_depth = self.analyze_selection_set(field_node.selection_set, named_type, multiplier, depth + 1)
+        return cost + selection_cost, selection_depth
+
+
+def get_operation_variables(schema: GraphQLSchema, operation: OperationDefinitionNode, variables: Dict[str, Any] = None) -> Dict[str, Any]:
+    """
+    Returns the variables of the operation coerced by their definitions, with the defaults of the variables that are not given,
+    e.g. `$first: Int = 400`. Invalid variables are returned as given, execution rejects them.
+    """
+    coerced = get_variable_values(schema, operation.variable_definitions or [], variables or {})
+    return coerced if isinstance(coerced, dict) else variables or {}
+
+
+def analyze_query_cost(schema: GraphQLSchema, document: DocumentNode, operation_name: str = None, variables: Dict[str, Any] = None) -> Tuple[int, int]:
+    """
+    Estimates the cost and the depth of the operation and enforces the MAX_QUERY_COST and MAX_QUERY_DEPTH settings.
+
+    Args:
+        schema (GraphQLSchema): the graphql schema, i.e. `graphene.Schema.graphql_schema`
+        document (DocumentNode): the parsed and validated document
+        operation_name (str, optional): the name of the executed operation. Defaults to None.
+        variables (Dict[str, Any], optional): the variables of the operation. Defaults to None.
+
+    Raises:
+        GraphQLError: if the operation exceeds a limit or a connection exceeds its maximum page size
+
+    Returns:
+        Tuple[int, int]: the estimated cost and the depth
+    """
+    operation = get_operation_ast(document, operation_name)
+    if operation is None:
+        return 0, 0
+    root_type = schema.get_root_type(operation.operation)
+    variables = get_operation_variables(schema, operation, variables)
+    cost, depth = QueryCostAnalyzer(schema, document, variables).analyze_selection_set(operation.selection_set, root_type, 1, 0)
+
+    max_cost = dre_settings.MAX_QUERY_COST
+    if max_cost is not None and cost > max_cost:
+        raise GraphQLError(str(QUERY_COST_ERROR.format(cost=cost, max_cost=max_cost)), operation)
+    max_depth = dre_settings.MAX_QUERY_DEPTH
+    if max_depth is not None and depth > max_depth:
+        raise GraphQLError(str(QUERY_DEPTH_ERROR.format(depth=depth, max_depth=max_depth)), operation)
+    return cost, depth
@@ -0,0 +1,70 @@
+import json
+from decimal import Decimal
+from typing import Any, Dict, Optional
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.module_loading import import_string
+from django_relay_endpoint.settings import dre_settings
+
+
+class ResponseEncoder:
+    """
+    The JSON encoder of the responses of the endpoint views and its standard library default.
+    Subclasses implement `encode`, which returns the compact JSON of the data, or the indented JSON with sorted keys if `pretty`.
+    Decimal, UUID, date, time and timedelta values are encoded as by DjangoJSONEncoder.
+    """
+
+    def encode(self, data: Any, pretty: bool = False) -> str:
+        if pretty:
+            return json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True, indent=2, separators=(",", ": "))
+        return json.dumps(data, cls=DjangoJSONEncoder, separators=(",", ":"))
+
+
+class OrjsonResponseEncoder(ResponseEncoder):
+    """
+    An encoder that requires the `orjson` package, which encodes UUID, date and time values natively and Decimal values as strings.
+    Data orjson cannot encode, e.g. integers beyond 64 bits or lazy translations, falls back to the standard library encoder.
+    """
+
+    def __init__(self) -> None:
+        try:
+            import orjson
+        except ImportError:
+            raise ImproperlyConfigured("OrjsonResponseEncoder requires the 'orjson' package.")
+        self.orjson = orjson
+
+    @staticmethod
+    def default(value: Any) -> Any:
+        if isinstance(value, Decimal):
+            return str(value)
+        raise TypeError
+
+    def encode(self, data: Any, pretty: bool = False) -> str:
+        option = self.orjson.OPT_INDENT_2 | self.orjson.OPT_SORT_KEYS if pretty else 0
+        try:
+            return self.orjson.dumps(data, default=self.default, option=option).decode()
+        except self.orjson.JSONEncodeError:
+            return super().encode(data, pretty)
+
+
+# the encoders by the RESPONSE_ENCODER setting
+encoders: Dict[Optional[str], ResponseEncoder] = {}
+
+
+def get_response_encoder() -> ResponseEncoder:
+    """
+    Returns an instance of the class at the dotted path of the RESPONSE_ENCODER setting,
+    or OrjsonResponseEncoder if orjson is installed, or the standard library ResponseEncoder.
+    """
+    path = dre_settings.RESPONSE_ENCODER
+    encoder = encoders.get(path)
+    if encoder is None:
+        if path:
+            encoder = import_string(path)()
+        else:
+            try:
+                encoder = OrjsonResponseEncoder()
+            except ImproperlyConfigured:
+                encoder = ResponseEncoder()
+        encoders[path] = encoder
+    return encoder
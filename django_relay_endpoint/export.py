@@ -0,0 +1,155 @@
+import csv
+import json
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Type
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from graphene_django.filter import DjangoFilterConnectionField
+from graphene_django.registry import get_global_registry
+from graphql import GraphQLResolveInfo, parse
+from graphql.pyutils import Path
+from graphql_relay import to_global_id
+from django_relay_endpoint.configurators.object_types import DjangoObjectType
+from django_relay_endpoint.configurators.schema import SchemaConfigurator
+
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+EXPORT_OPERATION = parse("query Export { __typename }").definitions[0]
+
+
+class ExportColumn(NamedTuple):
+    """
+    A column of the export: a concrete field of the model that is a field of the object type.
+    The primary key and the foreign keys are exported as global ids of `type_name`, if the related model has an object type.
+    """
+    name: str
+    attname: str
+    type_name: Optional[str]
+
+    def serialize(self, value: Any) -> Any:
+        if self.type_name and value is not None:
+            return to_global_id(self.type_name, value)
+        return value
+
+
+def get_connection_field(configurator: SchemaConfigurator, root_field: str) -> Optional[DjangoFilterConnectionField]:
+    """
+    Returns the root connection field named `root_field`, e.g. `author`, of the query types of the configurator.
+    """
+    for query in configurator.query:
+        connection_field = query._meta.fields.get(root_field)
+        if isinstance(connection_field, DjangoFilterConnectionField):
+            return connection_field
+    return None
+
+
+def get_export_resolve_info(request, root_field: str) -> GraphQLResolveInfo:
+    """
+    Returns the resolve info passed to `get_queryset` of the exported type, that of a query operation selecting `root_field`.
+    """
+    return GraphQLResolveInfo(
+        field_name=root_field,
+        field_nodes=[],
+        return_type=None,
+        parent_type=None,
+        path=Path(None, root_field, "Query"),
+        schema=None,
+        fragments={},
+        root_value=None,
+        operation=EXPORT_OPERATION,
+        variable_values={},
+        context=request,
+        is_awaitable=lambda value: False,
+    )
+
+
+def get_export_columns(object_type: Type[DjangoObjectType], selected: Optional[List[str]] = None) -> List[ExportColumn]:
+    """
+    Returns the columns of the concrete fields of the model that are fields of the object type, or of the `selected` ones.
+    To-many relations are not exported.
+
+    Raises:
+        ValueError: if a selected field is not an exportable field
+    """
+    registry = get_global_registry()
+    model = object_type._meta.model
+    columns = {}
+    for model_field in model._meta.concrete_fields:
+        if model_field.name not in object_type._meta.fields:
+            continue
+        type_name = None
+        if model_field.primary_key:
+            type_name = object_type._meta.name
+        elif model_field.is_relation:
+            related_type = registry.get_type_for_model(model_field.related_model)
+            type_name = related_type._meta.name if related_type else None
+        columns[model_field.name] = ExportColumn(model_field.name, model_field.attname, type_name)
+    if not selected:
+        return list(columns.values())
+    unknown = [name for name in selected if name not in columns]
+    if unknown:
+        raise ValueError(f"The fields {', '.join(unknown)} cannot be exported, the exportable fields are {', '.join(columns)}")
+    return [columns[name] for name in selected]
+
+
+def iterate_rows(queryset: models.QuerySet, columns: List[ExportColumn], chunk_size: int) -> Iterator[Dict[str, Any]]:
+    """
+    Iterates the rows of the queryset in chunks of `chunk_size`, with server-side cursors where the database supports them,
+    so that only one chunk is held in memory.
+    """
+    if not queryset.ordered:
+        queryset = queryset.order_by("pk")
+    for values in queryset.values_list(*[column.attname for column in columns]).iterator(chunk_size=chunk_size):
+        yield {column.name: column.serialize(value) for column, value in zip(columns, values)}
+
+
+def render_ndjson(rows: Iterable[Dict[str, Any]], columns: List[ExportColumn]) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder) + "\n"
+
+
+class EchoBuffer:
+    """
+    A file-like object whose `write` returns the written value, so that csv.writer renders one line at a time.
+    """
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def render_csv(rows: Iterable[Dict[str, Any]], columns: List[ExportColumn]) -> Iterator[str]:
+    writer = csv.writer(EchoBuffer())
+    yield writer.writerow([column.name for column in columns])
+    for row in rows:
+        yield writer.writerow([
+            "" if value is None else json.dumps(value, cls=DjangoJSONEncoder) if isinstance(value, (dict, list)) else value
+            for value in row.values()
+        ])
+
+
+RENDERERS = {
+    "ndjson": render_ndjson,
+    "csv": render_csv,
+}
+
+
+def get_export_queryset(connection_field: DjangoFilterConnectionField, request, root_field: str, data: Dict[str, Any]) -> Tuple[Optional[models.QuerySet], Dict[str, Any]]:
+    """
+    Applies `get_queryset` of the object type, i.e. its permissions and read routing, and the filterset of the connection field,
+    i.e. the filter and ordering arguments of the connection, e.g. `name__icontains` and `order_by`.
+
+    Raises:
+        PermissionDenied: if the permissions of the object type deny the request
+
+    Returns:
+        Tuple[Optional[models.QuerySet], Dict[str, Any]]: the queryset and no errors, or None and the errors of the filterset
+    """
+    object_type: Type[DjangoObjectType] = connection_field.node_type
+    queryset = object_type.get_queryset(object_type._meta.model._default_manager.get_queryset(), get_export_resolve_info(request, root_field))
+    filterset = connection_field.filterset_class(data=data, queryset=queryset, request=request)
+    if not filterset.is_valid():
+        return None, filterset.errors
+    return filterset.qs, {}
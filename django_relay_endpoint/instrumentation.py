@@ -0,0 +1,170 @@
+import re
+from collections import Counter, defaultdict
+from contextlib import nullcontext
+from contextvars import ContextVar
+from inspect import isawaitable
+from threading import Lock
+from time import perf_counter
+from typing import Any, Dict, Optional
+import graphene
+from django.db.backends.base.base import BaseDatabaseWrapper
+
+
+current_instrumentation: ContextVar[Optional["Instrumentation"]] = ContextVar("django_relay_endpoint_instrumentation", default=None)
+
+IN_CLAUSE = re.compile(r"\bIN \((?:%s, )*%s\)", re.IGNORECASE)
+WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(sql: str) -> str:
+    """
+    Returns the fingerprint of a query, i.e. its sql with collapsed whitespace and IN clauses.
+    The parameters are not part of the sql, so the queries of N+1 patterns share the fingerprint.
+    """
+    return IN_CLAUSE.sub("IN (...)", WHITESPACE.sub(" ", sql).strip())
+
+
+class Instrumentation:
+    """
+    Collects the SQL queries, the resolver timings and the permission check timings of an operation.
+    The collector of the current operation is held by `current_instrumentation`, which the threads of
+    `sync_to_async` and `ConcurrentExecutionContext` inherit, therefore recording is guarded by a lock.
+    """
+
+    def __init__(self) -> None:
+        self.lock = Lock()
+        self.started = perf_counter()
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.fingerprints = Counter()
+        self.resolvers = defaultdict(lambda: [0, 0.0])
+        self.node_types = defaultdict(lambda: [0, 0.0])
+        self.permissions = defaultdict(lambda: [0, 0.0])
+
+    def record_query(self, sql: str, duration: float) -> None:
+        with self.lock:
+            self.sql_count += 1
+            self.sql_time += duration
+            self.fingerprints[fingerprint(sql)] += 1
+
+    def record_resolver(self, info: graphene.ResolveInfo, duration: float) -> None:
+        # list indexes are dropped from the path, so the items of a list share their timings
+        path = ".".join(str(key) for key in info.path.as_list() if not isinstance(key, int))
+        graphene_type = getattr(info.parent_type, "graphene_type", None)
+        with self.lock:
+            timing = self.resolvers[path]
+            timing[0] += 1
+            timing[1] += duration
+            if hasattr(getattr(graphene_type, "_meta", None), "model"):
+                timing = self.node_types[info.parent_type.name]
+                timing[0] += 1
+                timing[1] += duration
+
+    def record_permission_check(self, name: str, duration: float) -> None:
+        with self.lock:
+            timing = self.permissions[name]
+            timing[0] += 1
+            timing[1] += duration
+
+    @staticmethod
+    def format_timings(timings: Dict[str, list]) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {"count": count, "time": round(duration * 1000, 3)}
+            for name, (count, duration) in sorted(timings.items(), key=lambda item: -item[1][1])
+        }
+
+    def as_extension(self) -> Dict[str, Any]:
+        """
+        Returns the collected data for the response extensions, times are in milliseconds.
+        """
+        with self.lock:
+            return {
+                "duration": round((perf_counter() - self.started) * 1000, 3),
+                "sql": {
+                    "count": self.sql_count,
+                    "time": round(self.sql_time * 1000, 3),
+                    "duplicates": [
+                        {"fingerprint": sql, "count": count}
+                        for sql, count in self.fingerprints.most_common()
+                        if count > 1
+                    ],
+                },
+                "resolvers": self.format_timings(self.resolvers),
+                "node_types": self.format_timings(self.node_types),
+                "permissions": self.format_timings(self.permissions),
+            }
+
+
+def instrumented_execute(execute, sql, params, many, context):
+    """
+    A database execute wrapper that records the queries of instrumented operations.
+    """
+    instrumentation = current_instrumentation.get()
+    if instrumentation is None:
+        return execute(sql, params, many, context)
+    started = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        instrumentation.record_query(sql, perf_counter() - started)
+
+
+def instrument_connection(connection: BaseDatabaseWrapper, **kwargs) -> None:
+    """
+    Installs `instrumented_execute` on the connection, once. Serves as a `connection_created` receiver as well.
+    """
+    if instrumented_execute not in connection.execute_wrappers:
+        connection.execute_wrappers.append(instrumented_execute)
+
+
+class PermissionTimer:
+    """
+    Records the time of a permission check of an instrumented operation.
+    """
+
+    def __init__(self, instrumentation: Instrumentation, name: str) -> None:
+        self.instrumentation = instrumentation
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.started = perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        self.instrumentation.record_permission_check(self.name, perf_counter() - self.started)
+
+
+NULL_TIMER = nullcontext()
+
+
+def permission_timer(cls: type, method: str):
+    """
+    Returns a context manager that times the permission check of `cls.method` if the operation is instrumented.
+    """
+    instrumentation = current_instrumentation.get()
+    if instrumentation is None:
+        return NULL_TIMER
+    return PermissionTimer(instrumentation, f"{cls.__name__}.{method}")
+
+
+class InstrumentationMiddleware:
+    """
+    A graphene middleware that records the time of every resolver per path and per django object type.
+    `GraphQLView` adds it to instrumented operations only.
+    """
+
+    def __init__(self, instrumentation: Instrumentation) -> None:
+        self.instrumentation = instrumentation
+
+    def resolve(self, next, root, info: graphene.ResolveInfo, **args):
+        started = perf_counter()
+        result = next(root, info, **args)
+        if isawaitable(result):
+            return self.await_result(result, info, started)
+        self.instrumentation.record_resolver(info, perf_counter() - started)
+        return result
+
+    async def await_result(self, result, info: graphene.ResolveInfo, started: float):
+        try:
+            return await result
+        finally:
+            self.instrumentation.record_resolver(info, perf_counter() - started)
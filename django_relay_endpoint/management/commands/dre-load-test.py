@@ -0,0 +1,130 @@
+import json
+from pathlib import Path
+from django.core.management.base import BaseCommand, CommandParser, CommandError
+from django_relay_endpoint.replay import Replayer, is_mutation, load_operations, replay_operations
+
+
+LOAD_TEST_ROW = "{name:<40} {count:>7} {errors:>7} {p50:>10} {p95:>10} {p99:>10} {throughput:>10} {queries:>8}"
+
+
+class Command(BaseCommand):
+    """
+    Replays a file of recorded operations, see the RECORDING_FILE setting, and reports the latency percentiles,
+    the throughput and the SQL counts per operation.
+
+    Attributes:
+        help (str): A brief description of the command's purpose.
+        requires_migrations_checks (bool): Indicates whether the command requires migration checks.
+
+    Methods:
+        add_arguments(parser: CommandParser) -> None:
+            Adds command line arguments to the command parser.
+
+        handle(*args, **options) -> None:
+            Replays the operations and writes the report.
+    """
+    help = "Replays recorded GraphQL operations and reports latency percentiles, throughput and SQL counts"
+
+    requires_migrations_checks = True
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """
+        Adds command line arguments to the command parser.
+        "file": the file of recorded operations, one JSON object per line
+        "--schema", "-s": dotted path to a SchemaConfigurator instance or a graphene.Schema, required by the execute mode
+        "--mode", "-m": 'execute' runs the operations in-process, 'client' posts them to --url with the django test client
+        "--url": the endpoint url of the client mode
+        "--concurrency", "-c": the number of concurrent workers
+        "--workers", "-w": whether the workers are threads or processes
+        "--repeat", "-r": how many times the file is replayed
+        "--include-mutations": replay mutations as well, which are skipped by default
+        "--user", "-u": the username of the user executing the operations
+        "--output", "-o": a file to write the report to as JSON
+        """
+
+        parser.add_argument("file",
+            type=str,
+            help="The file of recorded operations"
+            )
+        parser.add_argument("--schema", "-s",
+            type=str,
+            required=False,
+            dest="schema",
+            help="Dotted path to a SchemaConfigurator instance or a graphene.Schema"
+            )
+        parser.add_argument("--mode", "-m",
+            choices=["execute", "client"],
+            default="execute",
+            dest="mode",
+            help="Execute the operations in-process or post them with the django test client"
+            )
+        parser.add_argument("--url",
+            type=str,
+            default="/graphql",
+            dest="url",
+            help="The endpoint url of the client mode"
+            )
+        parser.add_argument("--concurrency", "-c",
+            type=int,
+            default=1,
+            dest="concurrency",
+            help="The number of concurrent workers"
+            )
+        parser.add_argument("--workers", "-w",
+            choices=["thread", "process"],
+            default="thread",
+            dest="workers",
+            help="Whether the workers are threads or processes"
+            )
+        parser.add_argument("--repeat", "-r",
+            type=int,
+            default=1,
+            dest="repeat",
+            help="How many times the file is replayed"
+            )
+        parser.add_argument("--include-mutations",
+            action="store_true",
+            dest="include_mutations",
+            help="Replay mutations as well"
+            )
+        parser.add_argument("--user", "-u",
+            type=str,
+            required=False,
+            dest="user",
+            help="The username of the user executing the operations"
+            )
+        parser.add_argument("--output", "-o",
+            type=str,
+            required=False,
+            dest="output",
+            help="A file to write the report to as JSON"
+            )
+
+    def handle(self, *args, **options) -> None:
+        """
+        Handles the replay of the recorded operations
+        """
+        if options["mode"] == "execute" and not options.get("schema"):
+            raise CommandError("The execute mode requires --schema")
+        if options["concurrency"] < 1 or options["repeat"] < 1:
+            raise CommandError("--concurrency and --repeat must be positive")
+        try:
+            operations = load_operations(options["file"])
+        except (OSError, ValueError) as e:
+            raise CommandError(e)
+        if not options["include_mutations"]:
+            operations = [operation for operation in operations if not is_mutation(operation)]
+        if not operations:
+            raise CommandError(f"There are no operations to replay in '{options['file']}'")
+
+        replayer = Replayer(options.get("schema"), options["mode"], options["url"], options.get("user"))
+        report = replay_operations(replayer, operations * options["repeat"], options["concurrency"], options["workers"])
+
+        header = {"name": "operation", "count": "count", "errors": "errors", "p50": "p50 ms", "p95": "p95 ms", "p99": "p99 ms", "throughput": "ops/s", "queries": "sql"}
+        self.stdout.write(LOAD_TEST_ROW.format(**header))
+        for name, summary in [*report["operations"].items(), ("total", report["total"])]:
+            self.stdout.write(LOAD_TEST_ROW.format(name=name[:40], **summary))
+        self.stdout.write(f"Replayed {report['total']['count']} operations in {report['duration']}s")
+
+        if options.get("output"):
+            Path(options["output"]).write_text(json.dumps(report, indent=2))
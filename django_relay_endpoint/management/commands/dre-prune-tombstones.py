@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand, CommandParser, CommandError
+from django.db import DEFAULT_DB_ALIAS
+from django_relay_endpoint.configurators.sync import prune_tombstones
+
+
+class Command(BaseCommand):
+    """
+    Deletes the tombstones of the sync connections that are older than the oldest watermark still accepted,
+    i.e. the SYNC_WATERMARK_MAX_AGE setting. Intended to run periodically, e.g. from cron.
+
+    Attributes:
+        help (str): A brief description of the command's purpose.
+        requires_migrations_checks (bool): Indicates whether the command requires migration checks.
+
+    Methods:
+        add_arguments(parser: CommandParser) -> None:
+            Adds command line arguments to the command parser.
+
+        handle(*args, **options) -> None:
+            Deletes the tombstones and reports their number.
+    """
+    help = "Deletes the sync tombstones older than SYNC_WATERMARK_MAX_AGE, which the accepted watermarks do not need"
+
+    requires_migrations_checks = True
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """
+        Adds command line arguments to the command parser.
+        "--max-age": the age in seconds of the deleted tombstones, which must not be lower than SYNC_WATERMARK_MAX_AGE
+        "--database": the database alias of the tombstones
+        """
+
+        parser.add_argument("--max-age",
+            type=float,
+            required=False,
+            dest="max_age",
+            help="The age in seconds of the deleted tombstones, defaults to SYNC_WATERMARK_MAX_AGE"
+            )
+        parser.add_argument("--database",
+            type=str,
+            default=DEFAULT_DB_ALIAS,
+            dest="database",
+            help="The database alias of the tombstones"
+            )
+
+    def handle(self, *args, **options) -> None:
+        """
+        Handles the deletion of the tombstones
+        """
+        try:
+            deleted = prune_tombstones(options.get("max_age"), options["database"])
+        except ValueError as e:
+            raise CommandError(e)
+        self.stdout.write(f"Deleted {deleted} tombstones")
@@ -0,0 +1,109 @@
+import json
+from pathlib import Path
+from django.core.management.base import BaseCommand, CommandParser, CommandError
+from django.utils.module_loading import import_string
+from django_relay_endpoint.configurators.schema import SchemaConfigurator
+from django_relay_endpoint.configurators.stats import REVERSE_RELATIONS_WARNING, collect_schema_stats
+
+
+SCHEMA_STATS_ROW = "{name:<40} {build_time:>10} {memory:>10} {classes:>8} {fields:>7} {relations:>9} {input_types:>7} {input_fields:>7} {filtersets:>10}"
+
+
+class Command(BaseCommand):
+    """
+    Reports the footprint of the NodeTypes of a SchemaConfigurator: the build time, the allocated memory and the number
+    of named types, fields, input types and filtersets that every NodeType adds to the schema, and flags the NodeTypes with fields = '__all__',
+    whose reverse relations blow up the type graph.
+
+    Attributes:
+        help (str): A brief description of the command's purpose.
+        requires_migrations_checks (bool): Indicates whether the command requires migration checks.
+
+    Methods:
+        add_arguments(parser: CommandParser) -> None:
+            Adds command line arguments to the command parser.
+
+        handle(*args, **options) -> None:
+            Builds the schema under tracemalloc and timers and writes the report.
+    """
+    help = (
+        "Reports the build time, memory and generated types of every NodeType of a SchemaConfigurator. "
+        "The NodeTypes are re-built after the import of the configurator, the times and the memory are those of a warm re-build, "
+        "not of a cold start."
+    )
+
+    requires_migrations_checks = True
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """
+        Adds command line arguments to the command parser.
+        "configurator": dotted path to a SchemaConfigurator instance, e.g. 'my_app.endpoint.configurator'
+        "--sort", "-s": the column to sort the NodeTypes by
+        "--reverse-relations", "-rr": the number of reverse relations of a fields = '__all__' NodeType that is flagged
+        "--output", "-o": a file to write the report to as JSON
+        """
+
+        parser.add_argument("configurator",
+            type=str,
+            help="Dotted path to a SchemaConfigurator instance"
+            )
+        parser.add_argument("--sort", "-s",
+            choices=["build_time", "memory", "classes", "fields", "name"],
+            default="build_time",
+            dest="sort",
+            help="The column to sort the NodeTypes by"
+            )
+        parser.add_argument("--reverse-relations", "-rr",
+            type=int,
+            default=3,
+            dest="reverse_relations",
+            help="The number of reverse relations of a fields = '__all__' NodeType that is flagged"
+            )
+        parser.add_argument("--output", "-o",
+            type=str,
+            required=False,
+            dest="output",
+            help="A file to write the report to as JSON"
+            )
+
+    def handle(self, *args, **options) -> None:
+        """
+        Handles the report of the given SchemaConfigurator
+        """
+        try:
+            configurator = import_string(options["configurator"])
+        except ImportError as e:
+            raise CommandError(e)
+        if not isinstance(configurator, SchemaConfigurator):
+            raise CommandError(f"'{options['configurator']}' is not a SchemaConfigurator instance")
+
+        *node_type_stats, schema_stats = collect_schema_stats(configurator)
+        node_type_stats.sort(key=lambda stats: getattr(stats, options["sort"]), reverse=options["sort"] != "name")
+
+        header = {
+            "name": "NodeType", "build_time": "ms", "memory": "KiB", "classes": "types", "fields": "fields",
+            "relations": "relations", "input_types": "inputs", "input_fields": "input f.", "filtersets": "filtersets",
+        }
+        self.stdout.write(SCHEMA_STATS_ROW.format(**header))
+        for stats in [*node_type_stats, schema_stats]:
+            row = stats.as_dict()
+            row["memory"] = round(stats.memory / 1024, 1)
+            self.stdout.write(SCHEMA_STATS_ROW.format(**row))
+        total_time = round(sum(stats.build_time for stats in [*node_type_stats, schema_stats]), 3)
+        total_memory = round(sum(stats.memory for stats in [*node_type_stats, schema_stats]) / 1024, 1)
+        self.stdout.write(f"{len(node_type_stats)} NodeTypes built in {total_time}ms, {total_memory}KiB allocated, {schema_stats.classes} named types in the schema")
+
+        flagged = [stats for stats in node_type_stats if len(stats.reverse_relations) >= options["reverse_relations"]]
+        for stats in flagged:
+            self.stdout.write(self.style.WARNING(REVERSE_RELATIONS_WARNING.format(
+                node_type=stats.name,
+                count=len(stats.reverse_relations),
+                relations=", ".join(stats.reverse_relations),
+            )))
+
+        if options.get("output"):
+            Path(options["output"]).write_text(json.dumps({
+                "node_types": [stats.as_dict() for stats in node_type_stats],
+                "schema": schema_stats.as_dict(),
+                "flagged": [stats.name for stats in flagged],
+            }, indent=2))
@@ -0,0 +1,83 @@
+from django.core.management.base import BaseCommand, CommandParser, CommandError
+from django.utils.module_loading import import_string
+from pathlib import Path
+from django_relay_endpoint.configurators.schema import SchemaConfigurator
+from django_relay_endpoint.configurators.snapshot import render_snapshot, compute_checksum
+import importlib
+
+
+SNAPSHOT_SUCCESS_MESSAGE = "The schema snapshot has been successfully written to '{file}'"
+SNAPSHOT_UP_TO_DATE_MESSAGE = "The schema snapshot '{module}' is up to date"
+SNAPSHOT_STALE_ERROR = "The schema snapshot '{module}' is stale, regenerate it with 'dre-snapshot'"
+
+
+class Command(BaseCommand):
+    """
+    Freezes a configured SchemaConfigurator into an importable python module.
+
+    The generated module holds static InputObjectType classes, the field conversion tables, the introspection result and
+    a checksum of the NodeType definitions. Pass the module to `SchemaConfigurator(node_types, snapshot=...)` to use it.
+
+    Attributes:
+        help (str): A brief description of the command's purpose.
+        requires_migrations_checks (bool): Indicates whether the command requires migration checks.
+
+    Methods:
+        add_arguments(parser: CommandParser) -> None:
+            Adds command line arguments to the command parser.
+
+        handle(*args, **options) -> None:
+            Writes the snapshot module or checks an existing one against the NodeType definitions.
+    """
+    help = "Freezes a SchemaConfigurator into an importable snapshot module"
+
+    requires_migrations_checks = True
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """
+        Adds command line arguments to the command parser.
+        "configurator": dotted path to a SchemaConfigurator instance, e.g. 'my_app.endpoint.configurator'
+        "--out", "-o": the python file to write the snapshot to
+        "--check", "-c": dotted path of an existing snapshot module to verify instead of writing one
+        """
+
+        parser.add_argument("configurator",
+            type=str,
+            help="Dotted path to a SchemaConfigurator instance"
+            )
+        parser.add_argument("--out", "-o",
+            type=str,
+            required=False,
+            dest="out",
+            help="The python file to write the snapshot to"
+            )
+        parser.add_argument("--check", "-c",
+            type=str,
+            required=False,
+            dest="check",
+            help="Dotted path of a snapshot module to verify"
+            )
+
+    def handle(self, *args, **options) -> None:
+        """
+        Handles the creation or verification of the snapshot for the given SchemaConfigurator
+        """
+        try:
+            configurator = import_string(options["configurator"])
+        except ImportError as e:
+            raise CommandError(e)
+        if not isinstance(configurator, SchemaConfigurator):
+            raise CommandError(f"'{options['configurator']}' is not a SchemaConfigurator instance")
+
+        if options.get("check"):
+            module = importlib.import_module(options["check"])
+            if module.CHECKSUM != compute_checksum(configurator.node_types):
+                raise CommandError(SNAPSHOT_STALE_ERROR.format(module=options["check"]))
+            self.stdout.write(SNAPSHOT_UP_TO_DATE_MESSAGE.format(module=options["check"]))
+            return
+
+        if not options.get("out"):
+            raise CommandError("You must provide either --out or --check")
+        file = Path(options["out"])
+        file.write_text(render_snapshot(configurator))
+        self.stdout.write(SNAPSHOT_SUCCESS_MESSAGE.format(file=file))
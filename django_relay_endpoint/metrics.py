@@ -0,0 +1,411 @@
+import json
+import os
+from bisect import bisect_left
+from contextvars import ContextVar
+from glob import glob
+from inspect import isawaitable
+from threading import Lock
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+from uuid import uuid4
+import graphene
+from asgiref.sync import sync_to_async
+from django.core.exceptions import PermissionDenied
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.models.query import QuerySet
+from graphql import get_named_type
+from django_relay_endpoint.cost import get_connection_node_type
+from django_relay_endpoint.settings import dre_settings
+
+
+# the file of the values of the processes marked dead, see `mark_process_dead`
+ARCHIVE_FILE = "metrics-archive.json"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+current_node_type: ContextVar[str] = ContextVar("django_relay_endpoint_metrics_node_type", default="")
+
+
+def metrics_enabled() -> bool:
+    return bool(dre_settings.METRICS)
+
+
+class Metric:
+    """
+    A metric with a value per combination of label values.
+    """
+
+    type: str = None
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values: Dict[Tuple[str, ...], Any] = {}
+        self.lock = Lock()
+
+    def dump(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "type": self.type,
+                "help": self.documentation,
+                "labelnames": self.labelnames,
+                "samples": [[list(labels), value] for labels, value in self.values.items()],
+            }
+
+
+class CounterMetric(Metric):
+    type = "counter"
+
+    def inc(self, labels: Tuple[str, ...] = (), amount: float = 1) -> None:
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def set(self, labels: Tuple[str, ...], value: float) -> None:
+        """
+        Sets the value of a counter maintained elsewhere, e.g. the statistics of a cache, used by collectors.
+        """
+        with self.lock:
+            self.values[labels] = value
+
+
+class HistogramMetric(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        with self.lock:
+            # the counts of the buckets (not cumulative) followed by the count of +Inf, the sum and the count
+            sample = self.values.get(labels)
+            if sample is None:
+                sample = self.values[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            sample[bisect_left(self.buckets, value)] += 1
+            sample[-2] += value
+            sample[-1] += 1
+
+    def dump(self) -> Dict[str, Any]:
+        dump = super().dump()
+        dump["buckets"] = self.buckets
+        return dump
+
+
+class MetricsRegistry:
+    """
+    An in-process registry of counters and histograms rendered in the Prometheus text exposition format.
+
+    With prefork servers every process has its own registry. If the METRICS_DIRECTORY setting is set, each process
+    flushes its values to `<METRICS_DIRECTORY>/metrics-<pid>-<uuid>.json` after every operation and the metrics view
+    merges the files of all processes, so that any process serves the metrics of all of them. The uuid identifies the process,
+    so that a process reusing the pid of a dead one does not overwrite its values, and a forked process starts from zero.
+    """
+
+    def __init__(self) -> None:
+        self.metrics: Dict[str, Metric] = {}
+        self.collectors: List[Callable[[], None]] = []
+        self.lock = Lock()
+        self.process_id = uuid4().hex
+
+    def reset(self) -> None:
+        """
+        Zeroes the values and identifies the registry as a new process, in the children of forks,
+        whose parent flushes the values it recorded before the fork.
+        """
+        for metric in self.metrics.values():
+            with metric.lock:
+                metric.values.clear()
+        self.process_id = uuid4().hex
+
+    def register(self, metric: Metric) -> Metric:
+        with self.lock:
+            return self.metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> CounterMetric:
+        return self.register(CounterMetric(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> HistogramMetric:
+        return self.register(HistogramMetric(name, documentation, labelnames, buckets))
+
+    def register_collector(self, collector: Callable[[], None]) -> Callable[[], None]:
+        """
+        Registers a callable that updates metrics maintained elsewhere before they are dumped. Can be used as a decorator.
+        """
+        self.collectors.append(collector)
+        return collector
+
+    def dump(self) -> Dict[str, Dict[str, Any]]:
+        for collector in self.collectors:
+            collector()
+        return {name: metric.dump() for name, metric in self.metrics.items()}
+
+    def flush(self, directory: str) -> None:
+        """
+        Writes the values of the process to the directory, atomically.
+        """
+        write_atomically(os.path.join(directory, f"metrics-{os.getpid()}-{self.process_id}.json"), self.dump())
+
+    @staticmethod
+    def load(directory: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Merges the values flushed by all processes to the directory.
+        """
+        return MetricsRegistry.merge(sorted(glob(os.path.join(directory, "metrics-*.json"))))
+
+    @staticmethod
+    def merge(paths: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Merges the values of the files, summing the samples with the same labels.
+        """
+        merged: Dict[str, Dict[str, Any]] = {}
+        for path in paths:
+            try:
+                with open(path) as f:
+                    dumps = json.load(f)
+            except (OSError, ValueError):
+                continue
+            for name, dump in dumps.items():
+                target = merged.setdefault(name, {**dump, "samples": {}})
+                for labels, value in dump["samples"]:
+                    key = tuple(labels)
+                    if key not in target["samples"]:
+                        target["samples"][key] = value
+                    elif isinstance(value, list):
+                        target["samples"][key] = [a + b for a, b in zip(target["samples"][key], value)]
+                    else:
+                        target["samples"][key] += value
+        for dump in merged.values():
+            dump["samples"] = [[list(labels), value] for labels, value in dump["samples"].items()]
+        return merged
+
+    @staticmethod
+    def render(dumps: Dict[str, Dict[str, Any]]) -> str:
+        """
+        Renders dumped metrics in the Prometheus text exposition format.
+        """
+        lines = []
+        for name, dump in sorted(dumps.items()):
+            lines.append(f"# HELP {name} {dump['help']}")
+            lines.append(f"# TYPE {name} {dump['type']}")
+            for labels, value in dump["samples"]:
+                pairs = list(zip(dump["labelnames"], labels))
+                if dump["type"] == "histogram":
+                    cumulative = 0
+                    for bound, count in zip([*dump["buckets"], "+Inf"], value[:-2]):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{format_labels([*pairs, ('le', str(bound))])} {cumulative}")
+                    lines.append(f"{name}_sum{format_labels(pairs)} {value[-2]}")
+                    lines.append(f"{name}_count{format_labels(pairs)} {value[-1]}")
+                else:
+                    lines.append(f"{name}{format_labels(pairs)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def exposition(self) -> str:
+        """
+        Returns the metrics of the process, or of all processes if METRICS_DIRECTORY is set, in the text exposition format.
+        """
+        directory = dre_settings.METRICS_DIRECTORY
+        if directory:
+            self.flush(directory)
+            return self.render(self.load(directory))
+        return self.render(self.dump())
+
+
+def write_atomically(path: str, dumps: Dict[str, Dict[str, Any]]) -> None:
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(dumps, f)
+    os.replace(f"{path}.tmp", path)
+
+
+def mark_process_dead(pid: int, directory: str = None) -> None:
+    """
+    Merges the files of a dead process into the archive file of the directory and removes them, so that the number of files
+    stays bounded while the counts of the process are kept. Call it from the master process when a worker exits, e.g. in the
+    `child_exit` hook of gunicorn, since the archive is not locked:
+
+        def child_exit(server, worker):
+            from django_relay_endpoint.metrics import mark_process_dead
+            mark_process_dead(worker.pid)
+
+    Args:
+        pid (int): the pid of the dead process
+        directory (str, optional): the directory of the files. Defaults to the METRICS_DIRECTORY setting.
+    """
+    directory = directory or dre_settings.METRICS_DIRECTORY
+    if not directory:
+        return
+    paths = glob(os.path.join(directory, f"metrics-{pid}-*.json"))
+    if not paths:
+        return
+    archive = os.path.join(directory, ARCHIVE_FILE)
+    write_atomically(archive, MetricsRegistry.merge([archive, *paths]))
+    for path in paths:
+        os.remove(path)
+
+
+def format_labels(pairs: List[Tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    escaped = (
+        (name, str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'))
+        for name, value in pairs
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+registry = MetricsRegistry()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=registry.reset)
+
+OPERATION_DURATION = registry.histogram(
+    "django_relay_endpoint_operation_duration_seconds",
+    "The latency of executed operations by operation name and type.",
+    ("operation_name", "operation_type"),
+)
+SQL_QUERIES = registry.counter(
+    "django_relay_endpoint_sql_queries_total",
+    "The number of SQL queries by the django object type being resolved.",
+    ("node_type",),
+)
+MUTATIONS = registry.counter(
+    "django_relay_endpoint_mutations_total",
+    "The number of mutations by generated mutation class and outcome.",
+    ("mutation", "outcome"),
+)
+PERMISSION_DENIALS = registry.counter(
+    "django_relay_endpoint_permission_denials_total",
+    "The number of denied permission checks by type and checker.",
+    ("node_type", "check"),
+)
+CACHE_HITS = registry.counter(
+    "django_relay_endpoint_cache_hits_total",
+    "The number of hits of the caches of the package.",
+    ("cache",),
+)
+CACHE_MISSES = registry.counter(
+    "django_relay_endpoint_cache_misses_total",
+    "The number of misses of the caches of the package.",
+    ("cache",),
+)
+
+
+@registry.register_collector
+def collect_cache_statistics() -> None:
+    from django_relay_endpoint.configurators.fields import accepted_form_field_kwargs
+    from django_relay_endpoint.configurators.field_conversions import conversions
+
+    info = accepted_form_field_kwargs.cache_info()
+    statistics = {
+        "accepted_form_field_kwargs": (info.hits, info.misses),
+        "field_conversions": (conversions.cache_hits, conversions.cache_misses),
+    }
+    for cache, (hits, misses) in statistics.items():
+        CACHE_HITS.set((cache,), hits)
+        CACHE_MISSES.set((cache,), misses)
+
+
+def observe_operation(operation_name: str, operation_type: str, duration: float) -> None:
+    """
+    Records the latency of an executed operation and flushes the metrics in multiprocess mode.
+    """
+    if not metrics_enabled():
+        return
+    OPERATION_DURATION.observe((operation_name or "anonymous", operation_type), duration)
+    directory = dre_settings.METRICS_DIRECTORY
+    if directory:
+        registry.flush(directory)
+
+
+def observe_mutation(cls: type, result: Any) -> Any:
+    """
+    Records the outcome of a mutation with the result of `mutate`, which may be awaitable.
+    Failed mutations are recorded by `observe_mutation_failure`.
+    """
+    if not metrics_enabled():
+        return result
+    if isawaitable(result):
+        return observe_awaitable_mutation(cls, result)
+    MUTATIONS.inc((cls.__name__, "success"))
+    return result
+
+
+async def observe_awaitable_mutation(cls: type, result: Any) -> Any:
+    try:
+        result = await result
+    except Exception:
+        MUTATIONS.inc((cls.__name__, "failure"))
+        raise
+    MUTATIONS.inc((cls.__name__, "success"))
+    return result
+
+
+def observe_mutation_failure(cls: type) -> None:
+    if metrics_enabled():
+        MUTATIONS.inc((cls.__name__, "failure"))
+
+
+class PermissionDenialCounter:
+    """
+    A context manager that counts the PermissionDenied errors raised within the context.
+    """
+
+    def __init__(self, cls: type, check: str) -> None:
+        self.cls = cls
+        self.check = check
+
+    def __enter__(self) -> None:
+        pass
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is not None and issubclass(exc_type, PermissionDenied) and metrics_enabled():
+            PERMISSION_DENIALS.inc((self.cls.__name__, self.check))
+
+
+def metered_execute(execute, sql, params, many, context):
+    """
+    A database execute wrapper that counts the queries by the django object type being resolved.
+    """
+    SQL_QUERIES.inc((current_node_type.get() or "none",))
+    return execute(sql, params, many, context)
+
+
+def meter_connection(connection: BaseDatabaseWrapper, **kwargs) -> None:
+    """
+    Installs `metered_execute` on the connection, once. Serves as a `connection_created` receiver as well.
+    """
+    if metered_execute not in connection.execute_wrappers:
+        connection.execute_wrappers.append(metered_execute)
+
+
+class MetricsMiddleware:
+    """
+    A graphene middleware that exposes the django object type resolved by a field in `current_node_type`,
+    so that `metered_execute` counts the SQL by NodeType. Querysets returned by resolvers are evaluated within the resolver.
+    """
+
+    def resolve(self, next, root, info: graphene.ResolveInfo, **args):
+        node_type = get_connection_node_type(info.return_type) or getattr(get_named_type(info.return_type), "graphene_type", None)
+        if not hasattr(getattr(node_type, "_meta", None), "model"):
+            return next(root, info, **args)
+        token = current_node_type.set(node_type._meta.name)
+        try:
+            result = next(root, info, **args)
+            if isawaitable(result):
+                return self.resolve_awaitable(result, node_type._meta.name)
+            if isinstance(result, QuerySet):
+                result = list(result)
+            return result
+        finally:
+            current_node_type.reset(token)
+
+    @staticmethod
+    async def resolve_awaitable(result, node_type_name: str):
+        token = current_node_type.set(node_type_name)
+        try:
+            result = await result
+            if isinstance(result, QuerySet):
+                result = await sync_to_async(list)(result)
+            return result
+        finally:
+            current_node_type.reset(token)
@@ -0,0 +1,50 @@
+import graphene
+from inspect import isawaitable, iscoroutinefunction
+from asgiref.sync import sync_to_async
+from graphql import GraphQLError, GraphQLList, GraphQLObjectType, get_named_type, get_nullable_type
+from django_relay_endpoint.cost import PAGE_SIZE_ERROR, get_connection_node_type, get_default_page_size
+
+
+class AsyncORMMiddleware:
+    """
+    A graphene middleware for the async execution path.
+    Async resolvers, e.g. the connections configured with `asynchronous=True`, are awaited on the event loop.
+    Sync resolvers of object and list fields, e.g. the related managers of DjangoObjectType, may hit the database,
+    so they are called in a thread. Sync resolvers of scalar fields are called directly.
+    """
+
+    def resolve(self, next, root, info: graphene.ResolveInfo, **args):
+        if iscoroutinefunction(next):
+            return next(root, info, **args)
+        return_type = get_nullable_type(info.return_type)
+        if isinstance(return_type, GraphQLList) or isinstance(get_named_type(return_type), GraphQLObjectType):
+            return self.resolve_in_thread(next, root, info, **args)
+        return next(root, info, **args)
+
+    @staticmethod
+    async def resolve_in_thread(next, root, info: graphene.ResolveInfo, **args):
+        result = await sync_to_async(next)(root, info, **args)
+        if isawaitable(result):
+            result = await result
+        return result
+
+
+class PageSizeMiddleware:
+    """
+    A graphene middleware that applies the page sizes of NodeTypes to every connection, including the nested ones:
+    connections without `first` or `last` fetch `Meta.default_page_size` records (or the DEFAULT_PAGE_SIZE setting),
+    connections requesting more than `Meta.max_page_size` records are rejected.
+    """
+
+    def resolve(self, next, root, info: graphene.ResolveInfo, **args):
+        node_type = get_connection_node_type(info.return_type)
+        if node_type is not None:
+            max_page_size = getattr(node_type, "max_page_size", None)
+            size = args.get("first") or args.get("last")
+            if size is None:
+                default_page_size = get_default_page_size(node_type)
+                if default_page_size:
+                    args["first"] = default_page_size
+            elif max_page_size and size > max_page_size:
+                raise GraphQLError(str(PAGE_SIZE_ERROR.format(size=size, field=info.field_name, max_size=max_page_size)))
+        return next(root, info, **args)
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:50
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('model_label', models.CharField(max_length=100)),
+                ('object_id', models.CharField(max_length=255)),
+                ('deleted_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['model_label', 'id'], name='dre_tombstone_model_id_idx')],
+            },
+        ),
+    ]
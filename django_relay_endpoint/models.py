@@ -0,0 +1,19 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Tombstone(models.Model):
+    """
+    The record of a deleted object of a model whose NodeType declares `Meta.sync`, which the sync connections of the type return
+    as `deletedIds` to the clients whose watermark precedes it. The ids are increasing, so a watermark remembers the last one it saw.
+    """
+    id = models.BigAutoField(primary_key=True)
+    model_label = models.CharField(max_length=100)
+    object_id = models.CharField(max_length=255)
+    deleted_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["model_label", "id"], name="dre_tombstone_model_id_idx")]
+
+    def __str__(self) -> str:
+        return f"{self.model_label} {self.object_id}"
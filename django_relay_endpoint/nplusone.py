@@ -0,0 +1,143 @@
+import warnings
+from collections import Counter
+from contextlib import ExitStack
+from contextvars import ContextVar
+from inspect import isawaitable
+from typing import List, Literal, Optional, Tuple
+import graphene
+from asgiref.sync import sync_to_async
+from django.db import connections
+from django.db.models.query import QuerySet
+from django_relay_endpoint.instrumentation import fingerprint
+from django_relay_endpoint.settings import dre_settings
+
+
+current_resolver_path: ContextVar[str] = ContextVar("django_relay_endpoint_resolver_path", default="")
+current_detector: ContextVar[Optional["NPlusOneDetector"]] = ContextVar("django_relay_endpoint_nplusone_detector", default=None)
+
+NPLUSONE_MESSAGE = "The query `{sql}` ran {count} times at `{path}`, i.e. once per item of a list. Consider prefetching the relation in get_queryset."
+
+
+class NPlusOneWarning(UserWarning):
+    pass
+
+
+class NPlusOneError(Exception):
+    pass
+
+
+def get_resolver_path(info: graphene.ResolveInfo) -> str:
+    """
+    Returns the path of the resolved field without list indexes, e.g. `author.edges.node.books`.
+    """
+    return ".".join(str(key) for key in info.path.as_list() if not isinstance(key, int))
+
+
+class ResolverPathMiddleware:
+    """
+    A graphene middleware that exposes the path of the field being resolved in `current_resolver_path`,
+    so that NPlusOneDetector groups the queries by resolver path.
+    Querysets returned by resolvers are evaluated within the resolver, so that their queries are attributed to its path.
+    """
+
+    def resolve(self, next, root, info: graphene.ResolveInfo, **args):
+        token = current_resolver_path.set(get_resolver_path(info))
+        try:
+            result = next(root, info, **args)
+            if isawaitable(result):
+                return self.resolve_awaitable(result, info)
+            if isinstance(result, QuerySet):
+                result = list(result)
+            return result
+        finally:
+            current_resolver_path.reset(token)
+
+    @staticmethod
+    async def resolve_awaitable(result, info: graphene.ResolveInfo):
+        token = current_resolver_path.set(get_resolver_path(info))
+        try:
+            result = await result
+            if isinstance(result, QuerySet):
+                result = await sync_to_async(list)(result)
+            return result
+        finally:
+            current_resolver_path.reset(token)
+
+
+class NPlusOneDetector:
+    """
+    A context manager that records the SQL run on the database connections of the current thread with
+    `connection.execute_wrapper` and groups it by fingerprint and resolver path. A query that repeats more than
+    `threshold` times at one resolver path, i.e. once per item of a list, is an N+1 violation.
+
+    Args:
+        threshold (int, optional): the number of repetitions allowed per path. Defaults to the NPLUSONE_THRESHOLD setting.
+        mode (Literal["warn", "raise"], optional): whether violations are reported with NPlusOneWarning or raise NPlusOneError
+            when the context exits. Defaults to None, i.e. violations are only collected, see `violations`.
+
+    Usage:
+        with NPlusOneDetector(mode="raise") as detector:
+            schema.execute(document, context_value=request, middleware=[ResolverPathMiddleware()])
+        detector.query_count
+    """
+
+    def __init__(self, threshold: int = None, mode: Optional[Literal["warn", "raise"]] = None) -> None:
+        self.threshold = dre_settings.NPLUSONE_THRESHOLD if threshold is None else threshold
+        self.mode = mode
+        self.queries: List[Tuple[str, str]] = []
+        self.stack = None
+        self.token = None
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries.append((current_resolver_path.get(), sql))
+        return execute(sql, params, many, context)
+
+    def __enter__(self) -> "NPlusOneDetector":
+        self.stack = ExitStack()
+        for alias in connections:
+            self.stack.enter_context(connections[alias].execute_wrapper(self))
+        self.token = current_detector.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        current_detector.reset(self.token)
+        self.stack.close()
+        if exc_type is None:
+            self.check()
+
+    @property
+    def query_count(self) -> int:
+        return len(self.queries)
+
+    def violations(self) -> List[Tuple[str, str, int]]:
+        """
+        Returns the (path, fingerprint, count) of the queries that repeat more than `threshold` times at a resolver path.
+        """
+        counter = Counter((path, fingerprint(sql)) for path, sql in self.queries)
+        return [
+            (path, sql, count)
+            for (path, sql), count in counter.most_common()
+            if count > self.threshold
+        ]
+
+    def format_violations(self) -> str:
+        return "\n".join(
+            NPLUSONE_MESSAGE.format(sql=sql, count=count, path=path or "<root>")
+            for path, sql, count in self.violations()
+        )
+
+    def format_queries(self) -> str:
+        return "\n".join(
+            f"{index}. {path or '<root>'}: {sql}"
+            for index, (path, sql) in enumerate(self.queries, start=1)
+        )
+
+    def check(self) -> None:
+        """
+        Warns or raises per `mode` if there are violations.
+        """
+        if self.mode is None or not self.violations():
+            return
+        if self.mode == "raise":
+            raise NPlusOneError(self.format_violations())
+        warnings.warn(self.format_violations(), NPlusOneWarning, stacklevel=3)
@@ -0,0 +1,207 @@
+import marshal
+import os
+import re
+import sys
+from collections import Counter
+from threading import Event, Thread, get_ident
+from time import perf_counter, strftime
+from types import FrameType
+from typing import Any, Dict, Literal, Optional
+from weakref import WeakKeyDictionary
+from django_relay_endpoint.settings import dre_settings
+
+
+# maps the classes generated by NodeType, e.g. ShopAuthor, ShopAuthorInput, ShopAuthorCreateMutation, to their NodeType
+generated_node_types: "WeakKeyDictionary[type, type]" = WeakKeyDictionary()
+
+
+def register_generated_class(generated_class: type, node_type: type) -> None:
+    """
+    Registers a class generated by node_type, so that the profiles label its frames with the NodeType.
+    """
+    generated_node_types[generated_class] = node_type
+
+
+def frame_label(frame: FrameType) -> str:
+    """
+    Returns a readable label of the frame. The methods of generated classes, whose code is shared by all NodeTypes,
+    are labelled with their class and NodeType, e.g. `AuthorType:ShopAuthor.get_queryset`.
+    """
+    code = frame.f_code
+    if code.co_argcount and code.co_varnames[0] in ("cls", "self"):
+        owner = frame.f_locals.get(code.co_varnames[0])
+        owner_class = owner if isinstance(owner, type) else type(owner)
+        node_type = generated_node_types.get(owner_class)
+        if node_type is not None:
+            return f"{node_type.__name__}:{owner_class.__name__}.{code.co_name}"
+    module = frame.f_globals.get("__name__", "")
+    return f"{module}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+class SamplingProfiler:
+    """
+    A statistical profiler that samples the stack of the profiled thread every `interval` seconds from a background thread
+    and counts the collapsed stacks, i.e. `frame;frame;frame`, the input format of flame graph tools.
+    The frames enclosing the start of the profiler are omitted.
+    """
+
+    def __init__(self, interval: float = 0.001) -> None:
+        self.interval = interval
+        self.stacks = Counter()
+        self.thread_id = None
+        self.base_frames = set()
+        self.stopped = Event()
+        self.sampler = None
+
+    def start(self) -> None:
+        self.thread_id = get_ident()
+        frame = sys._getframe(1)
+        while frame is not None:
+            self.base_frames.add(id(frame))
+            frame = frame.f_back
+        self.sampler = Thread(target=self.sample, name="django_relay_endpoint_profiler", daemon=True)
+        self.sampler.start()
+
+    def stop(self) -> None:
+        self.stopped.set()
+        self.sampler.join()
+
+    def sample(self) -> None:
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            labels = []
+            while frame is not None:
+                if id(frame) not in self.base_frames:
+                    labels.append(frame_label(frame))
+                frame = frame.f_back
+            if labels:
+                self.stacks[";".join(reversed(labels))] += 1
+
+    def collapsed(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+    def summary(self, limit: int) -> Dict[str, Any]:
+        return {
+            "samples": sum(self.stacks.values()),
+            "interval": self.interval,
+            "stacks": [{"stack": stack, "count": count} for stack, count in self.stacks.most_common(limit)],
+        }
+
+
+class DeterministicProfiler:
+    """
+    A deterministic profiler that times every Python call of the profiled thread with `sys.setprofile`,
+    and summarizes the functions with the highest cumulative time. Unlike cProfile, which keys the functions by their code,
+    the functions are keyed by `frame_label`, so that the methods shared by the generated classes are timed per NodeType,
+    e.g. `AuthorType:ShopAuthorCreateMutation.mutate_and_get_payload`. The time of C functions is counted in their callers.
+    """
+
+    def __init__(self) -> None:
+        # the calls, the total time, the cumulative time, the file and the line by label
+        self.functions: Dict[str, list] = {}
+        # the label, the start and the time of the callees of the running calls
+        self.stack = []
+        self.running = Counter()
+        self.previous_profile = None
+
+    def start(self) -> None:
+        self.previous_profile = sys.getprofile()
+        sys.setprofile(self.trace)
+
+    def stop(self) -> None:
+        sys.setprofile(self.previous_profile)
+
+    def trace(self, frame: FrameType, event: str, arg: Any) -> None:
+        if event == "call":
+            label = frame_label(frame)
+            self.stack.append((label, frame.f_code, perf_counter(), [0.0]))
+            self.running[label] += 1
+        elif event == "return" and self.stack:
+            label, code, started, callees = self.stack.pop()
+            elapsed = perf_counter() - started
+            self.running[label] -= 1
+            function = self.functions.get(label)
+            if function is None:
+                function = self.functions[label] = [0, 0.0, 0.0, code.co_filename, code.co_firstlineno]
+            function[0] += 1
+            function[1] += elapsed - callees[0]
+            # the cumulative time of a recursive function is counted by its outermost call
+            if not self.running[label]:
+                function[2] += elapsed
+            if self.stack:
+                self.stack[-1][3][0] += elapsed
+
+    def summary(self, limit: int) -> Dict[str, Any]:
+        functions = sorted(self.functions.items(), key=lambda item: item[1][2], reverse=True)[:limit]
+        return {"functions": [
+            {
+                "function": f"{label} ({os.sep.join(filename.split(os.sep)[-2:])}:{line})",
+                "calls": calls,
+                "total": round(total_time * 1000, 3),
+                "cumulative": round(cumulative_time * 1000, 3),
+            }
+            for label, (calls, total_time, cumulative_time, filename, line) in functions
+        ]}
+
+    def dump_stats(self, path: str) -> None:
+        """
+        Writes the stats in the format of `cProfile.Profile.dump_stats`, named by label, which `pstats` and snakeviz read.
+        """
+        stats = {
+            (filename, line, label): (calls, calls, total_time, cumulative_time, {})
+            for label, (calls, total_time, cumulative_time, filename, line) in self.functions.items()
+        }
+        with open(path, "wb") as f:
+            marshal.dump(stats, f)
+
+
+class OperationProfile:
+    """
+    Profiles one operation with the sampling or the deterministic profiler and summarizes it for the response extensions.
+    If the PROFILING_DIRECTORY setting is set, the profile is written to the directory as well:
+    the collapsed stacks of the sampling profiler to `<name>.collapsed`, the stats of the deterministic profiler to `<name>.prof`.
+
+    Args:
+        mode (Literal["sampling", "deterministic"]): the profiler
+        operation_name (str, optional): the name of the operation, used for the file name. Defaults to None.
+    """
+
+    def __init__(self, mode: Literal["sampling", "deterministic"], operation_name: Optional[str] = None) -> None:
+        self.mode = mode
+        # the operation name is chosen by the client, it must not escape the directory
+        self.operation_name = re.sub(r"[^\w-]", "_", operation_name or "anonymous")[:64]
+        if mode == "sampling":
+            self.profiler = SamplingProfiler(dre_settings.PROFILING_SAMPLE_INTERVAL)
+        else:
+            self.profiler = DeterministicProfiler()
+
+    def __enter__(self) -> "OperationProfile":
+        self.started = perf_counter()
+        self.profiler.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.profiler.stop()
+        self.duration = perf_counter() - self.started
+
+    def write(self, directory: str) -> str:
+        name = f"{strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{self.operation_name}"
+        if self.mode == "sampling":
+            path = os.path.join(directory, f"{name}.collapsed")
+            with open(path, "w") as f:
+                f.write(self.profiler.collapsed())
+        else:
+            path = os.path.join(directory, f"{name}.prof")
+            self.profiler.dump_stats(path)
+        return path
+
+    def as_extension(self) -> Dict[str, Any]:
+        extension = {
+            "mode": self.mode,
+            "duration": round(self.duration * 1000, 3),
+            **self.profiler.summary(dre_settings.PROFILING_LIMIT),
+        }
+        directory = dre_settings.PROFILING_DIRECTORY
+        if directory:
+            extension["file"] = self.write(directory)
+        return extension
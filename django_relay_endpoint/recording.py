@@ -0,0 +1,63 @@
+import json
+import os
+import random
+from threading import Lock
+from typing import Any, Dict, Optional
+from django_relay_endpoint.settings import dre_settings
+
+
+# the header of the requests of 'dre-load-test', which are not recorded again
+REPLAY_HEADER = "X-Relay-Endpoint-Replay"
+
+
+class OperationRecorder:
+    """
+    Appends a sample of the operations to a file of JSON lines, i.e. `{"query": ..., "variables": ..., "operationName": ...}`,
+    which `dre-load-test` replays. Each line is written with a single append, so that several processes can share the file.
+
+    Args:
+        path (str): the file
+        sample_rate (float, optional): the fraction of the operations to record. Defaults to 1.
+    """
+
+    def __init__(self, path: str, sample_rate: float = 1) -> None:
+        self.path = path
+        self.sample_rate = sample_rate
+        self.lock = Lock()
+
+    def record(self, query: str, variables: Optional[Dict[str, Any]], operation_name: Optional[str]) -> bool:
+        """
+        Records the operation if it is sampled and its variables are JSON serializable, e.g. not uploaded files.
+
+        Returns:
+            bool: whether the operation was recorded
+        """
+        if not query or random.random() >= self.sample_rate:
+            return False
+        try:
+            line = json.dumps({"query": query, "variables": variables, "operationName": operation_name}) + "\n"
+        except (TypeError, ValueError):
+            return False
+        with self.lock:
+            descriptor = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(descriptor, line.encode())
+            finally:
+                os.close(descriptor)
+        return True
+
+
+recorders: Dict[str, OperationRecorder] = {}
+
+
+def get_recorder() -> Optional[OperationRecorder]:
+    """
+    Returns the recorder of the RECORDING_FILE setting, None if the setting is not set.
+    """
+    path = dre_settings.RECORDING_FILE
+    if not path:
+        return None
+    recorder = recorders.get(str(path))
+    if recorder is None:
+        recorder = recorders.setdefault(str(path), OperationRecorder(str(path), dre_settings.RECORDING_SAMPLE_RATE))
+    return recorder
@@ -0,0 +1,210 @@
+import json
+import math
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import ExitStack
+from threading import Lock
+from time import perf_counter
+from typing import Any, Dict, List, Literal, NamedTuple, Optional
+import django
+import graphene
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.db import connections
+from django.test import Client, RequestFactory
+from django.utils.module_loading import import_string
+from graphql import GraphQLError, OperationType, get_operation_ast, parse
+from django_relay_endpoint.recording import REPLAY_HEADER
+
+
+def load_operations(path: str) -> List[Dict[str, Any]]:
+    """
+    Reads the operations recorded by `django_relay_endpoint.recording.OperationRecorder`, or written by hand in the same format.
+    """
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def is_mutation(operation: Dict[str, Any]) -> bool:
+    try:
+        operation_ast = get_operation_ast(parse(operation["query"]), operation.get("operationName"))
+    except GraphQLError:
+        return False
+    return operation_ast is not None and operation_ast.operation == OperationType.MUTATION
+
+
+class QueryCounter:
+    """
+    A context manager that counts the SQL run on the database connections of the current thread.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.stack = None
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+    def __enter__(self) -> "QueryCounter":
+        self.stack = ExitStack()
+        for alias in connections:
+            self.stack.enter_context(connections[alias].execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stack.close()
+
+
+class ReplaySample(NamedTuple):
+    operation_name: str
+    duration: float
+    queries: int
+    failed: bool
+
+
+class Replayer:
+    """
+    Replays operations through the django test client or by executing them in-process against the schema.
+    It is sent to worker processes by its dotted paths, every process configures the schema once.
+
+    Args:
+        schema (str, optional): dotted path to a SchemaConfigurator instance or a graphene.Schema, required by the "execute" mode. Defaults to None.
+        mode (Literal["execute", "client"], optional): whether the operations are executed in-process or posted to `url`. Defaults to "execute".
+        url (str, optional): the endpoint url. Defaults to "/graphql".
+        username (str, optional): the username of the user executing the operations. Defaults to None, i.e. an anonymous user.
+    """
+
+    def __init__(self, schema: str = None, mode: Literal["execute", "client"] = "execute", url: str = "/graphql", username: str = None) -> None:
+        self.schema_path = schema
+        self.mode = mode
+        self.url = url
+        self.username = username
+        self.schema = None
+        self.lock = Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"schema_path": self.schema_path, "mode": self.mode, "url": self.url, "username": self.username}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(state["schema_path"], state["mode"], state["url"], state["username"])
+
+    def get_schema(self) -> graphene.Schema:
+        """
+        Returns the schema, configured once per process if the path points to a SchemaConfigurator.
+        """
+        with self.lock:
+            if self.schema is None:
+                schema = import_string(self.schema_path)
+                self.schema = schema if isinstance(schema, graphene.Schema) else schema.schema()
+        return self.schema
+
+    def get_user(self):
+        if self.username is None:
+            return AnonymousUser()
+        return get_user_model()._default_manager.get_by_natural_key(self.username)
+
+    def replay_chunk(self, operations: List[Dict[str, Any]]) -> List[ReplaySample]:
+        """
+        Replays the operations one after another in the current thread and closes its database connections.
+        """
+        user = self.get_user()
+        if self.mode == "client":
+            client = Client()
+            if self.username is not None:
+                client.force_login(user)
+            replay = lambda operation: self.post(client, operation)
+        else:
+            schema = self.get_schema()
+            replay = lambda operation: self.execute(schema, user, operation)
+        samples = []
+        try:
+            for operation in operations:
+                with QueryCounter() as counter:
+                    started = perf_counter()
+                    failed = replay(operation)
+                    duration = perf_counter() - started
+                samples.append(ReplaySample(operation.get("operationName") or "anonymous", duration, counter.count, failed))
+        finally:
+            connections.close_all()
+        return samples
+
+    def post(self, client: Client, operation: Dict[str, Any]) -> bool:
+        response = client.post(self.url, json.dumps(operation), content_type="application/json", headers={REPLAY_HEADER: "1"})
+        try:
+            return response.status_code != 200 or bool(json.loads(response.content).get("errors"))
+        except ValueError:
+            return True
+
+    def execute(self, schema: graphene.Schema, user, operation: Dict[str, Any]) -> bool:
+        request = RequestFactory().post(self.url)
+        request.user = user
+        result = schema.execute(
+            operation["query"],
+            variable_values=operation.get("variables"),
+            operation_name=operation.get("operationName"),
+            context_value=request,
+        )
+        return bool(result.errors)
+
+
+def replay_operations(
+        replayer: Replayer,
+        operations: List[Dict[str, Any]],
+        concurrency: int = 1,
+        workers: Literal["thread", "process"] = "thread",
+) -> Dict[str, Any]:
+    """
+    Replays the operations split across `concurrency` threads or processes and summarizes the samples.
+
+    Returns:
+        Dict[str, Any]: the summary, see `summarize`
+    """
+    chunks = [operations[index::concurrency] for index in range(concurrency)]
+    if workers == "process":
+        # the forked processes must not share the connections of the parent
+        connections.close_all()
+        executor = ProcessPoolExecutor(max_workers=concurrency, initializer=django.setup)
+    else:
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+    started = perf_counter()
+    with executor:
+        samples = [sample for chunk in executor.map(replayer.replay_chunk, chunks) for sample in chunk]
+    return summarize(samples, perf_counter() - started)
+
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    """
+    Returns the nearest-rank percentile of the sorted values.
+    """
+    return ordered[max(math.ceil(fraction * len(ordered)) - 1, 0)]
+
+
+def summarize_samples(samples: List[ReplaySample], duration: float) -> Dict[str, Any]:
+    durations = sorted(sample.duration for sample in samples)
+    return {
+        "count": len(samples),
+        "errors": sum(sample.failed for sample in samples),
+        "throughput": round(len(samples) / duration, 2) if duration else 0,
+        "p50": round(percentile(durations, 0.5) * 1000, 3),
+        "p95": round(percentile(durations, 0.95) * 1000, 3),
+        "p99": round(percentile(durations, 0.99) * 1000, 3),
+        "mean": round(sum(durations) / len(durations) * 1000, 3),
+        "queries": round(sum(sample.queries for sample in samples) / len(samples), 2),
+    }
+
+
+def summarize(samples: List[ReplaySample], duration: float) -> Dict[str, Any]:
+    """
+    Summarizes the samples in total and per operation name: the latency percentiles in milliseconds, the throughput
+    in operations per second of the whole replay, and the mean SQL count.
+    """
+    if not samples:
+        return {"duration": round(duration, 3), "total": None, "operations": {}}
+    grouped: Dict[str, List[ReplaySample]] = {}
+    for sample in samples:
+        grouped.setdefault(sample.operation_name, []).append(sample)
+    return {
+        "duration": round(duration, 3),
+        "total": summarize_samples(samples, duration),
+        "operations": {name: summarize_samples(group, duration) for name, group in sorted(grouped.items())},
+    }
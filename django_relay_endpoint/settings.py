@@ -0,0 +1,87 @@
+from django.conf import settings
+from typing import Any
+
+
+DEFAULTS = {
+    # whether SchemaConfigurator verifies the checksum of a snapshot against the models and NodeTypes when it loads it,
+    # False skips the walk of the models at startup, the snapshot is then verified by 'dre-snapshot --check', e.g. in CI
+    "SNAPSHOT_CHECKSUM": True,
+    # the maximum estimated cost of an operation, None disables the limit
+    "MAX_QUERY_COST": None,
+    # the maximum depth of an operation, None disables the limit
+    "MAX_QUERY_DEPTH": None,
+    # the page size of connections without `first` or `last`, when the NodeType does not declare one
+    "DEFAULT_PAGE_SIZE": None,
+    # whether the estimated cost is exposed in the response extensions
+    "QUERY_COST_EXTENSION": True,
+    # whether operations are instrumented: False, True, or "header" to instrument the requests carrying INSTRUMENTATION_HEADER
+    # whose user is allowed by `GraphQLView.can_instrument`, i.e. staff by default
+    "INSTRUMENTATION": False,
+    # the request header that enables the instrumentation of a request when INSTRUMENTATION is "header"
+    "INSTRUMENTATION_HEADER": "X-Relay-Endpoint-Instrumentation",
+    # whether GraphQLView detects N+1 queries: False, "warn" or "raise"
+    "NPLUSONE_DETECTION": False,
+    # the number of times a query may repeat at one resolver path before it is reported as N+1
+    "NPLUSONE_THRESHOLD": 3,
+    # whether the metrics are recorded
+    "METRICS": False,
+    # a directory shared by the processes of a prefork server, enables the multiprocess mode of the metrics,
+    # to be emptied when the server starts, see `django_relay_endpoint.metrics.mark_process_dead` for the files of dead workers
+    "METRICS_DIRECTORY": None,
+    # the dotted path of a django_relay_endpoint.tracing.Tracer subclass, e.g. "django_relay_endpoint.tracing.OpenTelemetryTracer"
+    "TRACER": None,
+    # whether staff users may profile operations with PROFILING_HEADER set to "sampling" or "deterministic"
+    "PROFILING": False,
+    "PROFILING_HEADER": "X-Relay-Endpoint-Profile",
+    # a directory the profiles are written to, besides the response extensions
+    "PROFILING_DIRECTORY": None,
+    # the interval of the sampling profiler in seconds
+    "PROFILING_SAMPLE_INTERVAL": 0.001,
+    # the number of stacks or functions in the response extensions
+    "PROFILING_LIMIT": 30,
+    # a file the views append a sample of the operations to, replayed by the 'dre-load-test' command
+    "RECORDING_FILE": None,
+    # the fraction of the operations recorded to RECORDING_FILE
+    "RECORDING_SAMPLE_RATE": 0.01,
+    # the number of rows ExportView fetches per chunk
+    "EXPORT_CHUNK_SIZE": 2000,
+    # the number of rows the import mutations validate and insert at once
+    "IMPORT_BATCH_SIZE": 500,
+    # the number of row errors reported by the import mutations, the failed rows are counted regardless
+    "IMPORT_MAX_ERRORS": 100,
+    # the size in bytes up to which an uploaded file is kept in memory, None falls back to FILE_UPLOAD_MAX_MEMORY_SIZE
+    "UPLOAD_MEMORY_THRESHOLD": None,
+    # the maximum size in bytes of an uploaded file, None for no limit
+    "UPLOAD_MAX_FILE_SIZE": None,
+    # the maximum size in bytes of the files uploaded by a request, None for no limit
+    "UPLOAD_MAX_REQUEST_SIZE": None,
+    # the dotted path of a django_relay_endpoint.encoding.ResponseEncoder subclass, None uses orjson if it is installed
+    "RESPONSE_ENCODER": None,
+    # the size in bytes from which the JSON responses are gzipped for clients accepting gzip, None disables the compression
+    "RESPONSE_COMPRESSION_MIN_SIZE": None,
+    # the age in seconds after which a sync watermark is rejected, so that the tombstones older than it can be deleted
+    # by 'dre-prune-tombstones', None accepts every watermark and keeps the tombstones
+    "SYNC_WATERMARK_MAX_AGE": None,
+    # experimental: whether the sync view compiles the root connections of query operations into single SQL statements with JSON aggregation
+    "JSON_AGGREGATION": False,
+}
+
+
+class DjangoRelayEndpointSettings:
+    """
+    Reads the `DJANGO_RELAY_ENDPOINT` dictionary of the django settings, falling back to DEFAULTS, e.g.
+
+        DJANGO_RELAY_ENDPOINT = {
+            "MAX_QUERY_COST": 10000,
+        }
+
+    The settings are read on every access, so that `override_settings` applies.
+    """
+
+    def __getattr__(self, name: str) -> Any:
+        if name not in DEFAULTS:
+            raise AttributeError(f"Invalid django_relay_endpoint setting: '{name}'")
+        return getattr(settings, "DJANGO_RELAY_ENDPOINT", {}).get(name, DEFAULTS[name])
+
+
+dre_settings = DjangoRelayEndpointSettings()
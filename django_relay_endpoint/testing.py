@@ -0,0 +1,122 @@
+from typing import Any, Dict, Tuple
+import graphene
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory
+from graphql import ExecutionResult
+from django_relay_endpoint.nplusone import NPlusOneDetector, ResolverPathMiddleware
+
+try:
+    import pytest
+except ImportError:
+    pytest = None
+
+
+def get_default_context():
+    """
+    Returns a POST request of an anonymous user, the default context of executed documents.
+    """
+    request = RequestFactory().post("/")
+    request.user = AnonymousUser()
+    return request
+
+
+def execute_document(
+        schema: graphene.Schema,
+        document: str,
+        variables: Dict[str, Any] = None,
+        context_value: Any = None,
+        threshold: int = None,
+) -> Tuple[ExecutionResult, NPlusOneDetector]:
+    """
+    Executes the document with the N+1 detection.
+
+    Args:
+        schema (graphene.Schema): the schema, e.g. `SchemaConfigurator(NODE_TYPES).schema()`
+        document (str): the graphql document
+        variables (Dict[str, Any], optional): the variables of the document. Defaults to None.
+        context_value (Any, optional): the context, usually a request with a user. Defaults to a request of an anonymous user.
+        threshold (int, optional): the number of repetitions allowed per path. Defaults to the NPLUSONE_THRESHOLD setting.
+
+    Returns:
+        Tuple[ExecutionResult, NPlusOneDetector]: the result and the detector with the recorded queries
+    """
+    with NPlusOneDetector(threshold=threshold) as detector:
+        result = schema.execute(
+            document,
+            variable_values=variables,
+            context_value=context_value if context_value is not None else get_default_context(),
+            middleware=[ResolverPathMiddleware()],
+        )
+    return result, detector
+
+
+def assert_max_queries(
+        schema: graphene.Schema,
+        document: str,
+        max_queries: int,
+        variables: Dict[str, Any] = None,
+        context_value: Any = None,
+        threshold: int = None,
+) -> ExecutionResult:
+    """
+    Executes the document and asserts that it succeeds without N+1 violations in at most `max_queries` queries.
+
+    Raises:
+        AssertionError: if the result has errors, the queries have N+1 violations or exceed `max_queries`
+
+    Returns:
+        ExecutionResult: the result
+    """
+    result, detector = execute_document(schema, document, variables, context_value, threshold)
+    if result.errors:
+        raise AssertionError(f"The document failed with errors: {result.errors}")
+    if detector.violations():
+        raise AssertionError(detector.format_violations())
+    if detector.query_count > max_queries:
+        raise AssertionError(
+            f"The document ran {detector.query_count} queries, expected at most {max_queries}:\n{detector.format_queries()}")
+    return result
+
+
+class GraphQLQueryCountMixin:
+    """
+    A TestCase mixin asserting the queries of documents executed against `graphql_schema`, e.g.
+
+        class BookQueryTests(GraphQLQueryCountMixin, TestCase):
+            graphql_schema = SchemaConfigurator(NODE_TYPES).schema()
+
+            def test_books(self):
+                self.assertMaxQueries(2, "{ book { edges { node { title author { name } } } } }")
+    """
+
+    graphql_schema: graphene.Schema = None
+    nplusone_threshold: int = None
+
+    def executeDocument(self, document: str, variables: Dict[str, Any] = None, context_value: Any = None) -> Tuple[ExecutionResult, NPlusOneDetector]:
+        return execute_document(self.graphql_schema, document, variables, context_value, self.nplusone_threshold)
+
+    def assertMaxQueries(self, max_queries: int, document: str, variables: Dict[str, Any] = None, context_value: Any = None) -> ExecutionResult:
+        try:
+            return assert_max_queries(self.graphql_schema, document, max_queries, variables, context_value, self.nplusone_threshold)
+        except AssertionError as e:
+            raise self.failureException(str(e)) from None
+
+    def assertNoNPlusOne(self, document: str, variables: Dict[str, Any] = None, context_value: Any = None) -> ExecutionResult:
+        result, detector = self.executeDocument(document, variables, context_value)
+        if detector.violations():
+            raise self.failureException(detector.format_violations())
+        return result
+
+
+if pytest is not None:
+
+    @pytest.fixture
+    def graphql_max_queries():
+        """
+        A pytest fixture returning `assert_max_queries`. Enable it with `pytest_plugins = ["django_relay_endpoint.testing"]`
+        in conftest.py, the tests need database access, e.g. `@pytest.mark.django_db` of pytest-django.
+
+            def test_books(graphql_max_queries):
+                graphql_max_queries(schema, "{ book { edges { node { title } } } }", 2)
+        """
+        return assert_max_queries
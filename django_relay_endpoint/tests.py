@@ -1,3 +1,1349 @@
-from django.test import TestCase
+"""
+The tests of django_relay_endpoint, which use the models of the benchmarks app, see `runtests.py`.
+"""
+import datetime
+import decimal
+import gzip
+import importlib
+import io
+import json
+import os
+import pstats
+import sys
+import tempfile
+import threading
+import time
+import unittest
+import unittest.mock
+import uuid
+from asgiref.sync import sync_to_async
+from django import forms
+from django.apps import apps
+from django.contrib.auth.models import AnonymousUser, User
+from django.contrib.sessions.backends.signed_cookies import SessionStore
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db import models
+from django.db.backends.signals import connection_created
+from django.db.models import Count
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.cache import cc_delim_re
+from django.utils.translation import gettext_lazy
+import graphene
+from graphene_django import DjangoObjectType
+from graphene_django.converter import convert_django_field
+from graphene_django.registry import Registry
+from graphql import GraphQLError, introspection_types, parse
+from graphql_relay import to_global_id
+from graphql_relay.utils import base64
+from django_relay_endpoint import ExportView, GraphQLView, NodeType, SchemaConfigurator
+from django_relay_endpoint import AsyncGraphQLView
+from django_relay_endpoint.bulk_import import BulkImporter
+from django_relay_endpoint.compiler import JSONAggregationMiddleware
+from django_relay_endpoint.configurators.field_conversions import MODEL_TO_FORM_FIELD, MODEL_TO_SCALAR, ConversionRegistry, conversions, register_conversion
+from django_relay_endpoint.configurators.fields import INPUT_FIELD_CLASSES, get_input_field_class
+from django_relay_endpoint.configurators.mutation_configurators.abstract_mutation_class_configurator import configure_abstract_mutation
+from django_relay_endpoint.configurators.permissions import BasePermission
+from django_relay_endpoint.configurators.snapshot import render_snapshot
+from django_relay_endpoint.configurators.stats import collect_schema_stats
+from django_relay_endpoint.configurators.sync import SyncIndexWarning, Watermark, decode_watermark, encode_watermark, prune_tombstones
+from django_relay_endpoint.cost import analyze_query_cost
+from django_relay_endpoint.encoding import OrjsonResponseEncoder, ResponseEncoder, encoders, get_response_encoder
+from django_relay_endpoint.execution import ConcurrentExecutionContext
+from django_relay_endpoint.metrics import ARCHIVE_FILE, MetricsRegistry, mark_process_dead
+from django_relay_endpoint.middleware import PageSizeMiddleware
+from django_relay_endpoint.models import Tombstone
+from django_relay_endpoint.nplusone import NPlusOneDetector, NPlusOneError, ResolverPathMiddleware
+from django_relay_endpoint.profiling import OperationProfile
+from django_relay_endpoint.replay import is_mutation, load_operations
+from django_relay_endpoint.testing import GraphQLQueryCountMixin, assert_max_queries, execute_document
+from django_relay_endpoint.tracing import InMemoryTracer, get_tracer, set_tracer, traced_execute
 
-# Create your tests here.
+
+class PublisherType(NodeType):
+    class Meta:
+        model = "bench.Publisher"
+        fields = "__all__"
+
+
+class AuthorType(NodeType):
+    class Meta:
+        model = "bench.Author"
+        fields = ["id", "name", "age", "profile", "publisher", "books"]
+        filter_fields = {"name": ["exact"]}
+
+
+class BookType(NodeType):
+    class Meta:
+        model = "bench.Book"
+        fields = ["id", "title", "price", "metadata", "author", "reviews"]
+        filter_fields = {"title": ["exact"]}
+
+
+class ReviewType(NodeType):
+    class Meta:
+        model = "bench.Review"
+        fields = "__all__"
+
+
+NODE_TYPES = [PublisherType, AuthorType, BookType, ReviewType]
+
+
+def get_request(session=None):
+    request = RequestFactory().post("/")
+    request.user = AnonymousUser()
+    if session is not None:
+        request.session = session
+    return request
+
+
+@unittest.skipUnless(apps.is_installed("bench"), "the tests use the models of the benchmarks app, see runtests.py")
+class ReadReplicaTests(TestCase):
+    databases = {"default", "replica"}
+    query = "{ author { edges { node { name } } } }"
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.schema = SchemaConfigurator(NODE_TYPES, read_database="replica", sticky_seconds=10).schema()
+
+    @classmethod
+    def setUpTestData(cls):
+        from bench.models import Author
+        Author.objects.using("default").create(name="on-primary")
+        Author.objects.using("replica").create(name="on-replica")
+
+    def get_names(self, session) -> list:
+        result = self.schema.execute(self.query, context_value=get_request(session))
+        self.assertIsNone(result.errors)
+        return [edge["node"]["name"] for edge in result.data["author"]["edges"]]
+
+    def test_query_reads_from_replica(self):
+        self.assertEqual(self.get_names(SessionStore()), ["on-replica"])
+
+    def test_session_reads_from_primary_after_mutation(self):
+        session = SessionStore()
+        result = self.schema.execute(
+            'mutation { createAuthor(input: {data: {name: "created", age: 3}}) { author { name } } }',
+            context_value=get_request(session),
+        )
+        self.assertIsNone(result.errors)
+        self.assertEqual(self.get_names(session), ["on-primary", "created"])
+        # other sessions keep reading from the replica
+        self.assertEqual(self.get_names(SessionStore()), ["on-replica"])
+
+
+@unittest.skipUnless(apps.is_installed("bench"), "the tests use the models of the benchmarks app, see runtests.py")
+@override_settings(DJANGO_RELAY_ENDPOINT={"MAX_QUERY_COST": 300})
+class QueryCostTests(SimpleTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.schema = SchemaConfigurator(NODE_TYPES).schema().graphql_schema
+
+    def analyze(self, document: str, variables: dict = None):
+        return analyze_query_cost(self.schema, parse(document), variables=variables)
+
+    def test_page_size_argument_is_charged(self):
+        with self.assertRaises(GraphQLError):
+            self.analyze("{ book(first: 400) { edges { node { title } } } }")
+
+    def test_variable_default_is_charged(self):
+        document = "query Books($first: Int = 400) { book(first: $first) { edges { node { title } } } }"
+        with self.assertRaises(GraphQLError):
+            self.analyze(document)
+        self.assertEqual(self.analyze(document, {"first": 10})[0], 10)
+
+
+@unittest.skipUnless(apps.is_installed("bench"), "the tests use the models of the benchmarks app, see runtests.py")
+class SchemaStatsTests(SimpleTestCase):
+
+    def test_node_types_count_the_types_only_they_add(self):
+        *node_type_stats, schema_stats = collect_schema_stats(SchemaConfigurator(NODE_TYPES))
+        publisher_stats = next(stats for stats in node_type_stats if stats.name == "PublisherType")
+        # the object type, its connection and edge, the input type and the payloads and inputs of the create, update and delete
+        # mutations, the relation to the authors enters the types of AuthorType
+        self.assertEqual(publisher_stats.classes, 10)
+        self.assertEqual(publisher_stats.input_types, 4)
+        # the root, introspection and shared types are counted by the schema only
+        self.assertLess(sum(stats.classes for stats in node_type_stats), schema_stats.classes - 2 - len(introspection_types))
+
+
+def validate_adult(value, instance, info):
+    if value < 18:
+        raise ValidationError({"age": "Authors must be adults"})
+
+
+@unittest.skipUnless(apps.is_installed("bench"), "the tests use the models of the benchmarks app, see runtests.py")
+class BulkImportTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.node_type = AuthorType()
+        cls.mutation = configure_abstract_mutation(
+            django_object_type=cls.node_type.django_object_type,
+            conventional_name="BenchValidatedAuthor",
+            field_validators={"age": [validate_adult]},
+        )
+
+    def test_validators_get_the_cleaned_values(self):
+        from bench.models import Author
+        importer = BulkImporter(
+            mutation=self.mutation,
+            input_object_type=self.node_type.input_object_type,
+            fields=["name", "age", "publisher"],
+            info=None,
+            batch_size=10,
+            max_errors=10,
+        )
+        importer.run([(1, {"name": "adult", "age": "40", "publisher": ""}, None), (2, {"name": "child", "age": "9"}, None)])
+        self.assertEqual((importer.created, importer.failed), (1, 1))
+        self.assertEqual((importer.errors[0].row, importer.errors[0].field), (2, "age"))
+        self.assertEqual(list(Author.objects.values_list("name", flat=True)), ["adult"])
+
+
+@unittest.skipUnless(apps.is_installed("bench"), "the tests use the models of the benchmarks app, see runtests.py")
+class JSONAggregationTests(TestCase):
+    queries = [
+        '{ author(first: 2) { pageInfo { hasNextPage endCursor } edges { cursor node { id name profile publisher { name } } } } }',
+        '{ author(name: "a1") { edges { node { name books(first: 2) { pageInfo { hasNextPage } edges { node { title price metadata '
+        'reviews { edges { node { rating body } } } } } } } } } }',
+        '{ author(first: 3, offset: 1) { edges { node { name books(title: "b1-0") { edges { cursor node { title '
+        'author { name books { edges { node { id } } } } } } } } } } }',
+        '{ publisher { edges { node { name authors(first: 1) { edges { node { name books { edges { node { title } } } } } } } } } }',
+    ]
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.schema = SchemaConfigurator(NODE_TYPES).schema()
+
+    @classmethod
+    def setUpTestData(cls):
+        from bench.models import Author, Book, Publisher, Review
+        publisher = Publisher.objects.create(name="p", country="NL")
+        for i in range(4):
+            author = Author.objects.create(name=f"a{i}", age=30 + i, profile={"i": i, "tags": ["x", None]}, publisher=publisher if i % 2 else None)
+            for j in range(3):
+                book = Book.objects.create(title=f"b{i}-{j}", price=f"{i}{j}.50", metadata={"pages": j * 100}, author=author)
+                for rating in range(j):
+                    Review.objects.create(book=book, rating=rating + 1, body=f"r{rating}")
+
+    def execute(self, query: str, middleware: list):
+        with CaptureQueriesContext(connection) as queries:
+            result = self.schema.execute(query, context_value=get_request(), middleware=middleware)
+        self.assertIsNone(result.errors)
+        return result.data, len(queries)
+
+    def test_compiled_connections_equal_the_resolved_ones(self):
+        for query in self.queries:
+            with self.subTest(query=query):
+                data, count = self.execute(query, [PageSizeMiddleware()])
+                compiled_data, compiled_count = self.execute(query, [JSONAggregationMiddleware(), PageSizeMiddleware()])
+                self.assertEqual(compiled_data, data)
+                self.assertEqual(compiled_count, 1)
+                self.assertLess(compiled_count, count)
+
+
+@unittest.skipUnless(apps.is_installed("bench"), "the tests use the models of the benchmarks app, see runtests.py")
+class ExportTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.view = staticmethod(ExportView.as_view(configurator=SchemaConfigurator(NODE_TYPES)))
+
+    def test_export_of_a_model_with_a_json_field(self):
+        from bench.models import Author
+        Author.objects.create(name="exported", profile={"city": "Utrecht"})
+        request = RequestFactory().get("/", {"format": "csv", "fields": "name,profile"})
+        request.user = AnonymousUser()
+        response = self.view(request, root_field="author")
+        self.assertEqual(response.status_code, 200)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], "name,profile")
+        self.assertIn("Utrecht", lines[1])
+
+
+@unittest.skipUnless(apps.is_installed("bench"), "the tests use the models of the benchmarks app, see runtests.py")
+@override_settings(DJANGO_RELAY_ENDPOINT={"INSTRUMENTATION": "header"})
+class InstrumentationTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.view = staticmethod(GraphQLView.as_view(schema=SchemaConfigurator(NODE_TYPES).schema()))
+
+    def get_extensions(self, user) -> dict:
+        request = RequestFactory().post(
+            "/",
+            data=json.dumps({"query": "{ author { edges { node { name } } } }"}),
+            content_type="application/json",
+            headers={"X-Relay-Endpoint-Instrumentation": "1"},
+        )
+        request.user = user
+        response = self.view(request)
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.content).get("extensions", {})
+
+    def test_header_is_ignored_for_anonymous_users(self):
+        self.assertNotIn("instrumentation", self.get_extensions(AnonymousUser()))
+
+    def test_header_instruments_staff_requests(self):
+        self.assertIn("instrumentation", self.get_extensions(User(username="staff", is_staff=True)))
+
+
+@unittest.skipUnless(apps.is_installed("bench"), "the tests use the models of the benchmarks app, see runtests.py")
+@override_settings(DJANGO_RELAY_ENDPOINT={"UPLOAD_MAX_FILE_SIZE": 10})
+class UploadLimitTests(SimpleTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.view = staticmethod(GraphQLView.as_view(schema=SchemaConfigurator(NODE_TYPES).schema()))
+
+    def get_request(self):
+        request = RequestFactory().post("/", data={
+            "operations": json.dumps({"query": "mutation ($file: Upload) { __typename }", "variables": {"file": None}}),
+            "map": json.dumps({"0": ["variables.file"]}),
+            "0": SimpleUploadedFile("cover.png", b"x" * 20),
+        })
+        request.user = AnonymousUser()
+        return request
+
+    def test_file_exceeding_the_limit_is_rejected(self):
+        self.assertEqual(self.view(self.get_request()).status_code, 413)
+
+    def test_limit_applies_to_files_parsed_before_the_view(self):
+        request = self.get_request()
+        # as the CSRF middleware does, with the default handlers
+        request.POST
+        self.assertEqual(self.view(request).status_code, 413)
+
+
+class MultiprocessMetricsTests(SimpleTestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def flush(self, count: int) -> MetricsRegistry:
+        registry = MetricsRegistry()
+        registry.counter("operations_total", "The operations.").inc(amount=count)
+        registry.flush(self.directory)
+        return registry
+
+    def get_total(self) -> int:
+        return MetricsRegistry.load(self.directory)["operations_total"]["samples"][0][1]
+
+    def test_process_reusing_a_pid_does_not_overwrite_the_values_of_the_dead_one(self):
+        self.flush(3)
+        self.flush(2)
+        self.assertEqual(self.get_total(), 5)
+
+    def test_dead_processes_are_merged_into_the_archive(self):
+        self.flush(3)
+        self.flush(2)
+        mark_process_dead(os.getpid(), self.directory)
+        self.assertEqual(os.listdir(self.directory), [ARCHIVE_FILE])
+        self.assertEqual(self.get_total(), 5)
+        self.flush(1)
+        mark_process_dead(os.getpid(), self.directory)
+        self.assertEqual(self.get_total(), 6)
+
+    def test_reset_starts_a_new_file_from_zero(self):
+        registry = self.flush(3)
+        registry.reset()
+        registry.metrics["operations_total"].inc()
+        registry.flush(self.directory)
+        self.assertEqual(self.get_total(), 4)
+
+
+@unittest.skipUnless(apps.is_installed("bench"), "the tests use the models of the benchmarks app, see runtests.py")
+class DeterministicProfileTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.schema = SchemaConfigurator(NODE_TYPES).schema()
+
+    def test_generated_classes_are_labelled_with_their_node_type(self):
+        with OperationProfile("deterministic") as profile:
+            result = self.schema.execute(
+                'mutation { createAuthor(input: {data: {name: "profiled", age: 3}}) { author { name } } }',
+                context_value=get_request(),
+            )
+        self.assertIsNone(result.errors)
+        functions = [function["function"] for function in profile.profiler.summary(limit=1000)["functions"]]
+        self.assertTrue(any(function.startswith("AuthorType:") for function in functions), functions)
+
+    def test_stats_are_readable_by_pstats(self):
+        with OperationProfile("deterministic") as profile:
+            self.schema.execute("{ author { edges { node { name } } } }", context_value=get_request())
+        with tempfile.TemporaryDirectory() as directory:
+            stats = pstats.Stats(profile.write(directory))
+        self.assertTrue(any(label.startswith("AuthorType:") for _, _, label in stats.stats), list(stats.stats))
+
+
+@unittest.skipUnless(apps.is_installed("bench"), "the tests use the models of the benchmarks app, see runtests.py")
+class SnapshotTests(SimpleTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        directory = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(directory.cleanup)
+        with open(os.path.join(directory.name, "dre_test_snapshot.py"), "w") as f:
+            f.write(render_snapshot(SchemaConfigurator(NODE_TYPES)))
+        sys.path.insert(0, directory.name)
+        cls.addClassCleanup(sys.path.remove, directory.name)
+        cls.addClassCleanup(sys.modules.pop, "dre_test_snapshot", None)
+        cls.snapshot = importlib.import_module("dre_test_snapshot")
+
+    def test_schema_of_the_snapshot_equals_the_dynamic_schema(self):
+        configurator = SchemaConfigurator(NODE_TYPES, snapshot=self.snapshot)
+        self.assertIs(configurator.snapshot, self.snapshot)
+        self.assertEqual(
+            {node.conventional_name: node.input_object_type for node in configurator.instantiated_types},
+            self.snapshot.INPUT_OBJECT_TYPES,
+        )
+        self.assertEqual(str(configurator.schema()), str(SchemaConfigurator(NODE_TYPES).schema()))
+        self.assertEqual(configurator.introspect(), SchemaConfigurator(NODE_TYPES).introspect())
+
+    def test_stale_snapshot_falls_back_to_the_dynamic_configuration(self):
+        with unittest.mock.patch.object(self.snapshot, "CHECKSUM", "stale"):
+            with self.assertWarnsRegex(UserWarning, "does not match"):
+                configurator = SchemaConfigurator(NODE_TYPES, snapshot=self.snapshot)
+            self.assertIsNone(configurator.snapshot)
+            self.assertNotIn(configurator.instantiated_types[0].input_object_type, self.snapshot.INPUT_OBJECT_TYPES.values())
+            self.assertEqual(str(configurator.schema()), str(SchemaConfigurator(NODE_TYPES).schema()))
+            # the checksum is not verified when SNAPSHOT_CHECKSUM is False
+            with override_settings(DJANGO_RELAY_ENDPOINT={"SNAPSHOT_CHECKSUM": False}):
+                self.assertIs(SchemaConfigurator(NODE_TYPES, snapshot=self.snapshot).snapshot, self.snapshot)
+
+
+@unittest.skipUnless(apps.is_installed("bench"), "the tests use the models of the benchmarks app, see runtests.py")
+class InputFieldClassTests(SimpleTestCase):
+
+    def test_node_types_share_the_input_field_classes(self):
+        author_fields = AuthorType().input_object_type._meta.fields
+        publisher_fields = PublisherType().input_object_type._meta.fields
+        self.assertIs(type(author_fields["name"]), type(publisher_fields["name"]))
+        self.assertIsNot(type(author_fields["name"]), type(author_fields["age"]))
+        # the fields of a class still clean with their own kwargs
+        self.assertIsNot(author_fields["name"].form_field, publisher_fields["name"].form_field)
+
+    def test_input_field_class_is_created_once_per_form_field_and_scalar(self):
+        input_field_class = get_input_field_class(forms.SlugField, graphene.String)
+        self.assertIs(get_input_field_class(forms.SlugField, graphene.String), input_field_class)
+        self.assertIs(INPUT_FIELD_CLASSES[(forms.SlugField, graphene.String)], input_field_class)
+        self.assertIsNot(get_input_field_class(forms.SlugField, graphene.ID), input_field_class)
+
+
+class CountryCodeField(models.CharField):
+    pass
+
+
+class ConversionRegistryTests(SimpleTestCase):
+
+    def setUp(self):
+        self.registry = ConversionRegistry(dict(MODEL_TO_SCALAR), dict(MODEL_TO_FORM_FIELD))
+
+    def test_subclass_resolves_through_the_mro(self):
+        self.assertIs(self.registry.get_scalar(CountryCodeField), graphene.String)
+        self.assertIs(self.registry.get_form_field(CountryCodeField), forms.CharField)
+
+    def test_resolution_is_cached_per_class(self):
+        self.registry.get_scalar(CountryCodeField)
+        self.registry.get_scalar(CountryCodeField)
+        self.assertEqual((self.registry.cache_misses, self.registry.cache_hits), (1, 1))
+        self.assertEqual(self.registry.scalar_cache, {CountryCodeField: graphene.String})
+
+    def test_registered_conversion_overrides_the_ancestor(self):
+        self.registry.get_scalar(CountryCodeField)
+        self.registry.register(CountryCodeField, scalar=graphene.ID, form_field=forms.SlugField)
+        self.assertIs(self.registry.get_scalar(CountryCodeField), graphene.ID)
+        self.assertIs(self.registry.get_form_field(CountryCodeField), forms.SlugField)
+        # the ancestor keeps its conversion
+        self.assertIs(self.registry.get_scalar(models.CharField), graphene.String)
+
+    def test_register_conversion_with_output_converts_the_object_type_fields(self):
+        class UppercaseCodeField(CountryCodeField):
+            pass
+
+        register_conversion(UppercaseCodeField, scalar=graphene.ID, output=True)
+        self.assertIs(conversions.get_scalar(UppercaseCodeField), graphene.ID)
+        converted = convert_django_field(UppercaseCodeField(max_length=2, name="code"))
+        self.assertIsInstance(converted, graphene.ID)
+        # the ancestors are converted by graphene_django as before
+        self.assertIsInstance(convert_django_field(CountryCodeField(max_length=2, name="code")), graphene.String)
+
+
+class AdultsOnly(BasePermission):
+    """
+    Allows the authors who are adults, checked natively async, unless `closed`.
+    """
+    checked = []
+    closed = False
+
+    async def ahas_permission(self, info) -> bool:
+        return not self.closed
+
+    async def ahas_object_permission(self, info, obj) -> bool:
+        self.checked.append(obj.name)
+        return obj.age >= 18
+
+
+class AsyncAuthorType(NodeType):
+    class Meta:
+        model = "bench.Author"
+        object_type_name = "BenchAsyncAuthor"
+        fields = ["id", "name", "age", "publisher", "books"]
+        filter_fields = {"name": ["exact"]}
+        permission_classes = [AdultsOnly]
+
+
+class AsyncBookType(NodeType):
+    class Meta:
+        model = "bench.Book"
+        object_type_name = "BenchAsyncBook"
+        fields = ["id", "title", "price", "author"]
+
+
+@unittest.skipUnless(apps.is_installed("bench"), "the tests use the models of the benchmarks app, see runtests.py")
+class AsyncExecutionTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        schema = SchemaConfigurator([AsyncAuthorType, AsyncBookType], asynchronous=True).schema()
+        cls.view = staticmethod(AsyncGraphQLView.as_view(schema=schema))
+
+    @classmethod
+    def setUpTestData(cls):
+        from bench.models import Author, Book
+        cls.adult = Author.objects.create(name="adult", age=40)
+        cls.child = Author.objects.create(name="child", age=9)
+        for i in range(3):
+            Book.objects.create(title=f"b{i}", price=i, author=cls.adult)
+
+    def setUp(self):
+        AdultsOnly.checked.clear()
+        AdultsOnly.closed = False
+
+    async def execute(self, document: str, variables: dict = None) -> dict:
+        request = RequestFactory().post(
+            "/", data=json.dumps({"query": document, "variables": variables or {}}), content_type="application/json",
+        )
+        request.user = AnonymousUser()
+        response = await self.view(request)
+        self.assertEqual(response.status_code, 200, response.content)
+        return json.loads(response.content)
+
+    async def test_connection_pages_with_nested_relations(self):
+        result = await self.execute(
+            '{ author(first: 1) { pageInfo { hasNextPage } edges { node { name books { edges { node { title author { name } } } } } } } }'
+        )
+        self.assertNotIn("errors", result)
+        connection = result["data"]["author"]
+        self.assertTrue(connection["pageInfo"]["hasNextPage"])
+        books = connection["edges"][0]["node"]["books"]["edges"]
+        self.assertEqual([edge["node"]["title"] for edge in books], ["b0", "b1", "b2"])
+        self.assertEqual({edge["node"]["author"]["name"] for edge in books}, {"adult"})
+
+    async def test_connection_is_checked_by_the_async_permission(self):
+        AdultsOnly.closed = True
+        result = await self.execute("{ author { edges { node { name } } } }")
+        self.assertIsNone(result["data"]["author"])
+        self.assertEqual(result["errors"][0]["message"], "Permission denied!")
+
+    async def test_node_is_checked_by_the_async_object_permission(self):
+        document = "query ($id: ID!) { node(id: $id) { ... on BenchAsyncAuthor { name } } }"
+        allowed = await self.execute(document, {"id": to_global_id("BenchAsyncAuthor", self.adult.pk)})
+        self.assertEqual(allowed["data"]["node"], {"name": "adult"})
+        denied = await self.execute(document, {"id": to_global_id("BenchAsyncAuthor", self.child.pk)})
+        self.assertIsNone(denied["data"]["node"])
+        self.assertEqual(denied["errors"][0]["message"], "Permission denied!")
+        self.assertEqual(AdultsOnly.checked, ["adult", "child"])
+
+    async def test_create_update_and_delete(self):
+        from bench.models import Author
+        created = await self.execute('mutation { createAuthor(input: {data: {name: "new", age: 30}}) { success author { id name } } }')
+        self.assertTrue(created["data"]["createAuthor"]["success"])
+        author_id = created["data"]["createAuthor"]["author"]["id"]
+
+        updated = await self.execute(
+            "mutation ($id: ID!) { updateAuthor(input: {data: {id: $id, name: \"renamed\", age: 31}}) { author { name age } } }",
+            {"id": author_id},
+        )
+        self.assertEqual(updated["data"]["updateAuthor"]["author"], {"name": "renamed", "age": 31})
+        self.assertEqual(AdultsOnly.checked, ["new"])
+
+        denied = await self.execute(
+            "mutation ($id: ID!) { updateAuthor(input: {data: {id: $id, name: \"grown\", age: 10}}) { author { name } } }",
+            {"id": to_global_id("BenchAsyncAuthor", self.child.pk)},
+        )
+        self.assertEqual(denied["errors"][0]["message"], "Permission denied!")
+
+        deleted = await self.execute("mutation ($id: ID!) { deleteAuthor(input: {id: $id}) { success } }", {"id": author_id})
+        self.assertTrue(deleted["data"]["deleteAuthor"]["success"])
+        self.assertEqual(await sync_to_async(sorted)(Author.objects.values_list("name", flat=True)), ["adult", "child"])
+
+
+class RootThreadMiddleware:
+    """
+    Records the thread resolving every root field.
+    """
+
+    def __init__(self) -> None:
+        self.threads = {}
+
+    def resolve(self, next, root, info, **args):
+        if info.path.prev is None:
+            self.threads[info.path.key] = threading.current_thread().name
+        return next(root, info, **args)
+
+
+@unittest.skipUnless(apps.is_installed("bench"), "the tests use the models of the benchmarks app, see runtests.py")
+class ConcurrentExecutionTests(TransactionTestCase):
+    # the worker threads use their own database connections, so the data is committed
+    available_apps = ["bench"]
+    query = (
+        "{ author(first: 2) { edges { node { name books { edges { node { title } } } } } } "
+        "book(title: \"b1\") { edges { node { title author { name } } } } "
+        "publisher { edges { node { name } } } }"
+    )
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.schema = SchemaConfigurator(NODE_TYPES).schema()
+
+    def setUp(self):
+        from bench.models import Author, Book, Publisher
+        publisher = Publisher.objects.create(name="p", country="NL")
+        for i in range(3):
+            author = Author.objects.create(name=f"a{i}", age=i, publisher=publisher)
+            Book.objects.create(title=f"b{i}", price=i, author=author)
+
+    def execute(self, document: str, middleware: list = None, **kwargs):
+        return self.schema.execute(
+            document, context_value=get_request(), middleware=middleware or [], execution_context_class=ConcurrentExecutionContext, **kwargs
+        )
+
+    def test_root_fields_resolve_concurrently_to_the_same_data(self):
+        middleware = RootThreadMiddleware()
+        result = self.execute(self.query, [middleware])
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data, self.schema.execute(self.query, context_value=get_request()).data)
+        self.assertEqual(set(middleware.threads), {"author", "book", "publisher"})
+        self.assertTrue(all(name.startswith("ConcurrentExecutionContext") for name in middleware.threads.values()))
+
+    def test_mutation_root_fields_run_serially_in_document_order(self):
+        middleware = RootThreadMiddleware()
+        with unittest.mock.patch.object(ConcurrentExecutionContext, "get_executor") as get_executor:
+            result = self.execute(
+                'mutation { first: createAuthor(input: {data: {name: "first", age: 1}}) { author { name } } '
+                'second: updateAuthor(input: {data: {name: "second", age: 2}}) { author { name } } '
+                'third: createAuthor(input: {data: {name: "third", age: 3}}) { author { name } } }',
+                [middleware],
+            )
+        get_executor.assert_not_called()
+        self.assertEqual(list(middleware.threads), ["first", "second", "third"])
+        self.assertEqual(set(middleware.threads.values()), {threading.current_thread().name})
+        # the failing update does not stop the mutations following it
+        self.assertEqual([error.path for error in result.errors], [["second"]])
+        self.assertEqual(result.data["third"], {"author": {"name": "third"}})
+        from bench.models import Author
+        self.assertEqual(list(Author.objects.filter(name__in=["first", "third"]).order_by("pk").values_list("name", flat=True)), ["first", "third"])
+
+    def test_error_of_a_root_field_does_not_fail_the_others(self):
+        result = self.execute('{ node(id: "invalid") { id } publisher { edges { node { name } } } author(first: 1) { edges { node { name } } } }')
+        self.assertEqual([error.path for error in result.errors], [["node"]])
+        self.assertIsNone(result.data["node"])
+        self.assertEqual(result.data["publisher"], {"edges": [{"node": {"name": "p"}}]})
+        self.assertEqual(result.data["author"], {"edges": [{"node": {"name": "a0"}}]})
+
+    def test_subclass_gets_its_own_pool(self):
+        class DashboardExecutionContext(ConcurrentExecutionContext):
+            max_workers = 2
+
+        executor = DashboardExecutionContext.get_executor()
+        self.addCleanup(executor.shutdown)
+        self.assertIs(DashboardExecutionContext.get_executor(), executor)
+        self.assertIsNot(ConcurrentExecutionContext.get_executor(), executor)
+        self.assertEqual(executor._max_workers, 2)
+        self.assertEqual(ConcurrentExecutionContext.get_executor()._max_workers, ConcurrentExecutionContext.max_workers)
+
+
+def get_plain_book_schema():
+    """
+    Returns a schema of plain graphene-django types, which read the foreign keys from the instances.
+    The types of the SchemaConfigurator fetch them with `get_node` to check the permissions.
+    """
+    from bench.models import Author, Book
+    plain_registry = Registry()
+
+    class PlainAuthor(DjangoObjectType):
+        class Meta:
+            model = Author
+            fields = ["name"]
+            registry = plain_registry
+
+    class PlainBook(DjangoObjectType):
+        class Meta:
+            model = Book
+            fields = ["title", "author"]
+            registry = plain_registry
+
+    class Query(graphene.ObjectType):
+        books = graphene.List(PlainBook)
+        selected_books = graphene.List(PlainBook)
+
+        def resolve_books(root, info):
+            return Book.objects.order_by("pk")
+
+        def resolve_selected_books(root, info):
+            return Book.objects.select_related("author").order_by("pk")
+
+    return graphene.Schema(query=Query)
+
+
+@unittest.skipUnless(apps.is_installed("bench"), "the tests use the models of the benchmarks app, see runtests.py")
+class NPlusOneTests(GraphQLQueryCountMixin, TestCase):
+    document = "{ book { edges { node { title author { name } } } } }"
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.graphql_schema = SchemaConfigurator(NODE_TYPES).schema()
+        cls.plain_schema = get_plain_book_schema()
+
+    @classmethod
+    def setUpTestData(cls):
+        from bench.models import Author, Book
+        for i in range(5):
+            Book.objects.create(title=f"b{i}", author=Author.objects.create(name=f"a{i}"))
+
+    def test_foreign_key_is_flagged_at_its_resolver_path(self):
+        result, detector = self.executeDocument(self.document)
+        self.assertIsNone(result.errors)
+        [(path, sql, count)] = detector.violations()
+        self.assertEqual((path, count), ("book.edges.node.author", 5))
+        self.assertIn('FROM "bench_author"', sql)
+        with self.assertRaises(self.failureException):
+            self.assertNoNPlusOne(self.document)
+        with self.assertRaisesRegex(self.failureException, "book.edges.node.author"):
+            self.assertMaxQueries(10, self.document)
+
+    def test_select_related_passes(self):
+        # without select_related the plain types fetch the authors lazily, one by one
+        result, detector = execute_document(self.plain_schema, "{ books { title author { name } } }")
+        self.assertEqual([(path, count) for path, sql, count in detector.violations()], [("books.author", 5)])
+        result = assert_max_queries(self.plain_schema, "{ selectedBooks { title author { name } } }", 1)
+        self.assertEqual([book["author"]["name"] for book in result.data["selectedBooks"]], [f"a{i}" for i in range(5)])
+
+    def test_raise_mode_raises(self):
+        with self.assertRaises(NPlusOneError):
+            with NPlusOneDetector(mode="raise"):
+                self.graphql_schema.execute(self.document, context_value=get_request(), middleware=[ResolverPathMiddleware()])
+        # the threshold allows the repetitions
+        with NPlusOneDetector(threshold=5, mode="raise") as detector:
+            self.graphql_schema.execute(self.document, context_value=get_request(), middleware=[ResolverPathMiddleware()])
+        self.assertEqual(detector.violations(), [])
+
+
+class PrivateAuthorType(NodeType):
+    class Meta:
+        model = "bench.Author"
+        object_type_name = "BenchPrivateAuthor"
+        fields = ["id", "name"]
+        permissions = ["bench.view_author"]
+
+
+@unittest.skipUnless(apps.is_installed("bench"), "the tests use the models of the benchmarks app, see runtests.py")
+class TracingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.view = staticmethod(GraphQLView.as_view(schema=SchemaConfigurator(NODE_TYPES).schema()))
+        cls.private_view = staticmethod(GraphQLView.as_view(schema=SchemaConfigurator([PrivateAuthorType]).schema()))
+
+    @classmethod
+    def setUpTestData(cls):
+        from bench.models import Author
+        cls.author = Author.objects.create(name="a")
+
+    def setUp(self):
+        self.tracer = InMemoryTracer()
+        set_tracer(self.tracer)
+        self.addCleanup(set_tracer, None)
+
+    def post(self, view, query):
+        request = RequestFactory().post("/", {"query": query}, content_type="application/json")
+        request.user = AnonymousUser()
+        request.session = SessionStore()
+        return json.loads(view(request).content)
+
+    def ancestors(self, span):
+        names = []
+        while span.parent is not None:
+            span = span.parent
+            names.append(span.name)
+        return names
+
+    def test_spans_are_parented(self):
+        self.post(self.view, "{ author { edges { node { name } } } }")
+        [operation] = self.tracer.find("graphql.operation")
+        [get_queryset] = self.tracer.find("BenchAuthor.get_queryset")
+        self.assertEqual(self.ancestors(get_queryset), ["resolve Query.author", "graphql.operation"])
+        self.assertEqual(get_queryset.parent.attributes, {"graphql.field.path": "author", "node_type": "BenchAuthor"})
+        self.assertEqual(self.ancestors(self.tracer.find("BenchAuthor.get_queryset.permissions")[0]), ["BenchAuthor.get_queryset", "resolve Query.author", "graphql.operation"])
+        # the queryset is evaluated by the connection, after get_queryset returned it
+        sqls = self.tracer.find("sql")
+        self.assertEqual(len(sqls), 2)
+        for sql in sqls:
+            self.assertIs(sql.parent, get_queryset.parent)
+            self.assertEqual(sql.attributes["db.alias"], "default")
+        self.assertIs(get_queryset.parent.parent, operation)
+        self.assertEqual({span.status for span in self.tracer.spans}, {"ok"})
+
+    def test_node_lookup_spans(self):
+        self.post(self.view, '{ node(id: "%s") { ... on BenchAuthor { name } } }' % to_global_id("BenchAuthor", self.author.pk))
+        [sql] = self.tracer.find("sql")
+        self.assertEqual(sql.parent.name, "BenchAuthor.get_node")
+        self.assertEqual(sql.parent.attributes["global_id"], str(self.author.pk))
+        self.assertEqual(self.ancestors(sql)[-1], "graphql.operation")
+
+    def test_permission_denied_sets_the_error_status(self):
+        result = self.post(self.private_view, "{ author { edges { node { name } } } }")
+        self.assertEqual(result["errors"][0]["message"], "Permission denied!")
+        for name in ["BenchPrivateAuthor.get_queryset.permissions", "BenchPrivateAuthor.get_queryset", "resolve Query.author"]:
+            [span] = self.tracer.find(name)
+            self.assertEqual(span.status, "error")
+            self.assertEqual(span.attributes["exception"], "PermissionDenied('Permission denied!')")
+        # graphene turns the exception into an error of the result
+        self.assertEqual(self.tracer.find("graphql.operation")[0].status, "ok")
+        self.assertEqual(self.tracer.find("sql"), [])
+
+    def test_set_tracer_none_removes_the_wrappers(self):
+        self.assertIn(traced_execute, connection.execute_wrappers)
+        set_tracer(None)
+        self.assertNotIn(traced_execute, connection.execute_wrappers)
+        self.assertFalse(get_tracer().enabled)
+        self.assertNotIn("django_relay_endpoint_tracing", [receiver[0][0] for receiver in connection_created.receivers])
+        self.post(self.view, "{ author { edges { node { name } } } }")
+        self.assertEqual(self.tracer.spans, [])
+
+
+@unittest.skipUnless(apps.is_installed("bench"), "the tests use the models of the benchmarks app, see runtests.py")
+class LoadTestCommandTests(TransactionTestCase):
+    # the replay runs in worker threads, which do not see the data of a transaction
+    available_apps = ["django_relay_endpoint", "bench"]
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        schema = SchemaConfigurator(NODE_TYPES).schema()
+        cls.view = staticmethod(GraphQLView.as_view(schema=schema))
+        # the command imports the schema by its dotted path
+        cls.enterClassContext(unittest.mock.patch(f"{__name__}.REPLAY_SCHEMA", schema, create=True))
+
+    def setUp(self):
+        from bench.models import Author
+        Author.objects.create(name="a")
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.file = os.path.join(directory.name, "operations.jsonl")
+        self.output = os.path.join(directory.name, "report.json")
+        settings = {"RECORDING_FILE": self.file, "RECORDING_SAMPLE_RATE": 1}
+        with override_settings(DJANGO_RELAY_ENDPOINT=settings):
+            self.post({"query": "query Authors { author { edges { node { name } } } }", "operationName": "Authors"})
+            self.post({"query": "query Author($name: String) { author(name: $name) { edges { node { name } } } }", "variables": {"name": "a"}})
+            self.post({"query": 'mutation Create { createAuthor(input: {data: {name: "b", age: 3}}) { success } }', "operationName": "Create"})
+
+    def post(self, data):
+        request = RequestFactory().post("/", data, content_type="application/json")
+        request.user = AnonymousUser()
+        request.session = SessionStore()
+        response = self.view(request)
+        self.assertNotIn("errors", json.loads(response.content))
+
+    def call_command(self, *args):
+        stdout = io.StringIO()
+        call_command("dre-load-test", self.file, "--schema", f"{__name__}.REPLAY_SCHEMA", "--output", self.output, *args, stdout=stdout)
+        with open(self.output) as f:
+            return json.load(f), stdout.getvalue()
+
+    def test_records_the_operations(self):
+        operations = load_operations(self.file)
+        self.assertEqual([operation["operationName"] for operation in operations], ["Authors", None, "Create"])
+        self.assertEqual(operations[1]["variables"], {"name": "a"})
+        self.assertEqual([is_mutation(operation) for operation in operations], [False, False, True])
+
+    def test_replays_the_queries_and_reports(self):
+        from bench.models import Author
+        report, stdout = self.call_command("--repeat", "3", "--concurrency", "2")
+        self.assertEqual(report["total"]["count"], 6)
+        self.assertEqual(report["total"]["errors"], 0)
+        self.assertEqual(sorted(report["operations"]), ["Authors", "anonymous"])
+        for summary in report["operations"].values():
+            self.assertEqual(summary["count"], 3)
+            # the count and the page of the connection
+            self.assertEqual(summary["queries"], 2)
+            self.assertLessEqual(summary["p50"], summary["p99"])
+        self.assertIn("Replayed 6 operations", stdout)
+        self.assertIn("Authors", stdout)
+        # the mutations are skipped by default
+        self.assertNotIn("Create", report["operations"])
+        self.assertEqual(Author.objects.count(), 2)
+
+    def test_replays_the_mutations_on_request(self):
+        from bench.models import Author
+        # one worker, SQLite locks the tables written concurrently
+        report, stdout = self.call_command("--include-mutations")
+        self.assertEqual(report["total"]["count"], 3)
+        self.assertEqual(report["operations"]["Create"]["errors"], 0)
+        self.assertEqual(Author.objects.count(), 3)
+
+
+class ResponseEncoderTests(SimpleTestCase):
+    data = {
+        "data": {"book": {"title": "Dune", "price": decimal.Decimal("9.90"), "published": datetime.date(1965, 8, 1)}},
+        "extensions": {"id": uuid.UUID("12345678-1234-5678-1234-567812345678"), "counts": [1, 2.5, None, True]},
+    }
+
+    def test_orjson_encodes_as_the_standard_library(self):
+        encoder, orjson_encoder = ResponseEncoder(), OrjsonResponseEncoder()
+        for pretty in [False, True]:
+            with self.subTest(pretty=pretty):
+                self.assertEqual(orjson_encoder.encode(self.data, pretty), encoder.encode(self.data, pretty))
+        self.assertEqual(json.loads(orjson_encoder.encode(self.data))["data"]["book"]["price"], "9.90")
+        # orjson does not escape non-ASCII characters
+        self.assertEqual(json.loads(orjson_encoder.encode({"name": "Éowyn"})), json.loads(encoder.encode({"name": "Éowyn"})))
+
+    def test_orjson_falls_back_to_the_standard_library(self):
+        data = {"count": 2 ** 70, "name": gettext_lazy("name")}
+        self.assertEqual(OrjsonResponseEncoder().encode(data), '{"count":%d,"name":"name"}' % 2 ** 70)
+
+    def test_standard_library_without_orjson(self):
+        with unittest.mock.patch.dict(sys.modules, {"orjson": None}), unittest.mock.patch.dict(encoders, clear=True):
+            with self.assertRaises(ImproperlyConfigured):
+                OrjsonResponseEncoder()
+            self.assertIs(type(get_response_encoder()), ResponseEncoder)
+        with unittest.mock.patch.dict(encoders, clear=True):
+            self.assertIs(type(get_response_encoder()), OrjsonResponseEncoder)
+            with override_settings(DJANGO_RELAY_ENDPOINT={"RESPONSE_ENCODER": "django_relay_endpoint.encoding.ResponseEncoder"}):
+                self.assertIs(type(get_response_encoder()), ResponseEncoder)
+
+
+@unittest.skipUnless(apps.is_installed("bench"), "the tests use the models of the benchmarks app, see runtests.py")
+class ResponseCompressionTests(TestCase):
+    query = "{ author { edges { node { name } } } }"
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.view = staticmethod(GraphQLView.as_view(schema=SchemaConfigurator(NODE_TYPES).schema()))
+
+    @classmethod
+    def setUpTestData(cls):
+        from bench.models import Author
+        Author.objects.bulk_create([Author(name=f"author {i}") for i in range(20)])
+
+    def post(self, **headers):
+        request = RequestFactory().post("/", {"query": self.query}, content_type="application/json", **headers)
+        request.user = AnonymousUser()
+        request.session = SessionStore()
+        return self.view(request)
+
+    @override_settings(DJANGO_RELAY_ENDPOINT={"RESPONSE_COMPRESSION_MIN_SIZE": 200})
+    def test_gzips_if_the_client_accepts_it(self):
+        response = self.post(HTTP_ACCEPT_ENCODING="gzip, deflate")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", cc_delim_re.split(response["Vary"]))
+        self.assertEqual(int(response["Content-Length"]), len(response.content))
+        content = json.loads(gzip.decompress(response.content))
+        self.assertEqual(len(content["data"]["author"]["edges"]), 20)
+
+    @override_settings(DJANGO_RELAY_ENDPOINT={"RESPONSE_COMPRESSION_MIN_SIZE": 200})
+    def test_does_not_gzip_unless_accepted(self):
+        for headers in [{}, {"HTTP_ACCEPT_ENCODING": "identity"}, {"HTTP_ACCEPT_ENCODING": "br"}]:
+            with self.subTest(headers=headers):
+                response = self.post(**headers)
+                self.assertFalse(response.has_header("Content-Encoding"))
+                # caches must not serve the uncompressed response to clients accepting gzip
+                self.assertIn("Accept-Encoding", cc_delim_re.split(response["Vary"]))
+                self.assertEqual(len(json.loads(response.content)["data"]["author"]["edges"]), 20)
+
+    def test_minimum_size(self):
+        with override_settings(DJANGO_RELAY_ENDPOINT={"RESPONSE_COMPRESSION_MIN_SIZE": 100_000}):
+            response = self.post(HTTP_ACCEPT_ENCODING="gzip")
+            self.assertFalse(response.has_header("Content-Encoding"))
+            self.assertNotIn("Accept-Encoding", cc_delim_re.split(response["Vary"]))
+        # disabled by default
+        response = self.post(HTTP_ACCEPT_ENCODING="gzip")
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+
+class ValuesAuthorType(NodeType):
+    class Meta:
+        model = "bench.Author"
+        object_type_name = "BenchValuesAuthor"
+        fields = ["id", "name", "age", "profile", "publisher"]
+        annotations = {"book_count": Count("books")}
+        values_fast_path = True
+
+
+@unittest.skipUnless(apps.is_installed("bench"), "the tests use the models of the benchmarks app, see runtests.py")
+class ValuesFastPathTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.schema = SchemaConfigurator([PublisherType, ValuesAuthorType]).schema()
+
+    @classmethod
+    def setUpTestData(cls):
+        from bench.models import Author, Publisher
+        publisher = Publisher.objects.create(name="p", country="NL")
+        cls.authors = [
+            Author.objects.create(name=f"a{i}", age=i, profile={"city": f"c{i}"}, publisher=publisher)
+            for i in range(3)
+        ]
+
+    def execute(self, nodes):
+        with CaptureQueriesContext(connection) as queries:
+            result = self.schema.execute("{ author { edges { node { %s } } } }" % nodes, context_value=get_request())
+        self.assertIsNone(result.errors)
+        # the count, then the page
+        return [edge["node"] for edge in result.data["author"]["edges"]], queries[1]["sql"]
+
+    def test_scalar_selections_take_the_fast_path(self):
+        with unittest.mock.patch.object(graphene.relay.Node, "to_global_id") as to_global_id_method:
+            nodes, sql = self.execute("id name __typename")
+        # the global ids are encoded by the iterable
+        to_global_id_method.assert_not_called()
+        self.assertEqual(sql.split(" FROM ")[0], 'SELECT "bench_author"."id" AS "pk", "bench_author"."name" AS "name"')
+        self.assertEqual(nodes, [
+            {"id": to_global_id("BenchValuesAuthor", author.pk), "name": author.name, "__typename": "BenchValuesAuthor"}
+            for author in self.authors
+        ])
+        # the JSON fields resolve their path from the fetched value
+        nodes, sql = self.execute('age city: profile(path: "city")')
+        self.assertNotIn('"bench_author"."publisher_id"', sql)
+        self.assertEqual(nodes, [{"age": author.age, "city": json.dumps(author.profile["city"])} for author in self.authors])
+
+    def test_other_selections_fall_back(self):
+        for nodes in ["name publisher { name }", "name bookCount", "name @include(if: true)", "...on BenchValuesAuthor @skip(if: false) { name }"]:
+            with self.subTest(nodes=nodes):
+                result, sql = self.execute(nodes)
+                self.assertIn('"bench_author"."publisher_id"', sql)
+                self.assertEqual([node["name"] for node in result], ["a0", "a1", "a2"])
+
+    def test_fast_path_returns_the_output_of_the_models(self):
+        fields = 'id name age profile city: profile(path: "city") __typename'
+        fast, fast_sql = self.execute(fields)
+        with unittest.mock.patch.object(graphene.relay.Node, "to_global_id", wraps=graphene.relay.Node.to_global_id) as to_global_id_method:
+            slow, slow_sql = self.execute(fields.replace("age", "age @include(if: true)"))
+        self.assertEqual(to_global_id_method.call_count, 3)
+        self.assertNotEqual(fast_sql, slow_sql)
+        self.assertEqual(fast, slow)
+        # the global ids encoded in bulk resolve the nodes
+        result = self.schema.execute('{ node(id: "%s") { ... on BenchValuesAuthor { name } } }' % fast[1]["id"], context_value=get_request())
+        self.assertEqual(result.data, {"node": {"name": "a1"}})
+
+
+class AnnotatedAuthorType(NodeType):
+    class Meta:
+        model = "bench.Author"
+        object_type_name = "BenchAnnotatedAuthor"
+        fields = ["id", "name", "age"]
+        filter_fields = {"name": ["exact"], "book_count": ["exact", "gte"]}
+        annotations = {"book_count": Count("books")}
+
+
+@unittest.skipUnless(apps.is_installed("bench"), "the tests use the models of the benchmarks app, see runtests.py")
+class AnnotationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.schema = SchemaConfigurator([AnnotatedAuthorType]).schema()
+
+    @classmethod
+    def setUpTestData(cls):
+        from bench.models import Author, Book
+        cls.authors = [Author.objects.create(name=f"a{i}", age=30) for i in range(3)]
+        for i, author in enumerate(cls.authors):
+            Book.objects.bulk_create([Book(title=f"b{i}{j}", author=author) for j in range(2 - i)])
+
+    def execute(self, document, **variables):
+        with CaptureQueriesContext(connection) as queries:
+            result = self.schema.execute(document, variable_values=variables, context_value=get_request())
+        self.assertIsNone(result.errors)
+        return result.data, [query["sql"] for query in queries]
+
+    def test_annotates_only_when_selected(self):
+        data, queries = self.execute("{ author { edges { node { name } } } }")
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn('COUNT("bench_book"', "".join(queries))
+        data, queries = self.execute("{ author { edges { node { name bookCount } } } }")
+        # the count of the connection, then the page with the annotation
+        self.assertEqual(len(queries), 2)
+        self.assertIn('COUNT("bench_book"."id") AS "book_count"', queries[1])
+        self.assertEqual([edge["node"] for edge in data["author"]["edges"]], [
+            {"name": "a0", "bookCount": 2}, {"name": "a1", "bookCount": 1}, {"name": "a2", "bookCount": 0},
+        ])
+
+    def test_filters_by_an_annotation(self):
+        data, queries = self.execute("{ author(bookCount_Gte: 1) { edges { node { name } } } }")
+        self.assertEqual([edge["node"]["name"] for edge in data["author"]["edges"]], ["a0", "a1"])
+        data, queries = self.execute("{ author(bookCount: 0) { edges { node { name bookCount } } } }")
+        self.assertEqual([edge["node"] for edge in data["author"]["edges"]], [{"name": "a2", "bookCount": 0}])
+        self.assertEqual(len(queries), 2)
+
+    def test_orders_by_an_annotation(self):
+        # the generated OrderingFilter annotates the queryset, whether the annotation is selected or not
+        data, queries = self.execute('{ author(orderBy: "bookCount") { edges { node { name } } } }')
+        self.assertEqual([edge["node"]["name"] for edge in data["author"]["edges"]], ["a2", "a1", "a0"])
+        self.assertIn('AS "book_count"', queries[1])
+        data, queries = self.execute('{ author(orderBy: "-bookCount", bookCount_Gte: 1) { edges { node { name bookCount } } } }')
+        self.assertEqual([edge["node"] for edge in data["author"]["edges"]], [{"name": "a0", "bookCount": 2}, {"name": "a1", "bookCount": 1}])
+
+    def test_mutation_payloads_fetch_the_annotation_with_one_query(self):
+        global_id = to_global_id("BenchAnnotatedAuthor", self.authors[1].pk)
+        data, queries = self.execute(
+            'mutation ($id: ID!) { updateAuthor(input: {data: {id: $id, name: "renamed", age: 31}}) { author { name bookCount } } }',
+            id=global_id,
+        )
+        self.assertEqual(data["updateAuthor"]["author"], {"name": "renamed", "bookCount": 1})
+        self.assertEqual(sum('AS "book_count"' in sql for sql in queries), 1)
+        data, queries = self.execute('mutation { createAuthor(input: {data: {name: "new", age: 1}}) { author { bookCount } } }')
+        self.assertEqual(data["createAuthor"]["author"], {"bookCount": 0})
+        self.assertEqual(sum('AS "book_count"' in sql for sql in queries), 1)
+
+
+class AggregateBookType(NodeType):
+    def get_queryset(cls, queryset, info):
+        # e.g. a permission narrowing the records
+        return queryset.exclude(title__startswith="draft")
+
+    class Meta:
+        model = "bench.Book"
+        object_type_name = "BenchAggregateBook"
+        fields = ["id", "title", "price", "author"]
+        filter_fields = {"title": ["icontains"]}
+        aggregate_fields = ["price"]
+        aggregate_group_by = ["author"]
+        max_page_size = 2
+
+
+@unittest.skipUnless(apps.is_installed("bench"), "the tests use the models of the benchmarks app, see runtests.py")
+class AggregateTests(TestCase):
+    totals = "count sum { price } avg { price } min { price } max { price }"
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.schema = SchemaConfigurator([AuthorType, AggregateBookType]).schema()
+
+    @classmethod
+    def setUpTestData(cls):
+        from bench.models import Author, Book
+        cls.authors = [Author.objects.create(name=f"a{i}") for i in range(3)]
+        prices = [["1.50", "2.25", "10.00"], ["4.10"], ["7.35", "0.99"]]
+        for author, author_prices in zip(cls.authors, prices):
+            for i, price in enumerate(author_prices):
+                Book.objects.create(title=f"book {i}", price=decimal.Decimal(price), author=author)
+        Book.objects.create(title="draft", price=decimal.Decimal("100"), author=cls.authors[0])
+
+    def execute(self, arguments=""):
+        document = "{ bookAggregate%s { %s groups { key { author } %s } } }" % (arguments, self.totals, self.totals)
+        with CaptureQueriesContext(connection) as queries:
+            result = self.schema.execute(document, context_value=get_request())
+        self.assertIsNone(result.errors)
+        return result.data["bookAggregate"], queries
+
+    def assertAggregates(self, actual, books):
+        # SQLite computes the decimals as floats, they are compared to the cent
+        cents = decimal.Decimal("0.01")
+        prices = [book.price for book in books]
+        self.assertEqual(actual["count"], len(prices))
+        expected = {"sum": sum(prices), "avg": sum(prices) / len(prices), "min": min(prices), "max": max(prices)}
+        for function, value in expected.items():
+            self.assertEqual(decimal.Decimal(actual[function]["price"]).quantize(cents), value.quantize(cents), function)
+
+    def test_totals_match_python(self):
+        from bench.models import Book
+        data, queries = self.execute()
+        self.assertAggregates(data, Book.objects.exclude(title="draft"))
+        self.assertIsNone(data["groups"])
+        self.assertEqual(len(queries), 1)
+
+    def test_groups_by_foreign_key_global_ids(self):
+        from bench.models import Book
+        data, queries = self.execute("(groupBy: [AUTHOR])")
+        # the totals, then the groups
+        self.assertEqual(len(queries), 2)
+        # the groups are capped at max_page_size
+        self.assertEqual(len(data["groups"]), 2)
+        for group, author in zip(data["groups"], self.authors):
+            self.assertEqual(group["key"], {"author": to_global_id("BenchAuthor", author.pk)})
+            self.assertAggregates(group, Book.objects.filter(author=author).exclude(title="draft"))
+        result = self.schema.execute('{ node(id: "%s") { ... on BenchAuthor { name } } }' % data["groups"][1]["key"]["author"], context_value=get_request())
+        self.assertEqual(result.data, {"node": {"name": "a1"}})
+
+    def test_filters_narrow_the_aggregates(self):
+        from bench.models import Book
+        data, queries = self.execute('(title_Icontains: "0", groupBy: [AUTHOR])')
+        self.assertAggregates(data, Book.objects.filter(title="book 0"))
+        self.assertEqual([group["count"] for group in data["groups"]], [1, 1])
+
+    def test_get_queryset_narrows_the_aggregates(self):
+        from bench.models import Book
+        data, queries = self.execute('(title_Icontains: "draft")')
+        self.assertEqual(data["count"], 0)
+        self.assertIsNone(data["sum"]["price"])
+        Book.objects.filter(title="draft").update(title="published draft")
+        data, queries = self.execute('(title_Icontains: "draft")')
+        self.assertAggregates(data, Book.objects.filter(title="published draft"))
+
+
+class SyncAuthorType(NodeType):
+    class Meta:
+        model = "bench.Author"
+        object_type_name = "BenchSyncAuthor"
+        fields = ["id", "name", "age"]
+        # a sequence field for the tests, the bench models have no timestamp
+        sync = "age"
+
+
+@unittest.skipUnless(apps.is_installed("bench"), "the tests use the models of the benchmarks app, see runtests.py")
+class DeltaSyncTests(TestCase):
+    document = """
+        query ($first: Int, $watermark: String) {
+            author(first: $first, updatedSince: $watermark) { watermark deletedIds edges { node { name } } }
+        }
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        with cls.assertWarns(SimpleTestCase(), SyncIndexWarning):
+            cls.schema = SchemaConfigurator([SyncAuthorType]).schema()
+
+    @classmethod
+    def setUpTestData(cls):
+        from bench.models import Author
+        cls.authors = [Author.objects.create(name=f"a{i}", age=age) for i, age in enumerate([1, 2, 2, 2, 2, 3])]
+
+    def sync(self, watermark=None, first=2):
+        result = self.schema.execute(self.document, variable_values={"first": first, "watermark": watermark}, context_value=get_request())
+        if result.errors:
+            return result.errors
+        connection = result.data["author"]
+        return [edge["node"]["name"] for edge in connection["edges"]], connection["deletedIds"], connection["watermark"]
+
+    def decode(self, watermark):
+        from bench.models import Author
+        return decode_watermark(Author, "age", watermark)
+
+    def test_pages_split_runs_of_equal_values(self):
+        names, watermarks, watermark = [], [], None
+        while True:
+            page, deleted, watermark = self.sync(watermark)
+            self.assertEqual(deleted, [])
+            if not page:
+                break
+            names += page
+            watermarks.append(self.decode(watermark))
+        self.assertEqual(names, ["a0", "a1", "a2", "a3", "a4", "a5"])
+        # the second page ends inside the run of age 2
+        self.assertEqual([(mark.value, mark.pk) for mark in watermarks], [(2, self.authors[1].pk), (2, self.authors[3].pk), (3, self.authors[5].pk)])
+        # a change moves the record after the watermark
+        from bench.models import Author
+        Author.objects.filter(pk=self.authors[0].pk).update(age=4)
+        self.assertEqual(self.sync(watermark)[0], ["a0"])
+        # the records of the same age as the last one of the page follow it
+        self.assertEqual(self.sync(encode_watermark(watermarks[0]), first=10)[0], ["a2", "a3", "a4", "a5", "a0"])
+
+    def test_deletions_are_returned_once(self):
+        _, deleted, watermark = self.sync(first=10)
+        self.assertEqual(deleted, [])
+        deleted_ids = [to_global_id("BenchSyncAuthor", author.pk) for author in self.authors[:3]]
+        for author in self.authors[:3]:
+            author.delete()
+        self.assertEqual(Tombstone.objects.filter(model_label="bench.author").count(), 3)
+        # at most a page of deleted ids
+        page, deleted, watermark = self.sync(watermark)
+        self.assertEqual((page, deleted), ([], deleted_ids[:2]))
+        page, deleted, watermark = self.sync(watermark)
+        self.assertEqual((page, deleted), ([], deleted_ids[2:]))
+        page, deleted, watermark = self.sync(watermark)
+        self.assertEqual((page, deleted), ([], []))
+        # a first sync starts after the existing tombstones
+        self.assertEqual(self.sync(first=10)[1], [])
+
+    def test_invalid_watermarks_are_rejected(self):
+        for watermark in ["garbage", base64("[1, 2]"), base64('["x", 1, 0, null]')]:
+            with self.subTest(watermark=watermark):
+                [error] = self.sync(watermark)
+                self.assertIn("Invalid watermark", error.message)
+
+    def test_watermarks_expire(self):
+        _, _, watermark = self.sync()
+        fresh = self.decode(watermark)
+        self.assertAlmostEqual(fresh.time, time.time(), delta=5)
+        expired = encode_watermark(fresh._replace(time=time.time() - 120))
+        # the watermarks returned before the time was added
+        legacy = base64(json.dumps([fresh.value, fresh.pk, fresh.tombstone]))
+        self.assertEqual(len(self.sync(expired)[0]), 2)
+        self.assertEqual(len(self.sync(legacy)[0]), 2)
+        with override_settings(DJANGO_RELAY_ENDPOINT={"SYNC_WATERMARK_MAX_AGE": 60}):
+            self.assertEqual(len(self.sync(watermark)[0]), 2)
+            for watermark in [expired, legacy]:
+                [error] = self.sync(watermark)
+                self.assertIn("Expired watermark", error.message)
+
+    def test_watermark_time_follows_the_received_tombstones(self):
+        _, _, watermark = self.sync()
+        for author in self.authors[:3]:
+            author.delete()
+        Tombstone.objects.update(deleted_at=timezone.now() - datetime.timedelta(seconds=30))
+        # the client has not received the third tombstone, its watermark keeps its time
+        _, deleted, watermark = self.sync(watermark)
+        self.assertEqual(len(deleted), 2)
+        self.assertAlmostEqual(self.decode(watermark).time, time.time() - 30, delta=5)
+        _, deleted, watermark = self.sync(watermark)
+        self.assertEqual(len(deleted), 1)
+        self.assertAlmostEqual(self.decode(watermark).time, time.time(), delta=5)
+
+    def test_encodes_and_decodes_timestamps(self):
+        moment = timezone.now()
+        watermark = Watermark(moment, 5, 3, 1700000000.5)
+        self.assertEqual(decode_watermark(Tombstone, "deleted_at", encode_watermark(watermark)), watermark)
+        self.assertEqual(decode_watermark(Tombstone, "deleted_at", encode_watermark(Watermark(None, None, 0))), Watermark(None, None, 0))
+
+    def test_prune_tombstones(self):
+        pks = [str(author.pk) for author in self.authors[:3]]
+        for author in self.authors[:3]:
+            author.delete()
+        Tombstone.objects.filter(object_id=pks[0]).update(deleted_at=timezone.now() - datetime.timedelta(days=2))
+        with self.assertRaises(CommandError):
+            call_command("dre-prune-tombstones", stdout=io.StringIO())
+        with override_settings(DJANGO_RELAY_ENDPOINT={"SYNC_WATERMARK_MAX_AGE": 24 * 3600}):
+            with self.assertRaises(CommandError):
+                call_command("dre-prune-tombstones", "--max-age", "60", stdout=io.StringIO())
+            stdout = io.StringIO()
+            call_command("dre-prune-tombstones", stdout=stdout)
+        self.assertEqual(stdout.getvalue().strip(), "Deleted 1 tombstones")
+        self.assertEqual(sorted(Tombstone.objects.values_list("object_id", flat=True)), pks[1:])
+        self.assertEqual(prune_tombstones(max_age=0), 2)
@@ -0,0 +1,238 @@
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from inspect import isawaitable
+from threading import Lock
+from time import perf_counter
+from typing import Any, ContextManager, Dict, List, Optional
+import graphene
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.backends.signals import connection_created
+from django.utils.module_loading import import_string
+from graphql import get_named_type
+from django_relay_endpoint.cost import get_connection_node_type
+from django_relay_endpoint.settings import dre_settings
+
+
+class NullSpan:
+    """
+    The span of the no-op tracer.
+    """
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+
+NULL_SPAN_CONTEXT = nullcontext(NullSpan())
+
+
+class Tracer:
+    """
+    The tracing interface of the package and its no-op default.
+    Subclasses implement `start_span`, which returns a context manager around the traced code yielding a span with `set_attribute`.
+    The span of the current context is the parent of the started span.
+    """
+
+    enabled: bool = False
+
+    def start_span(self, name: str, attributes: Dict[str, Any] = None) -> ContextManager:
+        return NULL_SPAN_CONTEXT
+
+
+current_span: ContextVar[Optional["Span"]] = ContextVar("django_relay_endpoint_span", default=None)
+
+
+class Span:
+    """
+    A finished or active span of InMemoryTracer, times are in seconds of `time.perf_counter`.
+    """
+
+    def __init__(self, name: str, attributes: Dict[str, Any] = None, parent: "Span" = None) -> None:
+        self.name = name
+        self.attributes = dict(attributes or {})
+        self.parent = parent
+        self.status = "ok"
+        self.start = perf_counter()
+        self.end = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    @property
+    def duration(self) -> float:
+        return (self.end or perf_counter()) - self.start
+
+    def __repr__(self) -> str:
+        return f"<Span {self.name} {self.attributes}>"
+
+
+class InMemoryTracer(Tracer):
+    """
+    A tracer that keeps the finished spans in memory, intended for tests, e.g.
+
+        tracer = InMemoryTracer()
+        set_tracer(tracer)
+        client.post("/graphql", ...)
+        assert tracer.find("ShopBook.get_queryset")
+    """
+
+    enabled = True
+
+    def __init__(self) -> None:
+        self.spans: List[Span] = []
+        self.lock = Lock()
+
+    @contextmanager
+    def start_span(self, name: str, attributes: Dict[str, Any] = None):
+        span = Span(name, attributes, current_span.get())
+        token = current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "error"
+            span.set_attribute("exception", repr(e))
+            raise
+        finally:
+            span.end = perf_counter()
+            current_span.reset(token)
+            with self.lock:
+                self.spans.append(span)
+
+    def find(self, name: str) -> List[Span]:
+        return [span for span in self.spans if span.name == name]
+
+    def clear(self) -> None:
+        with self.lock:
+            self.spans.clear()
+
+
+class OpenTelemetryTracer(Tracer):
+    """
+    A tracer that starts OpenTelemetry spans, which requires the `opentelemetry-api` package and a configured TracerProvider.
+
+    Args:
+        tracer (opentelemetry.trace.Tracer, optional): the OpenTelemetry tracer. Defaults to the tracer named 'django_relay_endpoint'.
+    """
+
+    enabled = True
+
+    def __init__(self, tracer: Any = None) -> None:
+        try:
+            from opentelemetry import trace
+        except ImportError:
+            raise ImproperlyConfigured("OpenTelemetryTracer requires the 'opentelemetry-api' package.")
+        self.tracer = tracer or trace.get_tracer("django_relay_endpoint")
+
+    def start_span(self, name: str, attributes: Dict[str, Any] = None) -> ContextManager:
+        return self.tracer.start_as_current_span(name, attributes=attributes)
+
+
+tracer_lock = Lock()
+configured_tracer: Optional[Tracer] = None
+
+
+def get_tracer() -> Tracer:
+    """
+    Returns the tracer set by `set_tracer`, or instantiates the class at the dotted path of the TRACER setting, or the no-op Tracer.
+    """
+    global configured_tracer
+    if configured_tracer is None:
+        with tracer_lock:
+            if configured_tracer is None:
+                path = dre_settings.TRACER
+                configured_tracer = import_string(path)() if path else Tracer()
+    return configured_tracer
+
+
+def set_tracer(tracer: Optional[Tracer]) -> None:
+    """
+    Sets the tracer of the package, None restores the tracer of the TRACER setting.
+    Enabled tracers trace the SQL of the connections of the current thread and of the connections opened later.
+    Otherwise the execute wrappers are removed from the connections of the current thread, the ones left in other threads do nothing.
+    """
+    global configured_tracer
+    configured_tracer = tracer
+    if get_tracer().enabled:
+        for connection in connections.all(initialized_only=True):
+            trace_connection(connection)
+        connection_created.connect(trace_connection, dispatch_uid="django_relay_endpoint_tracing")
+    else:
+        connection_created.disconnect(dispatch_uid="django_relay_endpoint_tracing")
+        for connection in connections.all(initialized_only=True):
+            untrace_connection(connection)
+
+
+def start_span(name: str, attributes: Dict[str, Any] = None) -> ContextManager:
+    """
+    Starts a span with the tracer of the package.
+    """
+    return get_tracer().start_span(name, attributes)
+
+
+def traced_execute(execute, sql, params, many, context):
+    """
+    A database execute wrapper that traces every SQL statement.
+    """
+    tracer = get_tracer()
+    if not tracer.enabled:
+        return execute(sql, params, many, context)
+    connection = context["connection"]
+    with tracer.start_span("sql", {"db.system": connection.vendor, "db.alias": connection.alias, "db.statement": sql}):
+        return execute(sql, params, many, context)
+
+
+def trace_connection(connection: BaseDatabaseWrapper, **kwargs) -> None:
+    """
+    Installs `traced_execute` on the connection, once. Serves as a `connection_created` receiver as well.
+    """
+    if traced_execute not in connection.execute_wrappers:
+        connection.execute_wrappers.append(traced_execute)
+
+
+def untrace_connection(connection: BaseDatabaseWrapper) -> None:
+    """
+    Removes `traced_execute` from the connection.
+    """
+    if traced_execute in connection.execute_wrappers:
+        connection.execute_wrappers.remove(traced_execute)
+
+
+class TracingMiddleware:
+    """
+    A graphene middleware that traces the resolution of connections and objects of django object types, e.g. `node`,
+    with the NodeType, the path and the global id as attributes. Scalars are not traced.
+
+    Args:
+        tracer (Tracer): the tracer
+        asynchronous (bool, optional): whether the resolvers are awaited, i.e. the middleware of AsyncGraphQLView. Defaults to False.
+    """
+
+    def __init__(self, tracer: Tracer, asynchronous: bool = False) -> None:
+        self.tracer = tracer
+        self.asynchronous = asynchronous
+
+    def resolve(self, next, root, info: graphene.ResolveInfo, **args):
+        node_type = get_connection_node_type(info.return_type) or getattr(get_named_type(info.return_type), "graphene_type", None)
+        if not hasattr(getattr(node_type, "_meta", None), "model") and not (info.field_name == "node" and "id" in args):
+            return next(root, info, **args)
+
+        name = f"resolve {info.parent_type.name}.{info.field_name}"
+        attributes = {
+            "graphql.field.path": ".".join(str(key) for key in info.path.as_list()),
+            "node_type": getattr(getattr(node_type, "_meta", None), "name", ""),
+        }
+        if "id" in args:
+            attributes["global_id"] = str(args["id"])
+        if self.asynchronous:
+            # the span must be opened in the context that awaits the resolver
+            return self.resolve_async(next, root, info, name, attributes, **args)
+        with self.tracer.start_span(name, attributes):
+            return next(root, info, **args)
+
+    async def resolve_async(self, next, root, info: graphene.ResolveInfo, name: str, attributes: Dict[str, Any], **args):
+        with self.tracer.start_span(name, attributes):
+            result = next(root, info, **args)
+            if isawaitable(result):
+                result = await result
+            return result
@@ -0,0 +1,129 @@
+import hashlib
+import os
+from io import BytesIO
+from typing import Iterable, Optional
+from django.conf import settings
+from django.core.files.base import File
+from django.core.files.uploadedfile import InMemoryUploadedFile, TemporaryUploadedFile, UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+
+
+class UploadTooLarge(Exception):
+    """
+    Raised by SpooledUploadHandler while the request is parsed, when an upload exceeds a limit.
+    """
+
+
+def check_upload_sizes(files: Iterable[UploadedFile], max_file_size: int = None, max_request_size: int = None) -> None:
+    """
+    Checks the limits of SpooledUploadHandler on files that were already parsed by other handlers,
+    e.g. by the default handlers when the CSRF middleware read the body before the view.
+
+    Raises:
+        UploadTooLarge: if a file exceeds `max_file_size` bytes or the files exceed `max_request_size` bytes
+    """
+    received = 0
+    for upload in files:
+        if max_file_size is not None and upload.size > max_file_size:
+            raise UploadTooLarge(f"'{upload.name}' exceeds the maximum file size of {max_file_size} bytes")
+        received += upload.size
+        if max_request_size is not None and received > max_request_size:
+            raise UploadTooLarge(f"The uploaded files exceed the maximum upload size of {max_request_size} bytes")
+
+
+class SpooledUploadHandler(FileUploadHandler):
+    """
+    An upload handler that keeps a file in memory up to `memory_threshold` bytes and spools it to a temporary file beyond,
+    which storages that support `temporary_file_path`, e.g. FileSystemStorage, move instead of copying.
+    It computes the sha256 `content_hash` of every file chunk by chunk, and stops the parsing of the request as soon as
+    a file exceeds `max_file_size` bytes or the files of the request exceed `max_request_size` bytes.
+
+    Args:
+        request (HttpRequest, optional): the request. Defaults to None.
+        memory_threshold (int, optional): the size up to which a file is kept in memory. Defaults to FILE_UPLOAD_MAX_MEMORY_SIZE.
+        max_file_size (int, optional): the maximum size of a file. Defaults to None, i.e. no limit.
+        max_request_size (int, optional): the maximum size of the files of a request. Defaults to None, i.e. no limit.
+    """
+
+    def __init__(self, request=None, memory_threshold: int = None, max_file_size: int = None, max_request_size: int = None) -> None:
+        super().__init__(request)
+        self.memory_threshold = settings.FILE_UPLOAD_MAX_MEMORY_SIZE if memory_threshold is None else memory_threshold
+        self.max_file_size = max_file_size
+        self.max_request_size = max_request_size
+        self.received = 0
+        self.file: Optional[File] = None
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None) -> None:
+        # reject the request before parsing it if its announced length exceeds the limit
+        if self.max_request_size is not None and content_length and content_length > self.max_request_size:
+            raise UploadTooLarge(f"The request exceeds the maximum upload size of {self.max_request_size} bytes")
+
+    def new_file(self, *args, **kwargs) -> None:
+        super().new_file(*args, **kwargs)
+        self.file = BytesIO()
+        self.size = 0
+        self.hash = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data: bytes, start: int) -> None:
+        self.size += len(raw_data)
+        self.received += len(raw_data)
+        if self.max_file_size is not None and self.size > self.max_file_size:
+            self.upload_interrupted()
+            raise UploadTooLarge(f"'{self.file_name}' exceeds the maximum file size of {self.max_file_size} bytes")
+        if self.max_request_size is not None and self.received > self.max_request_size:
+            self.upload_interrupted()
+            raise UploadTooLarge(f"The uploaded files exceed the maximum upload size of {self.max_request_size} bytes")
+        self.hash.update(raw_data)
+        if isinstance(self.file, BytesIO) and self.size > self.memory_threshold:
+            # spool the chunks received so far to a temporary file
+            spooled = TemporaryUploadedFile(self.file_name, self.content_type, 0, self.charset, self.content_type_extra)
+            spooled.write(self.file.getvalue())
+            self.file = spooled
+        self.file.write(raw_data)
+
+    def file_complete(self, file_size: int) -> UploadedFile:
+        self.file.seek(0)
+        if isinstance(self.file, BytesIO):
+            upload = InMemoryUploadedFile(
+                self.file, self.field_name, self.file_name, self.content_type, file_size, self.charset, self.content_type_extra
+            )
+        else:
+            upload = self.file
+            upload.size = file_size
+        upload.content_hash = self.hash.hexdigest()
+        self.file = None
+        return upload
+
+    def upload_interrupted(self) -> None:
+        if isinstance(self.file, TemporaryUploadedFile):
+            temp_location = self.file.temporary_file_path()
+            try:
+                self.file.close()
+                os.remove(temp_location)
+            except FileNotFoundError:
+                pass
+        self.file = None
+
+
+class DeduplicatingStorageMixin:
+    """
+    A storage mixin that names the files uploaded through SpooledUploadHandler after their content hash, in the directory
+    generated by `upload_to`, and does not write a file whose content is already stored, e.g.
+
+        class DeduplicatingFileSystemStorage(DeduplicatingStorageMixin, FileSystemStorage):
+            pass
+
+        cover = models.FileField(upload_to="covers", storage=DeduplicatingFileSystemStorage())
+
+    Files without a `content_hash` are saved as usual.
+    """
+
+    def save(self, name: str, content: File, max_length: int = None) -> str:
+        content_hash = getattr(content, "content_hash", None)
+        if content_hash is None or name is None:
+            return super().save(name, content, max_length=max_length)
+        directory, file_name = os.path.split(name)
+        name = os.path.join(directory, content_hash + os.path.splitext(file_name)[1].lower())
+        if self.exists(name):
+            return name
+        return super().save(name, content, max_length=max_length)
@@ -0,0 +1,579 @@
+from contextlib import contextmanager
+from inspect import isawaitable
+from time import perf_counter
+from typing import Tuple, Union
+from django.db import connection, connections, transaction
+from django.http import Http404, HttpResponse, HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse
+from django.views import View
+from django.http.response import HttpResponseBadRequest
+from django.middleware.gzip import re_accepts_gzip
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+from graphql import GraphQLError, ExecutionResult, OperationType, DocumentNode, OperationDefinitionNode, execute, get_operation_ast, parse, validate_schema
+from graphql.validation import validate
+from graphene_django.constants import MUTATION_ERRORS_FLAG
+from graphene_django.settings import graphene_settings
+from graphene_django.utils.utils import set_rollback
+from graphene_django.views import HttpError
+from graphene_file_upload.django import FileUploadGraphQLView
+from django_relay_endpoint.compiler import JSONAggregationMiddleware
+from django_relay_endpoint.configurators.schema import SchemaConfigurator
+from django_relay_endpoint.cost import analyze_query_cost
+from django_relay_endpoint.encoding import get_response_encoder
+from django_relay_endpoint.export import EXPORT_FORMATS, RENDERERS, get_connection_field, get_export_columns, get_export_queryset, iterate_rows
+from django_relay_endpoint.instrumentation import Instrumentation, InstrumentationMiddleware, current_instrumentation, instrument_connection
+from django_relay_endpoint.metrics import MetricsMiddleware, metrics_enabled, observe_operation, registry
+from django_relay_endpoint.middleware import AsyncORMMiddleware, PageSizeMiddleware
+from django_relay_endpoint.nplusone import NPlusOneDetector, ResolverPathMiddleware, current_detector
+from django_relay_endpoint.profiling import OperationProfile
+from django_relay_endpoint.recording import REPLAY_HEADER, get_recorder
+from django_relay_endpoint.settings import dre_settings
+from django_relay_endpoint.tracing import TracingMiddleware, get_tracer
+from django_relay_endpoint.uploads import SpooledUploadHandler, UploadTooLarge, check_upload_sizes
+
+
+class GraphQLView(FileUploadGraphQLView):
+    """
+    The endpoint view of django_relay_endpoint, a FileUploadGraphQLView that supports file uploads.
+    It splits the request handling into `prepare_graphql_request`, which parses and validates the operation,
+    the execution, and `build_response`, so that the sync and async views share everything but the execution.
+    The estimated cost of every operation is checked against the MAX_QUERY_COST and MAX_QUERY_DEPTH settings before it is executed.
+    Operations are instrumented per the INSTRUMENTATION setting, see `get_instrumentation`,
+    and checked for N+1 queries per the NPLUSONE_DETECTION setting, see `detect_nplusone`.
+    Multipart uploads are parsed by the handlers of `get_upload_handlers`, which enforce the UPLOAD_* settings.
+    Responses are encoded by the encoder of the RESPONSE_ENCODER setting and gzipped from RESPONSE_COMPRESSION_MIN_SIZE bytes, see `compress`.
+    If the JSON_AGGREGATION setting is True, the root connections of query operations are compiled into single SQL statements,
+    see `django_relay_endpoint.compiler.JSONAggregationMiddleware`.
+    """
+
+    extensions_attribute = "_django_relay_endpoint_extensions"
+
+    def add_extension(self, request, key: str, value) -> None:
+        """
+        Adds an entry to the `extensions` of the response of the current operation.
+        """
+        extensions = getattr(request, self.extensions_attribute, None)
+        if extensions is None:
+            extensions = {}
+            setattr(request, self.extensions_attribute, extensions)
+        extensions[key] = value
+
+    def pop_extensions(self, request) -> dict:
+        """
+        Returns and clears the extensions added for the current operation, so that the operations of a batch do not share them.
+        """
+        extensions = getattr(request, self.extensions_attribute, None) or {}
+        setattr(request, self.extensions_attribute, None)
+        return extensions
+
+    def dispatch(self, request, *args, **kwargs):
+        return self.compress(request, super().dispatch(request, *args, **kwargs))
+
+    def json_encode(self, request, d, pretty=False) -> str:
+        return get_response_encoder().encode(d, pretty=bool(self.pretty or pretty or request.GET.get("pretty")))
+
+    def compress(self, request, response: HttpResponse) -> HttpResponse:
+        """
+        Gzips a JSON response of at least RESPONSE_COMPRESSION_MIN_SIZE bytes if the client accepts gzip, as GZipMiddleware does.
+        Responses already encoded, e.g. by GZipMiddleware, are left untouched.
+        """
+        minimum_size = dre_settings.RESPONSE_COMPRESSION_MIN_SIZE
+        if (
+            minimum_size is None
+            or response.streaming
+            or response.has_header("Content-Encoding")
+            or not response.get("Content-Type", "").startswith("application/json")
+            or len(response.content) < minimum_size
+        ):
+            return response
+        patch_vary_headers(response, ("Accept-Encoding",))
+        if not re_accepts_gzip.search(request.META.get("HTTP_ACCEPT_ENCODING", "")):
+            return response
+        compressed = compress_string(response.content)
+        if len(compressed) < len(response.content):
+            response.content = compressed
+            response["Content-Length"] = str(len(compressed))
+            response["Content-Encoding"] = "gzip"
+        return response
+
+    def get_upload_handlers(self, request) -> list:
+        """
+        Returns the upload handlers of a multipart request: a SpooledUploadHandler configured by the UPLOAD_MEMORY_THRESHOLD,
+        UPLOAD_MAX_FILE_SIZE and UPLOAD_MAX_REQUEST_SIZE settings.
+        """
+        return [SpooledUploadHandler(
+            request,
+            memory_threshold=dre_settings.UPLOAD_MEMORY_THRESHOLD,
+            max_file_size=dre_settings.UPLOAD_MAX_FILE_SIZE,
+            max_request_size=dre_settings.UPLOAD_MAX_REQUEST_SIZE,
+        )]
+
+    def parse_body(self, request):
+        try:
+            if self.get_content_type(request) == "multipart/form-data":
+                if hasattr(request, "_files"):
+                    # the body was parsed before the view, e.g. by the CSRF middleware, with the default handlers:
+                    # the files are in memory or on disk already, but the limits still reject the request
+                    check_upload_sizes(
+                        [upload for _, uploads in request.FILES.lists() for upload in uploads],
+                        max_file_size=dre_settings.UPLOAD_MAX_FILE_SIZE,
+                        max_request_size=dre_settings.UPLOAD_MAX_REQUEST_SIZE,
+                    )
+                else:
+                    # the handlers can only be replaced before the body is parsed, i.e. the view must be csrf_exempt
+                    request.upload_handlers = self.get_upload_handlers(request)
+            return super().parse_body(request)
+        except UploadTooLarge as e:
+            raise HttpError(HttpResponse(status=413), str(e))
+
+    def get_middleware(self, request):
+        middleware = list(super().get_middleware(request) or [])
+        if current_detector.get() is not None:
+            middleware.append(ResolverPathMiddleware())
+        if metrics_enabled():
+            middleware.append(MetricsMiddleware())
+        tracer = get_tracer()
+        if tracer.enabled:
+            middleware.append(TracingMiddleware(tracer, asynchronous=self.view_is_async))
+        if dre_settings.JSON_AGGREGATION and not self.view_is_async:
+            # within PageSizeMiddleware, which sets the default page size of the root connections
+            middleware.append(JSONAggregationMiddleware())
+        middleware.append(PageSizeMiddleware())
+        instrumentation = current_instrumentation.get()
+        if instrumentation is not None:
+            middleware.append(InstrumentationMiddleware(instrumentation))
+        return middleware
+
+    def can_instrument(self, request) -> bool:
+        """
+        Whether the request may be instrumented by the INSTRUMENTATION_HEADER, which exposes the SQL and the resolver timings.
+        Only staff users may, override to allow other users.
+        """
+        user = getattr(request, "user", None)
+        return bool(user and user.is_staff)
+
+    def get_instrumentation(self, request) -> Union[Instrumentation, None]:
+        """
+        Returns a collector if the operation is instrumented, i.e. if the INSTRUMENTATION setting is True,
+        or if it is "header", the request carries the INSTRUMENTATION_HEADER and `can_instrument` allows it. Returns None otherwise.
+        """
+        instrumentation = dre_settings.INSTRUMENTATION
+        if instrumentation is True or (
+            instrumentation == "header" and request.headers.get(dre_settings.INSTRUMENTATION_HEADER) and self.can_instrument(request)
+        ):
+            return Instrumentation()
+        return None
+
+    @contextmanager
+    def instrument(self, request):
+        """
+        Instruments the operation executed within the context, if `get_instrumentation` returns a collector,
+        and adds the collected data to the `instrumentation` extension.
+        """
+        instrumentation = self.get_instrumentation(request)
+        if instrumentation is None:
+            yield
+            return
+
+        # the connections opened later are instrumented by the connection_created receiver
+        for db_connection in connections.all(initialized_only=True):
+            instrument_connection(db_connection)
+        token = current_instrumentation.set(instrumentation)
+        try:
+            yield
+        finally:
+            current_instrumentation.reset(token)
+            self.add_extension(request, "instrumentation", instrumentation.as_extension())
+
+    @contextmanager
+    def detect_nplusone(self, request):
+        """
+        Detects the N+1 queries of the operation executed within the context, if the NPLUSONE_DETECTION setting is
+        "warn" or "raise". The detector hooks into the connections of the current thread, so it is not applied by AsyncGraphQLView.
+        """
+        mode = dre_settings.NPLUSONE_DETECTION
+        if not mode:
+            yield
+            return
+        with NPlusOneDetector(mode=mode):
+            yield
+
+    def get_profile(self, request, operation_name: Union[str, None]) -> Union[OperationProfile, None]:
+        """
+        Returns a profile if the PROFILING setting is True, the user is staff and the PROFILING_HEADER of the request
+        is "sampling" or "deterministic". Returns None otherwise.
+        """
+        if not dre_settings.PROFILING:
+            return None
+        mode = request.headers.get(dre_settings.PROFILING_HEADER)
+        user = getattr(request, "user", None)
+        if mode not in ("sampling", "deterministic") or not (user and user.is_staff):
+            return None
+        return OperationProfile(mode, operation_name)
+
+    @contextmanager
+    def profile(self, request, operation_name: Union[str, None]):
+        """
+        Profiles the operation executed within the context, if `get_profile` returns a profile,
+        and adds its summary to the `profile` extension.
+        """
+        operation_profile = self.get_profile(request, operation_name)
+        if operation_profile is None:
+            yield
+            return
+        with operation_profile:
+            yield
+        self.add_extension(request, "profile", operation_profile.as_extension())
+
+    def record(self, request, query: Union[str, None], variables: Union[dict, None], operation_name: Union[str, None]) -> None:
+        """
+        Records a sample of the operations to the RECORDING_FILE setting, if it is set, for the 'dre-load-test' command.
+        The operations replayed by the command are not recorded.
+        """
+        recorder = get_recorder()
+        if recorder is not None and REPLAY_HEADER not in request.headers:
+            recorder.record(query, variables, operation_name)
+
+    def trace(self, request, operation_name: Union[str, None]):
+        """
+        Returns the span of the operation, the parent of the spans of its resolvers, permission checks and SQL statements.
+        """
+        return get_tracer().start_span("graphql.operation", {"graphql.operation.name": operation_name or "anonymous", "http.method": request.method})
+
+    def get_response(self, request, data, show_graphiql=False):
+        query, variables, operation_name, id = self.get_graphql_params(request, data)
+        self.record(request, query, variables, operation_name)
+
+        with self.instrument(request), self.detect_nplusone(request), self.trace(request, operation_name), self.profile(request, operation_name):
+            execution_result = self.execute_graphql_request(
+                request, data, query, variables, operation_name, show_graphiql
+            )
+
+        if getattr(request, MUTATION_ERRORS_FLAG, False) is True:
+            set_rollback()
+
+        return self.build_response(request, execution_result, id, show_graphiql)
+
+    def build_response(self, request, execution_result: Union[ExecutionResult, None], id=None, show_graphiql=False, rollback=True) -> Tuple[Union[str, None], int]:
+        """
+        Builds the response body and status code from the execution result.
+
+        Args:
+            request (HttpRequest): the request
+            execution_result (Union[ExecutionResult, None]): the result of the execution
+            id (optional): the id of the operation in batch requests. Defaults to None.
+            show_graphiql (bool, optional): whether the graphiql is displayed. Defaults to False.
+            rollback (bool, optional): whether errors roll back the atomic request. Defaults to True.
+
+        Returns:
+            Tuple[Union[str, None], int]: the encoded response and the status code
+        """
+        status_code = 200
+        if not execution_result:
+            return None, status_code
+
+        response = {}
+        if execution_result.errors:
+            if rollback:
+                set_rollback()
+            response["errors"] = [
+                self.format_error(e) for e in execution_result.errors
+            ]
+
+        if execution_result.errors and any(
+            not getattr(e, "path", None) for e in execution_result.errors
+        ):
+            status_code = 400
+        else:
+            response["data"] = execution_result.data
+
+        extensions = {**(execution_result.extensions or {}), **self.pop_extensions(request)}
+        if extensions:
+            response["extensions"] = extensions
+
+        if self.batch:
+            response["id"] = id
+            response["status"] = status_code
+
+        return self.json_encode(request, response, pretty=show_graphiql), status_code
+
+    def prepare_graphql_request(
+        self, request, data, query, variables, operation_name, show_graphiql=False
+    ) -> Tuple[Union[DocumentNode, None], Union[OperationDefinitionNode, None], Union[ExecutionResult, None]]:
+        """
+        Parses and validates the operation and checks its estimated cost.
+
+        Returns:
+            Tuple[DocumentNode, OperationDefinitionNode, ExecutionResult]: the parsed document, the operation and
+            an ExecutionResult with errors if the operation must not be executed. The document is None if there is nothing to execute.
+        """
+        if not query:
+            if show_graphiql:
+                return None, None, None
+            raise HttpError(HttpResponseBadRequest("Must provide query string."))
+
+        schema = self.schema.graphql_schema
+
+        schema_validation_errors = validate_schema(schema)
+        if schema_validation_errors:
+            return None, None, ExecutionResult(data=None, errors=schema_validation_errors)
+
+        try:
+            document = parse(query)
+        except Exception as e:
+            return None, None, ExecutionResult(errors=[e])
+
+        operation_ast = get_operation_ast(document, operation_name)
+
+        if (
+            request.method.lower() == "get"
+            and operation_ast is not None
+            and operation_ast.operation != OperationType.QUERY
+        ):
+            if show_graphiql:
+                return None, None, None
+
+            raise HttpError(
+                HttpResponseNotAllowed(
+                    ["POST"],
+                    "Can only perform a {} operation from a POST request.".format(
+                        operation_ast.operation.value
+                    ),
+                )
+            )
+
+        validation_errors = validate(
+            schema,
+            document,
+            self.validation_rules,
+            graphene_settings.MAX_VALIDATION_ERRORS,
+        )
+
+        if validation_errors:
+            return None, None, ExecutionResult(data=None, errors=validation_errors)
+
+        try:
+            cost, depth = analyze_query_cost(schema, document, operation_name, variables)
+        except GraphQLError as e:
+            return None, None, ExecutionResult(data=None, errors=[e])
+
+        if dre_settings.QUERY_COST_EXTENSION:
+            self.add_extension(request, "cost", {
+                "estimated": cost,
+                "depth": depth,
+                "maximum": dre_settings.MAX_QUERY_COST,
+            })
+
+        return document, operation_ast, None
+
+    def get_execute_options(self, request, variables, operation_name) -> dict:
+        """
+        Returns the kwargs of `graphql.execute`
+        """
+        execute_options = {
+            "root_value": self.get_root_value(request),
+            "context_value": self.get_context(request),
+            "variable_values": variables,
+            "operation_name": operation_name,
+            "middleware": self.get_middleware(request),
+        }
+        if self.execution_context_class:
+            execute_options["execution_context_class"] = self.execution_context_class
+        return execute_options
+
+    def observe_operation(self, operation_ast: Union[OperationDefinitionNode, None], operation_name: Union[str, None], started: float) -> None:
+        """
+        Records the latency of the executed operation in the metrics.
+        """
+        if operation_ast is not None and operation_ast.name:
+            operation_name = operation_ast.name.value
+        operation_type = operation_ast.operation.value if operation_ast is not None else "unknown"
+        observe_operation(operation_name, operation_type, perf_counter() - started)
+
+    def execute_graphql_request(
+        self, request, data, query, variables, operation_name, show_graphiql=False
+    ):
+        started = perf_counter()
+        document, operation_ast, error_result = self.prepare_graphql_request(
+            request, data, query, variables, operation_name, show_graphiql
+        )
+        if document is None:
+            return error_result
+
+        try:
+            execute_options = self.get_execute_options(request, variables, operation_name)
+
+            if (
+                operation_ast is not None
+                and operation_ast.operation == OperationType.MUTATION
+                and (
+                    graphene_settings.ATOMIC_MUTATIONS is True
+                    or connection.settings_dict.get("ATOMIC_MUTATIONS", False) is True
+                )
+            ):
+                with transaction.atomic():
+                    result = execute(self.schema.graphql_schema, document, **execute_options)
+                    if getattr(request, MUTATION_ERRORS_FLAG, False) is True:
+                        transaction.set_rollback(True)
+                return result
+
+            return execute(self.schema.graphql_schema, document, **execute_options)
+        except Exception as e:
+            return ExecutionResult(errors=[e])
+        finally:
+            self.observe_operation(operation_ast, operation_name, started)
+
+
+class AsyncGraphQLView(GraphQLView):
+    """
+    The async counterpart of GraphQLView for ASGI deployments, intended for schemas configured with `SchemaConfigurator(..., asynchronous=True)`.
+    The operation is executed on the event loop, `AsyncORMMiddleware` calls the sync resolvers that may hit the database in a thread.
+    N.B. mutations are not wrapped in `ATOMIC_MUTATIONS` transactions, because a transaction can not span awaits.
+    """
+
+    view_is_async = True
+
+    def get_middleware(self, request):
+        # the first middleware wraps the resolver directly, so that AsyncORMMiddleware tells the async resolvers apart
+        return [AsyncORMMiddleware(), *super().get_middleware(request)]
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            if request.method.lower() not in ("get", "post"):
+                raise HttpError(
+                    HttpResponseNotAllowed(
+                        ["GET", "POST"], "GraphQL only supports GET and POST requests."
+                    )
+                )
+
+            data = self.parse_body(request)
+            show_graphiql = self.graphiql and self.can_display_graphiql(request, data)
+
+            if show_graphiql:
+                # rendering graphiql does not hit the database
+                return super().dispatch(request, *args, **kwargs)
+
+            if self.batch:
+                responses = [await self.aget_response(request, entry) for entry in data]
+                result = "[{}]".format(
+                    ",".join([response[0] for response in responses])
+                )
+                status_code = (
+                    responses
+                    and max(responses, key=lambda response: response[1])[1]
+                    or 200
+                )
+            else:
+                result, status_code = await self.aget_response(request, data, show_graphiql)
+
+            return self.compress(request, HttpResponse(
+                status=status_code, content=result, content_type="application/json"
+            ))
+
+        except HttpError as e:
+            response = e.response
+            response["Content-Type"] = "application/json"
+            response.content = self.json_encode(
+                request, {"errors": [self.format_error(e)]}
+            )
+            return response
+
+    async def aget_response(self, request, data, show_graphiql=False):
+        """
+        The async counterpart of `get_response`
+        """
+        query, variables, operation_name, id = self.get_graphql_params(request, data)
+        self.record(request, query, variables, operation_name)
+
+        if hasattr(request, "auser") and (
+            request.headers.get(dre_settings.INSTRUMENTATION_HEADER) or request.headers.get(dre_settings.PROFILING_HEADER)
+        ):
+            # `can_instrument` and `get_profile` read the user, which can not be loaded on the event loop
+            request.user = await request.auser()
+
+        with self.instrument(request), self.trace(request, operation_name), self.profile(request, operation_name):
+            execution_result = await self.aexecute_graphql_request(
+                request, data, query, variables, operation_name, show_graphiql
+            )
+        return self.build_response(request, execution_result, id, show_graphiql, rollback=False)
+
+    async def aexecute_graphql_request(
+        self, request, data, query, variables, operation_name, show_graphiql=False
+    ):
+        """
+        The async counterpart of `execute_graphql_request`, which awaits the execution result.
+        """
+        started = perf_counter()
+        document, operation_ast, error_result = self.prepare_graphql_request(
+            request, data, query, variables, operation_name, show_graphiql
+        )
+        if document is None:
+            return error_result
+
+        try:
+            execute_options = self.get_execute_options(request, variables, operation_name)
+            result = execute(self.schema.graphql_schema, document, **execute_options)
+            if isawaitable(result):
+                result = await result
+            return result
+        except Exception as e:
+            return ExecutionResult(errors=[e])
+        finally:
+            self.observe_operation(operation_ast, operation_name, started)
+
+
+class MetricsView(View):
+    """
+    Renders the metrics in the Prometheus text exposition format, e.g.
+
+        urlpatterns = [
+            path("metrics", MetricsView.as_view()),
+        ]
+
+    The metrics are recorded if the METRICS setting is True. Restrict the access to the view, e.g. in the web server.
+    """
+
+    content_type = "text/plain; version=0.0.4; charset=utf-8"
+
+    def get(self, request, *args, **kwargs):
+        return HttpResponse(registry.exposition(), content_type=self.content_type)
+
+
+class ExportView(View):
+    """
+    Streams all records of a root connection of the configurator as NDJSON or CSV, e.g.
+
+        urlpatterns = [
+            path("export/<str:root_field>", ExportView.as_view(configurator=configurator)),
+        ]
+
+    `GET /export/author?name__icontains=an&order_by=name&fields=id,name&format=csv` takes the filter and ordering arguments
+    of the filterset of the connection, checks the permissions of `get_queryset` and iterates the queryset in chunks of
+    `chunk_size`, with server-side cursors where the database supports them, so that the memory stays flat.
+    The primary and foreign keys are exported as global ids, to-many relations are not exported.
+    """
+
+    configurator: SchemaConfigurator = None
+    chunk_size: int = None
+
+    def get(self, request, root_field: str, *args, **kwargs):
+        connection_field = get_connection_field(self.configurator, root_field)
+        if connection_field is None:
+            raise Http404(f"There is no connection '{root_field}' to export")
+        data = request.GET.copy()
+        export_format = data.pop("format", ["ndjson"])[-1]
+        if export_format not in EXPORT_FORMATS:
+            return JsonResponse({"errors": {"format": [f"The format must be one of {', '.join(EXPORT_FORMATS)}"]}}, status=400)
+        selected = [name for name in data.pop("fields", [""])[-1].split(",") if name]
+        try:
+            columns = get_export_columns(connection_field.node_type, selected)
+        except ValueError as e:
+            return JsonResponse({"errors": {"fields": [str(e)]}}, status=400)
+        queryset, errors = get_export_queryset(connection_field, request, root_field, data)
+        if errors:
+            return JsonResponse({"errors": errors}, status=400)
+
+        rows = iterate_rows(queryset, columns, self.chunk_size or dre_settings.EXPORT_CHUNK_SIZE)
+        response = StreamingHttpResponse(RENDERERS[export_format](rows, columns), content_type=EXPORT_FORMATS[export_format])
+        response["Content-Disposition"] = f'attachment; filename="{root_field}.{export_format}"'
+        return response
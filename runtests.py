@@ -0,0 +1,47 @@
+"""
+Runs the tests of django_relay_endpoint in SQLite, with the models of the benchmarks app and a `replica` database alias, e.g.
+
+    python runtests.py
+    python runtests.py django_relay_endpoint.tests.ReadReplicaTests
+"""
+import os
+import sys
+import tempfile
+
+import django
+from django.conf import settings
+from django.test.utils import get_runner
+
+ROOT_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT_DIRECTORY)
+sys.path.insert(0, os.path.join(ROOT_DIRECTORY, "benchmarks"))
+
+
+def main() -> int:
+    settings.configure(
+        SECRET_KEY="django-relay-endpoint-tests",
+        INSTALLED_APPS=[
+            "django.contrib.contenttypes",
+            "django.contrib.auth",
+            "django.contrib.sessions",
+            "graphene_django",
+            "django_filters",
+            "django_relay_endpoint",
+            "bench",
+        ],
+        DATABASES={
+            "default": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"},
+            "replica": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"},
+        },
+        USE_TZ=True,
+        DEFAULT_AUTO_FIELD="django.db.models.BigAutoField",
+        MEDIA_ROOT=tempfile.gettempdir(),
+    )
+    django.setup()
+    runner = get_runner(settings)(top_level=ROOT_DIRECTORY)
+    failures = runner.run_tests(sys.argv[1:] or ["django_relay_endpoint"])
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())